@@ -1,5 +1,6 @@
 from .hardware_test import HardwareTestMenu
 from .ui_components import Menu, SubmenuList, ButtonInput
+from ..hardware_manager.platform_description import SPIHardwareHolder
 from ..robi42 import Robi42
 
 
@@ -16,4 +17,12 @@ class MainMenu(SubmenuList):
 
 
 def start(robi: Robi42):
+    # button events, every press is handled by exactly one menu; where the platform
+    # declares the expander's INT pin the menus do not touch the bus while waiting
+    if not robi.buttons.events_enabled:
+        int_pin = SPIHardwareHolder.get_instance().mcp_motor_taster_int_pin
+        if int_pin is not None:
+            robi.buttons.enable_interrupts(int_pin)
+        else:
+            robi.buttons.start_sampling()
     MainMenu(robi).goto()
@@ -1,6 +1,6 @@
-from time import sleep, ticks_ms
+from time import sleep, ticks_diff, ticks_ms
 from ..robi42 import Robi42
-from ..modules.buttons import Button
+from ..modules.buttons import Button, Buttons
 
 
 class ButtonInput:
@@ -10,31 +10,42 @@ class ButtonInput:
     right = 3
     center = 4
 
+    # checked in this order if several buttons are pressed at once
+    _PRIORITY = (
+        (Buttons.LEFT, left),
+        (Buttons.RIGHT, right),
+        (Buttons.CENTER, center),
+        (Buttons.UP, up),
+        (Buttons.DOWN, down),
+    )
+
     @staticmethod
     def wait_for_input(robi: Robi42) -> int:
+        if robi.buttons.events_enabled:
+            return ButtonInput._wait_for_event(robi)
         while True:
-            if robi.buttons.left.is_pressed():
-                while robi.buttons.left.is_pressed():
-                    sleep(0.1)
-                return ButtonInput.left
-            if robi.buttons.right.is_pressed():
-                while robi.buttons.right.is_pressed():
-                    sleep(0.1)
-                return ButtonInput.right
-            if robi.buttons.center.is_pressed():
-                while robi.buttons.center.is_pressed():
-                    sleep(0.1)
-                return ButtonInput.center
-            if robi.buttons.up.is_pressed():
-                while robi.buttons.up.is_pressed():
-                    sleep(0.1)
-                return ButtonInput.up
-            if robi.buttons.down.is_pressed():
-                while robi.buttons.down.is_pressed():
-                    sleep(0.1)
-                return ButtonInput.down
+            state = robi.buttons.read_all()
+            for bit, button in ButtonInput._PRIORITY:
+                if state & bit:
+                    while robi.buttons.read_all() & bit:
+                        sleep(0.1)
+                    return button
             sleep(0.1)
 
+    @staticmethod
+    def _wait_for_event(robi: Robi42) -> int:
+        # reacts on the press itself and on auto-repeat, so holding a button scrolls
+        while True:
+            event = robi.buttons.get_event()
+            if event is None:
+                sleep(0.01)
+                continue
+            kind, bit, _ = event
+            if kind == Buttons.PRESS or kind == Buttons.REPEAT:
+                for priority_bit, button in ButtonInput._PRIORITY:
+                    if bit == priority_bit:
+                        return button
+
     @staticmethod
     def wait_for_release(button: Button):
         while button.is_pressed():
@@ -70,14 +81,38 @@ class Menu:
             self.main_loop()
             s = ticks_ms()
 
-            ex = self.robi.buttons.left.is_pressed()
-            while ticks_ms() - s < self.refresh_delay_ms and not ex:
-                ex = self.robi.buttons.left.is_pressed()
+            ex = self.left_pressed()
+            while ticks_diff(ticks_ms(), s) < self.refresh_delay_ms and not ex:
+                sleep(0.01)
+                ex = self.left_pressed()
 
-        ButtonInput.wait_for_release(self.robi.buttons.left)
+        buttons = self.robi.buttons
+        ButtonInput.wait_for_release(buttons.left)
+        if buttons.events_enabled:
+            # the press and its release are handled here, not by the menu below
+            while buttons.get_event() is not None:
+                pass
 
         self.exit()
 
+    def left_pressed(self) -> bool:
+        """
+        True if the left button (back) was pressed. With button events enabled, the
+        events buffered meanwhile are consumed, with interrupts enabled that does not
+        touch the bus until a button changes.
+        """
+        buttons = self.robi.buttons
+        if not buttons.events_enabled:
+            return buttons.left.is_pressed()
+        pressed = False
+        event = buttons.get_event()
+        while event is not None:
+            kind, bit, _ = event
+            if kind == Buttons.PRESS and bit == Buttons.LEFT:
+                pressed = True
+            event = buttons.get_event()
+        return pressed
+
     def begin(self):
         ...
 
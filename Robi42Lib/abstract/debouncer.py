@@ -0,0 +1,93 @@
+from array import array
+from time import ticks_add, ticks_diff
+
+from .event_queue import EventQueue
+
+
+class ButtonDebouncer:
+    """
+    Integrator debounce and press classification for up to 16 buttons.
+
+    update() is called with the raw state (one bit per pressed button) at a fixed rate.
+    Each button has a counter that moves one step towards the raw level per call; the
+    debounced state only flips once the counter reaches 0 or `integrator_max`. Events
+    are written to an EventQueue as (kind << 8 | button bit, ticks_ms).
+
+    Nothing is allocated after construction, so update() can run in a timer callback.
+    """
+
+    PRESS = 0
+    RELEASE = 1
+    LONG_PRESS = 2
+    REPEAT = 3
+
+    def __init__(
+            self,
+            bits: list[int],
+            events: EventQueue,
+            integrator_max: int = 4,
+            long_press_ms: int = 800,
+            repeat_ms: int = 200,
+    ):
+        """
+        bits -- State bit of every button
+        events -- Queue the events are written to
+        integrator_max -- Number of consecutive equal samples needed to change the state
+        long_press_ms -- Hold time until LONG_PRESS is emitted, 0 disables it
+        repeat_ms -- Interval of REPEAT events after LONG_PRESS, 0 disables them
+        """
+        self._bits = array('H', bits)
+        self._integrators = array('B', [0] * len(bits))
+        self._next_event_tick = array('I', [0] * len(bits))
+        self._events = events
+        self._integrator_max = integrator_max
+        self._long_press_ms = long_press_ms
+        self._repeat_ms = repeat_ms
+        self._long_pressed = 0
+        self.state = 0
+
+    def reset(self, state: int, tick: int):
+        """
+        Sets the debounced state without emitting events. Buttons that are already held
+        count as pressed at tick.
+        """
+        self.state = state
+        self._long_pressed = 0
+        for i in range(len(self._bits)):
+            self._integrators[i] = self._integrator_max if state & self._bits[i] else 0
+            self._next_event_tick[i] = ticks_add(tick, self._long_press_ms)
+
+    def update(self, raw_state: int, tick: int):
+        integrator_max = self._integrator_max
+        for i in range(len(self._bits)):
+            bit = self._bits[i]
+            level = self._integrators[i]
+            if raw_state & bit:
+                if level < integrator_max:
+                    level += 1
+                    self._integrators[i] = level
+            elif level > 0:
+                level -= 1
+                self._integrators[i] = level
+
+            if not self.state & bit:
+                if level == integrator_max:
+                    self.state |= bit
+                    self._next_event_tick[i] = ticks_add(tick, self._long_press_ms)
+                    self._events.put((ButtonDebouncer.PRESS << 8) | bit, tick)
+            elif level == 0:
+                self.state &= ~bit
+                self._long_pressed &= ~bit
+                self._events.put((ButtonDebouncer.RELEASE << 8) | bit, tick)
+            elif ticks_diff(tick, self._next_event_tick[i]) >= 0:
+                if not self._long_pressed & bit:
+                    if self._long_press_ms <= 0:
+                        continue
+                    self._long_pressed |= bit
+                    kind = ButtonDebouncer.LONG_PRESS
+                elif self._repeat_ms > 0:
+                    kind = ButtonDebouncer.REPEAT
+                else:
+                    continue
+                self._next_event_tick[i] = ticks_add(tick, self._repeat_ms)
+                self._events.put((kind << 8) | bit, tick)
@@ -0,0 +1,50 @@
+from array import array
+
+
+class EventQueue:
+    """
+    Fixed size FIFO of (code, ticks_ms) pairs.
+
+    All storage is allocated in the constructor, so put() can be used from interrupt
+    handlers. There must only be one producer and one consumer. If the queue is full,
+    new events are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, size: int):
+        self._codes = array('H', [0] * size)
+        self._ticks = array('I', [0] * size)
+        self._size = size
+        self._head = 0  # next slot to read, only moved by the consumer
+        self._tail = 0  # next slot to write, only moved by the producer
+        self.dropped = 0
+
+    def put(self, code: int, tick: int) -> bool:
+        tail = self._tail
+        next_tail = tail + 1
+        if next_tail == self._size:
+            next_tail = 0
+        if next_tail == self._head:
+            self.dropped += 1
+            return False
+        self._codes[tail] = code
+        self._ticks[tail] = tick
+        self._tail = next_tail  # publish the event only after it is complete
+        return True
+
+    def get(self) -> tuple[int, int] | None:
+        """
+        Returns the oldest (code, ticks_ms) pair or None if the queue is empty.
+        """
+        head = self._head
+        if head == self._tail:
+            return None
+        event = (self._codes[head], self._ticks[head])
+        head += 1
+        self._head = 0 if head == self._size else head
+        return event
+
+    def clear(self):
+        self._head = self._tail
+
+    def __len__(self) -> int:
+        return (self._tail - self._head) % self._size
@@ -0,0 +1,116 @@
+"""
+Plans point-to-point moves of the steppers as tables of step frequencies, one entry per
+control tick, so playing a move back needs no float math (see motor.ProfilePlayback).
+
+Without a jerk limit the velocity follows a trapezoid (constant acceleration), with one
+it follows an S-curve (the acceleration ramps up and down with the given jerk). Moves
+start and end at standstill. If the distance is too short to reach v_max, the peak
+velocity is lowered.
+
+Pure Python without hardware access, runs on the host as well.
+"""
+
+from array import array
+from math import sqrt
+
+# Dieser magische ↓ Wert ergibt sich aus 1.8 / 32 * (math.pi / 180) :)
+STEP_ANGLE_RAD = 0.00098174  # one microstep at 32 microsteps per full step
+
+MAX_FREQ = 0xFFFF  # largest value of an array('H') entry
+
+
+class MotionProfile:
+    """
+    freqs -- array('H') of step frequencies in Hz, entry i is played from i * tick_ms on
+    """
+
+    def __init__(self, freqs: array, tick_ms: int, meters_per_step: float, peak_velocity: float) -> None:
+        self.freqs = freqs
+        self.tick_ms = tick_ms
+        self.meters_per_step = meters_per_step
+        self.peak_velocity = peak_velocity  # m/s
+
+    def __len__(self) -> int:
+        return len(self.freqs)
+
+    @property
+    def duration_ms(self) -> int:
+        return len(self.freqs) * self.tick_ms
+
+    def distance(self, ticks: int = None) -> float:
+        """Distance in m covered by the first `ticks` entries (all if None)."""
+        freqs = self.freqs
+        steps = 0
+        for i in range(len(freqs) if ticks is None else min(ticks, len(freqs))):
+            steps += freqs[i]
+        return steps * self.tick_ms / 1000 * self.meters_per_step
+
+
+def _accel_time(v: float, a_max: float, jerk: float) -> float:
+    """Time to accelerate from standstill to v."""
+    if not jerk:
+        return v / a_max
+    if v * jerk >= a_max * a_max:  # a_max is reached
+        return v / a_max + a_max / jerk
+    return 2 * sqrt(v / jerk)
+
+
+def _accel_velocity(t: float, v_peak: float, t_acc: float, a_max: float, jerk: float) -> float:
+    """Velocity t seconds into the acceleration from standstill to v_peak."""
+    if not jerk:
+        return a_max * t
+    t_jerk = min(a_max / jerk, t_acc / 2)  # duration of each jerk phase
+    if t < t_jerk:
+        return 0.5 * jerk * t * t
+    if t > t_acc - t_jerk:
+        remaining = t_acc - t
+        return v_peak - 0.5 * jerk * remaining * remaining
+    return jerk * t_jerk * (t - 0.5 * t_jerk)
+
+
+def plan(distance: float, v_max: float, a_max: float, jerk: float = 0, tick_ms: int = 2,
+         wheel_radius: float = 0.032) -> MotionProfile:
+    """
+    Plans a move over `distance` m.
+    @param v_max: Maximum velocity in m/s
+    @param a_max: Maximum acceleration in m/s^2
+    @param jerk: Maximum jerk in m/s^3, 0 for a trapezoid profile
+    @param tick_ms: Control tick of the playback in ms
+    @param wheel_radius: Wheel radius in m
+    """
+    if distance <= 0 or v_max <= 0 or a_max <= 0 or jerk < 0 or tick_ms <= 0:
+        raise ValueError('distance, v_max, a_max and tick_ms must be positive, jerk must not be negative')
+
+    # accelerating to v and back to standstill covers v * t_acc (the mean velocity of
+    # each phase is v / 2), lower v by bisection until that fits into the distance
+    v_peak = v_max
+    if v_peak * _accel_time(v_peak, a_max, jerk) > distance:
+        low, high = 0.0, v_max
+        for _ in range(40):
+            mid = (low + high) / 2
+            if mid * _accel_time(mid, a_max, jerk) > distance:
+                high = mid
+            else:
+                low = mid
+        v_peak = low
+
+    t_acc = _accel_time(v_peak, a_max, jerk)
+    t_cruise = (distance - v_peak * t_acc) / v_peak
+    t_total = 2 * t_acc + t_cruise
+
+    tick_s = tick_ms / 1000
+    meters_per_step = STEP_ANGLE_RAD * wheel_radius
+    ticks = int(t_total / tick_s + 0.999999)
+    freqs = array('H')
+    for i in range(ticks):
+        t = (i + 0.5) * tick_s  # the velocity in the middle of a tick is its mean velocity
+        if t < t_acc:
+            v = _accel_velocity(t, v_peak, t_acc, a_max, jerk)
+        elif t < t_acc + t_cruise:
+            v = v_peak
+        elif t < t_total:
+            v = _accel_velocity(t_total - t, v_peak, t_acc, a_max, jerk)
+        else:
+            v = 0
+        freqs.append(min(MAX_FREQ, int(v / meters_per_step + 0.5)))
+    return MotionProfile(freqs, tick_ms, meters_per_step, v_peak)
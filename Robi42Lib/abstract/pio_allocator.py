@@ -0,0 +1,134 @@
+from rp2 import PIO, StateMachine
+
+
+class PIOAllocationError(RuntimeError):
+    """Raised if no PIO block has a free state machine and room for the program."""
+    pass
+
+
+class PIOAllocator():
+    """
+    Hands out the 8 PIO state machines of the RP2040 (2 blocks of 4, state machine ids
+    0-7) and loads the programs into the instruction memory of their block (32 words
+    each). A program already loaded into a block is reused by all state machines of
+    that block running it, a block with the program loaded is preferred.
+
+        sm_id = PIOAllocator.get_instance().claim(pwm_prog, 'PIOPWM pin 20')
+        sm = StateMachine(sm_id, pwm_prog, ...)
+        ...
+        PIOAllocator.get_instance().release(sm_id)
+
+    Everything using PIO in the library claims its state machines here, code that
+    creates StateMachine objects itself can collide with them. Owner names name the
+    resource driven (e.g. the pin), claiming again with the same name and program takes
+    over the state machine, like a driver created again for the same pin has to.
+    """
+
+    __INSTANCE = None
+    __INIT_TOKEN = object()
+
+    BLOCKS = 2
+    STATE_MACHINES_PER_BLOCK = 4
+    INSTRUCTION_MEMORY = 32
+
+    @classmethod
+    def get_instance(cls) -> 'PIOAllocator':
+        if cls.__INSTANCE is None:
+            cls.__INSTANCE = cls(cls.__INIT_TOKEN)
+        return cls.__INSTANCE
+
+    def __init__(self, init_token: object) -> None:
+        if init_token != self.__INIT_TOKEN:
+            raise RuntimeError('Cannot explicitly instantiate singleton class. ')
+        self.__owners = [None] * (self.BLOCKS * self.STATE_MACHINES_PER_BLOCK)
+        self.__programs = [None] * len(self.__owners)  # program run by each claimed state machine
+        self.__loaded = [[] for _ in range(self.BLOCKS)]  # [program, users] per block
+
+    @staticmethod
+    def _program_length(program) -> int:
+        return len(program[0])  # an asm_pio program keeps its instructions in the first item
+
+    def __entry(self, block: int, program):
+        for entry in self.__loaded[block]:
+            if entry[0] is program:
+                return entry
+        return None
+
+    def __free_sm(self, block: int):
+        first = block * self.STATE_MACHINES_PER_BLOCK
+        for sm_id in range(first, first + self.STATE_MACHINES_PER_BLOCK):
+            if self.__owners[sm_id] is None:
+                return sm_id
+        return None
+
+    def free_memory(self, block: int) -> int:
+        """Instruction words of a block not used by the programs loaded here."""
+        used = 0
+        for program, _ in self.__loaded[block]:
+            used += self._program_length(program)
+        return self.INSTRUCTION_MEMORY - used
+
+    def claim(self, program, owner: str) -> int:
+        """
+        Returns the id of a free state machine (for StateMachine()) in a block with the
+        program loaded, loading it if needed.
+        @param program: Program decorated with @asm_pio
+        @param owner: Name of the user, for owner() and error messages
+        """
+        for sm_id in range(len(self.__owners)):
+            if self.__owners[sm_id] == owner and self.__programs[sm_id] is program:
+                return sm_id
+        # first a block that has the program already, then one with room for it
+        for block in range(self.BLOCKS):
+            entry = self.__entry(block, program)
+            sm_id = self.__free_sm(block)
+            if entry is not None and sm_id is not None:
+                entry[1] += 1
+                return self.__assign(sm_id, program, owner)
+        length = self._program_length(program)
+        for block in range(self.BLOCKS):
+            sm_id = self.__free_sm(block)
+            if sm_id is None or self.__entry(block, program) is not None or self.free_memory(block) < length:
+                continue
+            try:
+                PIO(block).add_program(program)
+            except OSError:
+                continue  # the memory is used by a program loaded elsewhere
+            self.__loaded[block].append([program, 1])
+            return self.__assign(sm_id, program, owner)
+        raise PIOAllocationError('No free PIO state machine with room for the program of {}'.format(owner))
+
+    def __assign(self, sm_id: int, program, owner: str) -> int:
+        self.__owners[sm_id] = owner
+        self.__programs[sm_id] = program
+        return sm_id
+
+    def release(self, sm_id: int) -> None:
+        """Stops the state machine and frees it, the program is unloaded with its last user."""
+        program = self.__programs[sm_id]
+        if program is None:
+            return
+        StateMachine(sm_id).active(0)
+        block = sm_id // self.STATE_MACHINES_PER_BLOCK
+        loaded = self.__loaded[block]
+        for i in range(len(loaded)):
+            if loaded[i][0] is program:
+                loaded[i][1] -= 1
+                if loaded[i][1] == 0:
+                    del loaded[i]  # by index, programs compare by their content
+                    PIO(block).remove_program(program)
+                break
+        self.__owners[sm_id] = None
+        self.__programs[sm_id] = None
+
+    def owner(self, sm_id: int):
+        """The name a state machine was claimed with, None if it is free."""
+        return self.__owners[sm_id]
+
+    def program_offset(self, sm_id: int) -> int:
+        """
+        Address of the first instruction of the program a claimed state machine runs,
+        e.g. to restart it with exec() of a jmp. MicroPython stores the load address
+        per block in items 1 and 2 of the program.
+        """
+        return self.__programs[sm_id][1 + sm_id // self.STATE_MACHINES_PER_BLOCK]
@@ -4,6 +4,8 @@ from machine import Pin
 from rp2 import PIO, StateMachine, asm_pio
 from time import sleep
 
+from .pio_allocator import PIOAllocator
+
 
 @asm_pio(sideset_init=PIO.OUT_LOW)
 def pwm_prog():
@@ -24,7 +26,8 @@ def pwm_prog():
 class PIOPWM:
     def __init__(self, pin: int, freq: int):
         self.count_freq = 100_000_000
-        self._sm = StateMachine(0, pwm_prog, freq=self.count_freq, sideset_base=Pin(pin))
+        self._sm_id = PIOAllocator.get_instance().claim(pwm_prog, 'PIOPWM pin {}'.format(pin))
+        self._sm = StateMachine(self._sm_id, pwm_prog, freq=self.count_freq, sideset_base=Pin(pin))
         self.freq(freq)
         self._sm.active(1)
 
@@ -36,6 +39,9 @@ class PIOPWM:
         assert freq >= -1
         self._sm.put(self._freq_to_max_count(freq))
 
+    def deinit(self):
+        PIOAllocator.get_instance().release(self._sm_id)
+
 
 if __name__ == "__main__":
     pwm = PIOPWM(20, 10_000)
@@ -0,0 +1,47 @@
+from machine import Pin
+from rp2 import StateMachine, asm_pio, asm_pio_encode
+
+from .pio_allocator import PIOAllocator
+
+
+@asm_pio()
+def step_counter():
+    # X counts down by one on every rising edge of the pin, starting at 0xFFFFFFFF
+    label("loop")
+    wait(0, pin, 0)
+    wait(1, pin, 0)
+    jmp(x_dec, "loop")
+
+
+# injected with exec(), encoded once so reading the counter does not allocate
+_RESET_X = asm_pio_encode("mov(x, invert(null))", 0)
+_COPY_COUNT = asm_pio_encode("mov(isr, invert(x))", 0)
+_PUSH = asm_pio_encode("push()", 0)
+
+
+class StepCounter:
+    """
+    Counts the rising edges on a pin (e.g. the STEP input of a motor driver) with a PIO
+    state machine, so no pulse is missed no matter how busy the CPU is. The pin only has
+    to be readable, it can be driven by a PWM slice or another state machine.
+    """
+
+    def __init__(self, pin: int):
+        self._sm_id = PIOAllocator.get_instance().claim(step_counter, 'StepCounter pin {}'.format(pin))
+        self._sm = StateMachine(self._sm_id, step_counter, in_base=Pin(pin))
+        self.reset()
+        self._sm.active(1)
+
+    def reset(self):
+        self._sm.exec(_RESET_X)
+
+    @property
+    def count(self) -> int:
+        """Edges counted since the last reset, wraps at 2^32."""
+        sm = self._sm
+        sm.exec(_COPY_COUNT)
+        sm.exec(_PUSH)
+        return sm.get()
+
+    def deinit(self):
+        PIOAllocator.get_instance().release(self._sm_id)
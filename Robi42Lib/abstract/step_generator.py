@@ -0,0 +1,279 @@
+from array import array
+
+import machine
+from machine import Pin
+from rp2 import PIO, StateMachine, asm_pio, asm_pio_encode
+
+from .pio_allocator import PIOAllocator
+
+try:
+    from rp2 import DMA  # since MicroPython 1.22
+except ImportError:
+    DMA = None
+
+
+@asm_pio(sideset_init=PIO.OUT_LOW, fifo_join=PIO.JOIN_TX)
+def step_generator():
+    # a segment is two words: the number of steps - 1, then the half period count
+    wrap_target()
+    pull(block).side(0)
+    mov(y, invert(osr))  # without side(): makes the side-set optional, see _DROP_WORD
+    jmp(not_y, "continuous").side(0)
+    mov(y, osr).side(0)
+    pull(block).side(0)  # the half period stays in the OSR for the whole segment
+    label("step")
+    mov(x, osr).side(1) [1]
+    label("high")
+    jmp(x_dec, "high").side(1)
+    mov(x, osr).side(0) [1]
+    label("low")
+    jmp(x_dec, "low").side(0)
+    jmp(y_dec, "step").side(0)
+    irq(rel(0)).side(0)  # segment done, the pin stays low while waiting for the next one
+    wrap()
+    # CONTINUOUS: steps until stopped, a half period put meanwhile is taken at the next step
+    label("continuous")
+    pull(block).side(0)
+    mov(x, osr).side(0)  # X keeps the half period, pull(noblock) copies it with the FIFO empty
+    label("period")
+    pull(noblock).side(1)
+    mov(x, osr).side(1)
+    mov(y, x).side(1)
+    label("c_high")
+    jmp(y_dec, "c_high").side(1)
+    mov(y, x).side(0)
+    label("c_low")
+    jmp(y_dec, "c_low").side(0)
+    jmp("period").side(0)
+
+
+# cycles of a step besides the two half period loops (which take count + 1 cycles each),
+# the same in both modes
+STEP_OVERHEAD_CYCLES = 7
+
+# steps of a segment that runs until stopped (see run())
+FOREVER = 0
+
+# first word of such a segment instead of the number of steps - 1
+_CONTINUOUS = 0xFFFFFFFF
+
+# base addresses of the PIO blocks and the offset of TXF0, see the RP2040 datasheet
+_PIO_BASE = (0x50200000, 0x50300000)
+_TXF0 = 0x10
+_DREQ_PIO_TX0 = (0, 8)
+_CTRL_SET = 0x2000  # atomic bit set alias of the CTRL register (at offset 0)
+
+# injected with exec(), also into the running state machine: without side() it does not
+# touch the pin, the program leaves one instruction without side() to make that possible
+_DROP_WORD = asm_pio_encode("pull(noblock)", 1, True)
+
+
+class StepGenerator:
+    """
+    Outputs STEP pulses with a PIO state machine. A move is a table of segments, each a
+    step frequency and a number of steps (see segment() and profile_table()); the state
+    machine plays it on its own and stops after the last step, so the step timing does
+    not depend on what the CPU does meanwhile.
+
+    Tables longer than the TX FIFO (4 segments) are streamed into it by DMA where the
+    firmware has rp2.DMA (the channel is claimed on first use), otherwise the segment
+    interrupt refills the FIFO.
+
+        gen = StepGenerator(14)
+        gen.play(gen.profile_table(motion_profile.plan(0.5, 0.4, 0.3)))
+        while gen.busy:
+            ...  # other work
+    """
+
+    def __init__(self, pin: int):
+        self.count_freq = machine.freq()
+        allocator = PIOAllocator.get_instance()
+        self.__sm_id = allocator.claim(step_generator, 'StepGenerator pin {}'.format(pin))
+        self._sm = StateMachine(self.__sm_id, step_generator, sideset_base=Pin(pin))
+        self._sm.irq(self.__on_segment_done, hard=True)
+        # an unconditional jmp is encoded as the target address, bit 12 enables the
+        # optional side-set (bit 11, 0 pulls the pin low)
+        self.__jmp_start = allocator.program_offset(self.__sm_id) | 0x1000
+        self.__dma = None
+        self.__single = array('I', [0, 0])
+        self.__table = self.__single
+        self.__segments = 0
+        self.__fed = 0  # words of the table handed to the FIFO
+        self.segments_done = 0
+        self.steps_done = 0  # steps of the segments played completely
+
+    @property
+    def sm_id(self) -> int:
+        return self.__sm_id
+
+    def half_period(self, freq: int) -> int:
+        """The half period word of a step frequency in Hz (> 0)."""
+        return max(0, (self.count_freq // freq - STEP_OVERHEAD_CYCLES) // 2)
+
+    def freq(self, half_period: int) -> int:
+        """The step frequency in Hz the state machine outputs for a half period word."""
+        return self.count_freq // (2 * half_period + STEP_OVERHEAD_CYCLES)
+
+    def segment(self, table: array, index: int, freq: int, steps: int):
+        """Writes segment `index` of a table (2 words per segment), steps FOREVER to run until stopped."""
+        table[2 * index] = steps - 1 if steps != FOREVER else _CONTINUOUS
+        table[2 * index + 1] = self.half_period(freq)
+
+    def profile_table(self, profile) -> array:
+        """
+        Converts a MotionProfile (see abstract/motion_profile.py) into a table of
+        segments. Ticks with the same frequency are merged, the fraction of a step left
+        over at the end of a tick is carried into the next one.
+        """
+        table = array('I')
+        freqs = profile.freqs
+        tick_ms = profile.tick_ms
+        carry = 0  # in steps * 1000
+        i = 0
+        while i < len(freqs):
+            freq = freqs[i]
+            j = i + 1
+            while j < len(freqs) and freqs[j] == freq:
+                j += 1
+            carry += freq * tick_ms * (j - i)
+            steps = carry // 1000
+            if freq > 0 and steps > 0:
+                carry -= steps * 1000
+                table.append(steps - 1)
+                table.append(self.half_period(freq))
+            i = j
+        return table
+
+    def play(self, table: array):
+        """
+        Starts playing a table of segments (an array('I')), a move still running is
+        stopped. Returns immediately. The table must not be changed while it is played.
+        """
+        if self.load(table):
+            self._sm.active(1)
+
+    def load(self, table: array) -> bool:
+        """
+        Like play(), but leaves the state machine stopped, to be started with
+        start_together(). Returns False if the table is empty (nothing to start).
+        """
+        if len(table) % 2:
+            raise ValueError('a segment table has two words per segment')
+        self.stop()
+        self.__table = table
+        self.__segments = len(table) // 2
+        if self.__segments == 0:
+            return False
+        if DMA is not None and len(table) > 8 and self.__dma is None:
+            self.__dma = DMA()
+        if len(table) > 8 and self.__dma is not None:
+            pio, index = divmod(self.__sm_id, 4)
+            ctrl = self.__dma.pack_ctrl(size=2, inc_write=False, treq_sel=_DREQ_PIO_TX0[pio] + index)
+            self.__dma.config(read=table, write=_PIO_BASE[pio] + _TXF0 + 4 * index,
+                              count=len(table), ctrl=ctrl, trigger=True)
+            self.__fed = len(table)
+        else:
+            self.__feed()
+        return True
+
+    def run(self, freq: int, steps: int = FOREVER):
+        """
+        Outputs `steps` steps at freq Hz (stops for 0). If the generator already runs
+        FOREVER, that changes the frequency at the next step without restarting (see
+        load_freq()), otherwise the motion still running is stopped.
+        """
+        if self.load_freq(freq, steps):
+            self._sm.active(1)
+
+    def load_freq(self, freq: int, steps: int = FOREVER) -> bool:
+        """
+        Like run(), but see load(). Returns False for freq 0, and if the generator
+        already runs forever: the new half period is queued then, the state machine
+        takes it at its next rising edge, so calling run() from a control loop neither
+        cuts a step short nor adds one. A half period still queued is replaced.
+        """
+        if freq <= 0:
+            self.stop()
+            return False
+        single = self.__single
+        half_period = self.half_period(freq)
+        if (steps == FOREVER and self.__table is single and single[0] == _CONTINUOUS
+                and self.busy and self._sm.active()):
+            if half_period != single[1]:
+                sm = self._sm
+                if sm.tx_fifo():
+                    sm.exec(_DROP_WORD)  # not taken yet, at worst it is applied one step late
+                sm.put(half_period)
+                single[1] = half_period
+            return False
+        self.segment(single, 0, freq, steps)
+        return self.load(single)
+
+    def stop(self):
+        """
+        Stops at once, even in the middle of a segment, and pulls the pin low. No
+        allocation, so changing the frequency with run() is cheap.
+        """
+        if self.__dma is not None:
+            self.__dma.active(0)
+        sm = self._sm
+        sm.active(0)
+        while sm.tx_fifo():
+            sm.exec(_DROP_WORD)
+        sm.restart()
+        sm.exec(self.__jmp_start)
+        self.__segments = 0
+        self.__fed = 0
+        self.segments_done = 0
+        self.steps_done = 0
+
+    @property
+    def busy(self) -> bool:
+        return self.segments_done < self.__segments
+
+    def __feed(self):
+        # without DMA: fill the TX FIFO (8 words, joined) from the table
+        sm = self._sm
+        table = self.__table
+        while self.__fed < len(table) and sm.tx_fifo() < 8:
+            sm.put(table[self.__fed])
+            self.__fed += 1
+
+    def __on_segment_done(self, sm):
+        # hard IRQ: no allocation, the step counts stay small ints (CONTINUOUS never ends)
+        done = self.segments_done
+        if done < self.__segments:
+            self.steps_done += self.__table[2 * done] + 1
+            self.segments_done = done + 1
+        if self.__fed < len(self.__table):
+            self.__feed()
+
+    def deinit(self):
+        self.stop()
+        if self.__dma is not None:
+            self.__dma.close()
+            self.__dma = None
+        PIOAllocator.get_instance().release(self.__sm_id)
+
+
+def start_together(generators) -> None:
+    """
+    Starts loaded generators (see StepGenerator.load()). If they share a PIO block, one
+    register write enables them in the same clock cycle, otherwise they are started one
+    after the other.
+    """
+    block = -1
+    mask = 0
+    for gen in generators:
+        gen_block, index = divmod(gen.sm_id, 4)
+        if block not in (-1, gen_block):
+            mask = 0
+            break
+        block = gen_block
+        mask |= 1 << index
+    if mask and hasattr(machine, 'mem32'):
+        # SM_ENABLE (bits 0-3) together with CLKDIV_RESTART (bits 8-11) to align the dividers
+        machine.mem32[_PIO_BASE[block] + _CTRL_SET] = mask | mask << 8
+        return
+    for gen in generators:
+        gen._sm.active(1)
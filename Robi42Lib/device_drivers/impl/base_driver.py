@@ -1,7 +1,10 @@
 import machine
 
 class BaseDriver():
-    ...
+    def __init__(self) -> None:
+        # Ends the super().__init__() chain here. Drivers that also derive from a
+        # device class (e.g. the LCD HAL) initialize it explicitly.
+        pass
 
 class I2C_BaseDriver(BaseDriver):
     SUPPORTED_ADDRESSES = set()
@@ -11,8 +14,30 @@ class I2C_BaseDriver(BaseDriver):
         self.i2c_interface = i2c_interface
         self.i2c_addr = i2c_addr
 
+    @classmethod
+    async def create_async(cls, i2c_interface: machine.I2C, i2c_addr: int):
+        """
+        Creates the driver from a coroutine. Drivers that spend their initialization
+        sleeping override this and await the sleeps, so several devices can be brought
+        up concurrently.
+        """
+        return cls(i2c_interface, i2c_addr)
+
 class SPI_BaseDriver(BaseDriver):
-    def __init__(self, spi_interface: machine.SPI, cs_pin: machine.Pin) -> None:
+    def __init__(self, spi_interface: machine.SPI, cs_pin: machine.Pin, arbiter=None) -> None:
+        """
+        arbiter -- Optional BusArbiter of the SPI bus. Every CS-framed transfer then owns
+                   the bus, so a scheduled callback cannot split it.
+        """
         super().__init__()
         self.spi_interface = spi_interface
         self.cs_pin = cs_pin
+        self.arbiter = arbiter
+
+    def _acquire_bus(self) -> None:
+        if self.arbiter is not None:
+            self.arbiter.acquire()
+
+    def _release_bus(self) -> None:
+        if self.arbiter is not None:
+            self.arbiter.release()
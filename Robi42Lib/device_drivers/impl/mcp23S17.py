@@ -18,6 +18,16 @@ class MCP23S17(base_driver.SPI_BaseDriver):
     MCP23S17_IODIRB = 0x01
     MCP23S17_IPOLA = 0x02
     MCP23S17_IPOLB = 0x03
+    MCP23S17_GPINTENA = 0x04
+    MCP23S17_GPINTENB = 0x05
+    MCP23S17_DEFVALA = 0x06
+    MCP23S17_DEFVALB = 0x07
+    MCP23S17_INTCONA = 0x08
+    MCP23S17_INTCONB = 0x09
+    MCP23S17_INTFA = 0x0E
+    MCP23S17_INTFB = 0x0F
+    MCP23S17_INTCAPA = 0x10
+    MCP23S17_INTCAPB = 0x11
     MCP23S17_GPIOA = 0x12
     MCP23S17_GPIOB = 0x13
     MCP23S17_OLATA = 0x14
@@ -38,11 +48,15 @@ class MCP23S17(base_driver.SPI_BaseDriver):
     IOCON_BANK_MODE = 0x80
 
     IOCON_INIT = 0  # IOCON_BANK_MODE = 0, IOCON_HAEN = 0 address pins disabled
+    # IOCON_BANK_MODE = 0 keeps the A/B registers of a pair next to each other and
+    # IOCON_SEQOP = 0 lets the address pointer increment, so a pair can be accessed
+    # in one burst
+    IOCON_CONFIG = IOCON_HAEN
 
     MCP23S17_CMD_WRITE = 0x40
     MCP23S17_CMD_READ = 0x41
 
-    def __init__(self, spi_interface: SPI, cs: Pin, deviceID: int):
+    def __init__(self, spi_interface: SPI, cs: Pin, deviceID: int, arbiter=None):
         """
         Constructor
         Initializes all attributes with 0.
@@ -50,19 +64,31 @@ class MCP23S17(base_driver.SPI_BaseDriver):
         bus -- The SPI bus number
         ce -- The chip-enable number for the SPI
         deviceID -- The device ID of the component, i.e., the hardware address (default 0.0)
+        arbiter -- Optional BusArbiter shared by all devices on the SPI bus
         """
-        super().__init__(spi_interface, cs)
+        super().__init__(spi_interface, cs, arbiter)
         self._GPIOA = 0
         self._GPIOB = 0
         self._IODIRA = 0xFF
         self._IODIRB = 0xFF
         self._GPPUA = 0
         self._GPPUB = 0
+        self._IOCON = MCP23S17.IOCON_CONFIG
         self.is_initialized = False
         self.read_command = MCP23S17.MCP23S17_CMD_READ | (deviceID << 1)
         self.write_command = MCP23S17.MCP23S17_CMD_WRITE | (deviceID << 1)
         self.port_a_pullup_status = 0
         self.port_b_pullup_status = 0
+        # Pre-allocated transfer buffers: register accesses must not allocate, otherwise
+        # the control loop ends up in a GC pause sooner or later
+        self._reg_tx_buf = bytearray(3)
+        self._reg_rx_buf = bytearray(3)
+        self._word_tx_buf = bytearray(4)
+        self._word_rx_buf = bytearray(4)
+        # write elision statistics: hits are skipped bus writes, misses are writes
+        # that had to go to the bus although elision was requested
+        self.elision_hits = 0
+        self.elision_misses = 0
 
     def open(self):
         """
@@ -72,7 +98,13 @@ class MCP23S17(base_driver.SPI_BaseDriver):
         self.is_initialized = True
 
         self._write_register(MCP23S17.MCP23S17_IOCON, MCP23S17.IOCON_INIT)
-        self._write_register(MCP23S17.MCP23S17_IOCON, MCP23S17.IOCON_HAEN)
+        self._write_register(MCP23S17.MCP23S17_IOCON, MCP23S17.IOCON_CONFIG)
+
+        # The expander keeps its output latches across a soft reset of the Pico, so load
+        # the shadow registers from the chip. Write elision relies on them being correct.
+        olat = self._read_register_word(MCP23S17.MCP23S17_OLATA)
+        self._GPIOA = olat & 0xFF
+        self._GPIOB = olat >> 8
 
     def set_direction(self, pin: int, direction: bool):
         """
@@ -137,12 +169,13 @@ class MCP23S17(base_driver.SPI_BaseDriver):
             pin &= 0x07
             return (self._GPIOB & (1 << pin)) != 0
 
-    def digital_write(self, pin: int, level: bool):
+    def digital_write(self, pin: int, level: bool, elide: bool = False):
         """
         Sets the level of a given pin.
         Parameters:
         pin -- The pin idnex (0 - 15)
         level -- The logical level to be set (MCP23S17.LEVEL_LOW, MCP23S17.LEVEL_HIGH)
+        elide -- Skip the bus write if the shadow register already holds the level
         """
         assert self.is_initialized and pin < 16
 
@@ -155,6 +188,12 @@ class MCP23S17(base_driver.SPI_BaseDriver):
             noshifts = pin & 0b111
             data = self._GPIOB
 
+        if elide:
+            if ((data >> noshifts) & 1) == bool(level):
+                self.elision_hits += 1
+                return
+            self.elision_misses += 1
+
         if level:
             data |= 1 << noshifts
         else:
@@ -167,6 +206,61 @@ class MCP23S17(base_driver.SPI_BaseDriver):
         else:
             self._GPIOB = data
 
+    def get_elision_stats(self) -> tuple[int, int]:
+        """
+        Returns the number of elided (hits) and performed (misses) writes since
+        the last reset. Only writes that requested elision are counted.
+        """
+        return self.elision_hits, self.elision_misses
+
+    def reset_elision_stats(self):
+        self.elision_hits = 0
+        self.elision_misses = 0
+
+    def set_interrupt_on_change(self, mask, compare_mask=0, defval=0):
+        """
+        Configures interrupt-on-change for all pins.
+        Parameters:
+        mask -- 16-bit mask of the pins that raise an interrupt (GPINTEN)
+        compare_mask -- 16-bit mask of the pins compared against defval instead of their
+                        previous level (INTCON)
+        defval -- 16-bit default levels for the pins in compare_mask (DEFVAL)
+        """
+        assert self.is_initialized
+
+        self._write_register_word(MCP23S17.MCP23S17_DEFVALA, defval)
+        self._write_register_word(MCP23S17.MCP23S17_INTCONA, compare_mask)
+        self._write_register_word(MCP23S17.MCP23S17_GPINTENA, mask)
+
+    def set_interrupt_mirror(self, enable: bool):
+        """
+        Connects INTA and INTB internally, so either pin signals changes of both ports.
+        """
+        assert self.is_initialized
+
+        if enable:
+            self._IOCON |= MCP23S17.IOCON_MIRROR
+        else:
+            self._IOCON &= ~MCP23S17.IOCON_MIRROR
+        self._write_register(MCP23S17.MCP23S17_IOCON, self._IOCON)
+
+    def read_interrupt_flags(self):
+        """
+        Returns the 16-bit mask of the pins that caused the pending interrupt (INTF).
+        """
+        assert self.is_initialized
+
+        return self._read_register_word(MCP23S17.MCP23S17_INTFA)
+
+    def read_interrupt_capture(self):
+        """
+        Returns the 16-bit port levels captured when the interrupt occurred (INTCAP).
+        Reading the capture registers clears the interrupt.
+        """
+        assert self.is_initialized
+
+        return self._read_register_word(MCP23S17.MCP23S17_INTCAPA)
+
     def set_dir_PORTA(self, data):
         assert self.is_initialized
 
@@ -219,53 +313,186 @@ class MCP23S17(base_driver.SPI_BaseDriver):
         self._write_register(MCP23S17.MCP23S17_GPIOB, data)
         self._GPIOB = data
 
-    # def write_GPIO(self, data):
-    #     """Sets the data port value for all pins.
-    #     Parameters:
-    #     data - The 16-bit value to be set.
-    #     """
-    #     assert self.is_initialized
-
-    #     self._GPIOA = data & 0xFF
-    #     self._GPIOB = data >> 8
-    #     self._write_register_word(MCP23S17.MCP23S17_GPIOA, data)
-
-    # def read_GPIO(self):
-    #     """Reads the data port value of all pins.
-    #     Returns:
-    #      - The 16-bit data port value
-    #     """
-    #     assert self.is_initialized
-
-    #     data = self._read_register_word(MCP23S17.MCP23S17_GPIOA)
-    #     self._GPIOA = data & 0xFF
-    #     self._GPIOB = data >> 8
-    #     return data
+    def write_PORTA_masked(self, mask, level, elide: bool = False):
+        """
+        Sets all pins of port A selected by mask to the same level with a single
+        register write. The other pins keep the level held in the shadow register.
+        Parameters:
+        mask -- Bitmask of the pins to be changed
+        level -- The logical level to be set (MCP23S17.LEVEL_LOW, MCP23S17.LEVEL_HIGH)
+        elide -- Skip the bus write if the shadow register already holds the levels
+        """
+        data = self._GPIOA | mask if level else self._GPIOA & ~mask & 0xFF
+        if elide:
+            if data == self._GPIOA:
+                self.elision_hits += 1
+                return
+            self.elision_misses += 1
+        self.write_PORTA(data)
+
+    def write_PORTB_masked(self, mask, level, elide: bool = False):
+        """
+        Sets all pins of port B selected by mask to the same level with a single
+        register write. The other pins keep the level held in the shadow register.
+        Parameters:
+        mask -- Bitmask of the pins to be changed
+        level -- The logical level to be set (MCP23S17.LEVEL_LOW, MCP23S17.LEVEL_HIGH)
+        elide -- Skip the bus write if the shadow register already holds the levels
+        """
+        data = self._GPIOB | mask if level else self._GPIOB & ~mask & 0xFF
+        if elide:
+            if data == self._GPIOB:
+                self.elision_hits += 1
+                return
+            self.elision_misses += 1
+        self.write_PORTB(data)
+
+    def toggle_PORTA_masked(self, mask):
+        """
+        Inverts all pins of port A selected by mask with a single register write,
+        starting from the levels held in the shadow register.
+        """
+        self.write_PORTA(self._GPIOA ^ mask)
+
+    def toggle_PORTB_masked(self, mask):
+        """
+        Inverts all pins of port B selected by mask with a single register write,
+        starting from the levels held in the shadow register.
+        """
+        self.write_PORTB(self._GPIOB ^ mask)
+
+    def write_GPIO(self, data):
+        """Sets the data port value for all pins in one SPI transaction.
+        Parameters:
+        data - The 16-bit value to be set.
+        """
+        assert self.is_initialized
+
+        self._write_register_word(MCP23S17.MCP23S17_GPIOA, data)
+        self._GPIOA = data & 0xFF
+        self._GPIOB = data >> 8
+
+    def read_GPIO(self):
+        """Reads the data port value of all pins in one SPI transaction.
+        Returns:
+         - The 16-bit data port value
+        """
+        assert self.is_initialized
+
+        data = self._read_register_word(MCP23S17.MCP23S17_GPIOA)
+        self._GPIOA = data & 0xFF
+        self._GPIOB = data >> 8
+        return data
+
+    def write_GPIO_masked(self, mask, data, elide: bool = False):
+        """Sets the pins selected by the 16-bit mask to the matching bits of data,
+        leaving the other pins at the level held in the shadow registers.
+        Parameters:
+        mask - 16-bit mask of the pins to be changed
+        data - 16-bit value holding the new levels
+        elide - Skip the bus write if the shadow registers already hold the levels
+        """
+        current = (self._GPIOB << 8) | self._GPIOA
+        new = (current & ~mask & 0xFFFF) | (data & mask)
+        if elide:
+            if new == current:
+                self.elision_hits += 1
+                return
+            self.elision_misses += 1
+        self.write_GPIO(new)
+
+    def set_dir_GPIO(self, data):
+        """Sets the direction of all pins in one SPI transaction.
+        Parameters:
+        data - 16-bit value, a set bit configures the pin as input.
+        """
+        assert self.is_initialized
+
+        self._write_register_word(MCP23S17.MCP23S17_IODIRA, data)
+        self._IODIRA = data & 0xFF
+        self._IODIRB = data >> 8
+
+    def set_pullup_GPIO(self, data):
+        """Sets the pull-up configuration of all pins in one SPI transaction.
+        Parameters:
+        data - 16-bit value, a set bit enables the pull-up of the pin.
+        """
+        assert self.is_initialized
+
+        self._write_register_word(MCP23S17.MCP23S17_GPPUA, data)
+        self._GPPUA = self.port_a_pullup_status = data & 0xFF
+        self._GPPUB = self.port_b_pullup_status = data >> 8
 
     def _write_register(self, register, value):
         assert self.is_initialized
 
-        self.cs_pin.off()
-        self.spi_interface.write(bytearray([self.write_command, register, value]))
-        self.cs_pin.on()
+        tx = self._reg_tx_buf
+        tx[0] = self.write_command
+        tx[1] = register
+        tx[2] = value
+        self._acquire_bus()
+        try:
+            self.cs_pin.off()
+            self.spi_interface.write(tx)
+            self.cs_pin.on()
+        finally:
+            self._release_bus()
 
     def _read_register(self, register):
         assert self.is_initialized
 
-        self.cs_pin.off()
-        self.spi_interface.write(bytearray([self.read_command, register]))
-        data = self.spi_interface.read(1)
-        self.cs_pin.on()
-        return data[0]
+        tx = self._reg_tx_buf
+        tx[0] = self.read_command
+        tx[1] = register
+        tx[2] = 0
+        self._acquire_bus()
+        try:
+            self.cs_pin.off()
+            self.spi_interface.write_readinto(tx, self._reg_rx_buf)
+            self.cs_pin.on()
+        finally:
+            self._release_bus()
+        return self._reg_rx_buf[2]
 
     def _read_register_word(self, register):
+        """
+        Reads register and register + 1 in one CS-framed burst. Relies on the
+        sequential operation mode, so the address pointer moves from the A to the
+        B register of the pair.
+        """
         assert self.is_initialized
 
-        buffer = [self._read_register(register), self._read_register(register + 1)]
-        return (buffer[1] << 8) | buffer[0]
+        tx = self._word_tx_buf
+        rx = self._word_rx_buf
+        tx[0] = self.read_command
+        tx[1] = register
+        tx[2] = 0
+        tx[3] = 0
+        self._acquire_bus()
+        try:
+            self.cs_pin.off()
+            self.spi_interface.write_readinto(tx, rx)
+            self.cs_pin.on()
+        finally:
+            self._release_bus()
+        return (rx[3] << 8) | rx[2]
 
     def _write_register_word(self, register, data):
+        """
+        Writes the low byte to register and the high byte to register + 1 in one
+        CS-framed burst (sequential operation mode).
+        """
         assert self.is_initialized
 
-        self._write_register(register, data & 0xFF)
-        self._write_register(register + 1, data >> 8)
+        tx = self._word_tx_buf
+        tx[0] = self.write_command
+        tx[1] = register
+        tx[2] = data & 0xFF
+        tx[3] = (data >> 8) & 0xFF
+        self._acquire_bus()
+        try:
+            self.cs_pin.off()
+            self.spi_interface.write(tx)
+            self.cs_pin.on()
+        finally:
+            self._release_bus()
@@ -16,19 +16,24 @@ import machine
 
 class MCP3008(base_driver.SPI_BaseDriver):
 
-    def __init__(self, spi_interface: machine.SPI, cs_pin: machine.Pin) -> None:
+    def __init__(self, spi_interface: machine.SPI, cs_pin: machine.Pin, arbiter=None) -> None:
         """
         Create MCP3008 instance
         Args:
             spi: configured SPI bus
             cs:  pin to use for chip select
             ref_voltage: r
+            arbiter: optional BusArbiter of the SPI bus
         """
-        super().__init__(spi_interface, cs_pin)
+        super().__init__(spi_interface, cs_pin, arbiter)
         self.cs_pin.value(1) # ncs on
         self._out_buf = bytearray(3)
         self._out_buf[0] = 0x01
         self._in_buf = bytearray(3)
+        self._scan_channels = None
+        self._scan_tx = None
+        self._scan_rx = None
+        self._scan_rx_buf = None
 
     def read(self, pin, is_differential=False):
         """
@@ -40,8 +45,61 @@ class MCP3008(base_driver.SPI_BaseDriver):
             voltage in range [0, 1023] where 1023 = VREF (3V3)
         """
 
-        self.cs_pin.value(0)  # select
         self._out_buf[1] = ((not is_differential) << 7) | (pin << 4)
-        self.spi_interface.write_readinto(self._out_buf, self._in_buf)
-        self.cs_pin.value(1)  # turn off
+        self._acquire_bus()
+        try:
+            self.cs_pin.value(0)  # select
+            self.spi_interface.write_readinto(self._out_buf, self._in_buf)
+            self.cs_pin.value(1)  # turn off
+        finally:
+            self._release_bus()
         return ((self._in_buf[1] & 0x03) << 8) | self._in_buf[2]
+
+    def _prepare_scan(self, channels):
+        # one command block per channel in a shared buffer, sliced once so that scan()
+        # itself does not allocate
+        count = len(channels)
+        tx_buf = bytearray(3 * count)
+        rx_buf = bytearray(3 * count)
+        tx_view = memoryview(tx_buf)
+        rx_view = memoryview(rx_buf)
+        for i, pin in enumerate(channels):
+            tx_buf[3 * i] = 0x01
+            tx_buf[3 * i + 1] = (1 << 7) | (pin << 4)
+        self._scan_tx = [tx_view[3 * i:3 * i + 3] for i in range(count)]
+        self._scan_rx = [rx_view[3 * i:3 * i + 3] for i in range(count)]
+        self._scan_rx_buf = rx_buf
+        self._scan_channels = channels
+
+    def scan(self, channels, out):
+        """
+        Samples several single-ended channels back to back.
+        Args:
+            channels: tuple of pins to sample. The transfer buffers are built when a new
+                      tuple is passed and reused as long as the same tuple object is
+                      passed again, so keep it around.
+            out: buffer (e.g. array('H')) receiving one value per channel
+        Returns:
+            out
+        The MCP3008 starts a conversion on the falling edge of CS, so every channel still
+        needs its own CS frame.
+        """
+        if channels is not self._scan_channels:
+            self._prepare_scan(channels)
+        spi = self.spi_interface
+        cs = self.cs_pin
+        tx = self._scan_tx
+        rx = self._scan_rx
+        # the whole scan is one transaction, the channels are sampled back to back
+        self._acquire_bus()
+        try:
+            for i in range(len(tx)):
+                cs.value(0)
+                spi.write_readinto(tx[i], rx[i])
+                cs.value(1)
+        finally:
+            self._release_bus()
+        rx_buf = self._scan_rx_buf
+        for i in range(len(tx)):
+            out[i] = ((rx_buf[3 * i + 1] & 0x03) << 8) | rx_buf[3 * i + 2]
+        return out
@@ -3,6 +3,7 @@
 
 from utime import sleep_ms
 from machine import I2C
+from uasyncio import sleep_ms as sleep_ms_async
 from Robi42Lib.device_drivers.impl import base_driver
 from ...abstract.vector3d import Vector3d
 
@@ -35,8 +36,10 @@ class MPU6050(base_driver.I2C_BaseDriver):
     _I2Cerror = "I2C failure when communicating with IMU"
     SUPPORTED_ADDRESSES = {0x68}
 
+    SETTLE_MS = 200
+
     def __init__(
-        self, i2c_interface: I2C, i2c_addr, transposition=(0, 1, 2), scaling=(1, 1, 1)
+        self, i2c_interface: I2C, i2c_addr, transposition=(0, 1, 2), scaling=(1, 1, 1), settle_ms=SETTLE_MS
     ):
 
         super().__init__(i2c_interface, i2c_addr)
@@ -48,7 +51,7 @@ class MPU6050(base_driver.I2C_BaseDriver):
         self.buf3 = bytearray(3)
         self.buf6 = bytearray(6)
 
-        sleep_ms(200)  # Ensure PSU and device have settled
+        sleep_ms(settle_ms)  # Ensure PSU and device have settled
 
         # Can communicate with chip. Set it up.
         self.wake()  # wake it up
@@ -56,6 +59,11 @@ class MPU6050(base_driver.I2C_BaseDriver):
         self.accel_range = 0  # default to the highest sensitivity
         self.gyro_range = 0  # Likewise for gyro
 
+    @classmethod
+    async def create_async(cls, i2c_interface: I2C, i2c_addr: int):
+        await sleep_ms_async(cls.SETTLE_MS)  # Ensure PSU and device have settled
+        return cls(i2c_interface, i2c_addr, settle_ms=0)
+
     # read from device
     def _read(
         self, buf, memaddr, addr
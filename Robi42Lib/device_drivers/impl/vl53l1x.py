@@ -1,6 +1,7 @@
 # Stolen from https://github.com/drakxtwo/vl53l1x_pico
 
 import machine
+from uasyncio import sleep_ms as sleep_ms_async
 
 VL51L1X_DEFAULT_CONFIGURATION = bytes([
 0x00, # 0x2d : set bit 2 and 5 to 1 for fast plus mode (1MHz I2C), else don't touch */
@@ -99,11 +100,25 @@ class VL53L1X:
 
     SUPPORTED_ADDRESSES = {0x29}
 
-    def __init__(self,i2c, address=0x29):
+    def __init__(self,i2c, address=0x29, init=True):
         self.i2c = i2c
         self.address = address
-        self.reset()
-        machine.lightsleep(1)
+        if init:
+            self.reset()
+            machine.lightsleep(1)
+            self._configure()
+            machine.lightsleep(200)
+
+    async def init_async(self):
+        """Same as the initialization in the constructor (init=True), but awaits the sleeps."""
+        self.writeReg(0x0000, 0x00)
+        await sleep_ms_async(100)
+        self.writeReg(0x0000, 0x01)
+        await sleep_ms_async(1)
+        self._configure()
+        await sleep_ms_async(200)
+
+    def _configure(self):
         if self.read_model_id() != 0xEACC:
             raise RuntimeError('Failed to find expected ID register values. Check wiring!')
         # write default configuration
@@ -112,7 +127,6 @@ class VL53L1X:
         # the API triggers this change in VL53L1_init_and_start_range() once a
         # measurement is started; assumes MM1 and MM2 are disabled
         self.writeReg16Bit(0x001E, self.readReg16Bit(0x0022) * 4)
-        machine.lightsleep(200)
 
     def writeReg(self, reg, value):
         return self.i2c.writeto_mem(self.address, reg, bytes([value]), addrsize=16)
@@ -6,13 +6,25 @@ class VL53LXX(base_driver.I2C_BaseDriver):
 
     SUPPORTED_ADDRESSES = vl53l0x.VL53L0X.SUPPORTED_ADDRESSES | vl53l1x.VL53L1X.SUPPORTED_ADDRESSES
 
-    def __init__(self, i2c: machine.I2C, address: int):
+    def __init__(self, i2c: machine.I2C, address: int, impl=None):
         super().__init__(i2c, address)
+        if impl is not None:
+            self._impl = impl
+            return
         try:
             self._impl = vl53l0x.VL53L0X(i2c, address)
         except vl53l0x.TimeoutError:
             self._impl = vl53l1x.VL53L1X(i2c, address)
 
+    @classmethod
+    async def create_async(cls, i2c: machine.I2C, address: int):
+        try:
+            impl = vl53l0x.VL53L0X(i2c, address)
+        except vl53l0x.TimeoutError:
+            impl = vl53l1x.VL53L1X(i2c, address, init=False)
+            await impl.init_async()
+        return cls(i2c, address, impl)
+
     def measure_distance(self) -> int:
         distance: int
         if isinstance(self._impl, vl53l0x.VL53L0X):
@@ -0,0 +1,167 @@
+from array import array
+
+from machine import Timer
+
+from ..device_drivers.impl import mcp3008 as drv_mcp3008
+from .bus_arbiter import BusArbiter, BusBusyError
+
+
+class AnalogSampler():
+    """
+    Samples MCP3008 channels in the background at a fixed rate.
+
+    Every timer tick converts all channels once. `oversampling` consecutive samples of a
+    channel are averaged into one value (decimation), which becomes the channel's latest
+    value and is appended to the channel's ring buffer of `history` entries. While the
+    sampler runs, AnalogBoardPin.read_raw() returns the latest value of a sampled channel
+    without touching the bus, other channels are still converted on demand.
+    """
+
+    def __init__(self, adc: drv_mcp3008.MCP3008) -> None:
+        self.__adc = adc
+        self.__timer = None
+        self.__channels = ()
+        self.__oversampling = 1
+        self.__history_len = 0
+        self.__period_ms = 0
+        self.__scan_buf = array('H')
+        self.__acc = array('I')
+        self.__acc_count = 0
+        self.__latest = array('H', [0] * 8)
+        self.__history = array('H')
+        self.__history_idx = 0
+        self.__history_count = 0
+        # timer ticks dropped because the bus was in use
+        self.skipped_samples = 0
+
+    def start(self, period_ms: int = 10, oversampling: int = 4, history: int = 16, channels: tuple = tuple(range(8))):
+        """
+        Every tick converts each channel with a 3 byte SPI transfer at 1 MHz plus the
+        interpreter overhead, an estimated 0.5-1 ms for all 8 channels on the Pico, and
+        holds the SPI arbiter meanwhile. The default period keeps that below about 10%
+        of the CPU and the bus; shorter periods or fewer channels trade that against
+        fresher values.
+        Parameters:
+        period_ms -- Timer period, every period converts all channels once
+        oversampling -- Number of samples averaged into one value
+        history -- Number of values kept per channel
+        channels -- MCP3008 channels to sample
+        """
+        assert oversampling > 0 and history > 0
+        self.stop()
+        count = len(channels)
+        self.__channels = tuple(channels)
+        self.__oversampling = oversampling
+        self.__history_len = history
+        self.__period_ms = period_ms
+        self.__scan_buf = array('H', [0] * count)
+        self.__acc = array('I', [0] * count)
+        self.__acc_count = 0
+        self.__history = array('H', [0] * (count * history))
+        self.__history_idx = 0
+        self.__history_count = 0
+
+        # start with a real value instead of 0 until the first decimation is done
+        self.__adc.scan(self.__channels, self.__scan_buf)
+        for i, channel in enumerate(self.__channels):
+            self.__latest[channel] = self.__scan_buf[i]
+
+        self.__timer = Timer(-1)
+        self.__timer.init(period=period_ms, mode=Timer.PERIODIC, callback=self.__on_timer)
+
+    def stop(self):
+        if self.__timer is not None:
+            self.__timer.deinit()
+            self.__timer = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.__timer is not None
+
+    def is_sampling(self, channel: int) -> bool:
+        """True if the sampler runs and has the channel in its set."""
+        return self.__timer is not None and channel in self.__channels
+
+    @property
+    def output_rate_hz(self) -> float:
+        """Rate at which new filtered values are produced."""
+        return 1000 / (self.__period_ms * self.__oversampling)
+
+    def sample(self):
+        """
+        Converts all channels once. Called by the timer.
+        """
+        buf = self.__adc.scan(self.__channels, self.__scan_buf)
+        acc = self.__acc
+        count = len(buf)
+        for i in range(count):
+            acc[i] += buf[i]
+        self.__acc_count += 1
+        if self.__acc_count < self.__oversampling:
+            return
+
+        oversampling = self.__oversampling
+        latest = self.__latest
+        history = self.__history
+        offset = self.__history_idx * count
+        channels = self.__channels
+        for i in range(count):
+            value = acc[i] // oversampling
+            acc[i] = 0
+            latest[channels[i]] = value
+            history[offset + i] = value
+        self.__acc_count = 0
+        self.__history_idx += 1
+        if self.__history_idx == self.__history_len:
+            self.__history_idx = 0
+        if self.__history_count < self.__history_len:
+            self.__history_count += 1
+
+    def __on_timer(self, timer: Timer):
+        # A tick that would interrupt a transaction on the bus is skipped, it only delays
+        # the next filtered value.
+        arbiter = self.__adc.arbiter
+        if arbiter is not None:
+            try:
+                arbiter.acquire(BusArbiter.PRIORITY_CONTROL, False)
+            except BusBusyError:
+                self.skipped_samples += 1
+                return
+        try:
+            self.sample()
+        finally:
+            if arbiter is not None:
+                arbiter.release()
+
+    def latest(self, channel: int) -> int:
+        """
+        Returns the latest filtered value of a channel. O(1), no bus access, if the
+        channel is sampled (see is_sampling()), otherwise it is converted now.
+        """
+        if not self.is_sampling(channel):
+            return self.__adc.read(channel)
+        return self.__latest[channel]
+
+    def scan(self, channels: tuple, out):
+        """
+        Same as MCP3008.scan(), but returns the latest filtered values of the sampled
+        channels without touching the bus, only the others are converted.
+        """
+        if self.__timer is None:
+            return self.__adc.scan(channels, out)
+        latest = self.__latest
+        sampled = self.__channels
+        for i in range(len(channels)):
+            channel = channels[i]
+            out[i] = latest[channel] if channel in sampled else self.__adc.read(channel)
+        return out
+
+    def get_history(self, channel: int) -> list[int]:
+        """Returns the buffered filtered values of a channel, oldest first."""
+        idx = self.__channels.index(channel)
+        count = len(self.__channels)
+        start = self.__history_idx - self.__history_count
+        return [
+            self.__history[((start + i) % self.__history_len) * count + idx]
+            for i in range(self.__history_count)
+        ]
@@ -0,0 +1,251 @@
+import time
+import _thread
+from array import array
+
+import micropython
+
+
+class BusBusyError(RuntimeError):
+    """
+    Raised by a non-blocking acquire if the bus is in use. Timer and scheduler callbacks
+    interrupt the main thread, so they cannot wait for a transaction of the code they
+    interrupted; they acquire without blocking and skip or retry later instead (see
+    callback()).
+    """
+
+    def __init__(self, arbiter: 'BusArbiter') -> None:
+        super().__init__('Bus \'{}\' is in use'.format(arbiter.name))
+        self.arbiter = arbiter
+
+
+# thread running a callback wrapped with callback() and the nesting depth, while it runs
+# every acquire of that thread is non-blocking
+_callback_ident = None
+_callback_depth = 0
+
+
+def callback(func, defer: bool = True):
+    """
+    Wraps a timer or scheduler callback that uses buses through the modules, e.g.
+
+        timer.init(period=100, callback=bus_arbiter.callback(self.on_tick))
+
+    The callback runs on the thread it interrupted, which may be in the middle of a
+    transaction on the same bus. Inside the wrapper all acquires are non-blocking, so the
+    callback never re-enters that transaction: a bus in use raises BusBusyError, which
+    ends the callback. With defer it is run again through micropython.schedule() once
+    the bus is released (at most once per release), otherwise that run is skipped.
+    """
+    def wrapper(arg):
+        global _callback_ident, _callback_depth
+        ident = _thread.get_ident()
+        if _callback_depth == 0:
+            _callback_ident = ident
+        elif _callback_ident != ident:
+            # another thread is in a callback, this one waits for its buses as usual
+            return func(arg)
+        _callback_depth += 1
+        try:
+            return func(arg)
+        except BusBusyError as e:
+            if defer:
+                e.arbiter.defer(wrapper, arg)
+        finally:
+            _callback_depth -= 1
+            if _callback_depth == 0:
+                _callback_ident = None
+
+    return wrapper
+
+
+class _Transaction():
+    """Context manager returned by BusArbiter.transaction()."""
+
+    def __init__(self, arbiter: 'BusArbiter', priority: int, blocking: bool) -> None:
+        self.__arbiter = arbiter
+        self.__priority = priority
+        self.__blocking = blocking
+
+    def __enter__(self):
+        self.__arbiter.acquire(self.__priority, self.__blocking)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__arbiter.release()
+
+
+class BusArbiter():
+    """
+    Serializes the transactions on one bus.
+
+    If several threads wait for the bus, the one with the highest priority (lowest value)
+    gets it next, so control loop reads overtake bulk transfers. A transaction that
+    already owns the bus is never interrupted, bulk transfers are therefore split into
+    short transactions (e.g. one LCD character or EEPROM page each).
+
+    With stats_enabled, keeps the number of transactions, the time the bus was owned and
+    a histogram of the time spent waiting for it. That is off by default, every register
+    access of the SPI expanders goes through acquire() and release().
+    """
+
+    PRIORITY_CONTROL = 0  # e.g. gyro and distance readings in the control loop
+    PRIORITY_NORMAL = 1
+    PRIORITY_BULK = 2  # e.g. LCD text, EEPROM pages, discovery
+
+    # upper bounds of the wait time histogram buckets in us, the last bucket is open
+    WAIT_BUCKETS_US = (10, 100, 1000, 10000)
+
+    def __init__(self, name: str, stats_enabled: bool = False) -> None:
+        self.name = name
+        self.stats_enabled = stats_enabled
+        self.__state_lock = _thread.allocate_lock()
+        self.__busy = False
+        self.__owner = None
+        self.__depth = 0
+        self.__waiting = array('H', [0, 0, 0])
+        self.__deferred = []  # (func, arg) of callbacks refused the bus, see defer()
+        self.__acquired_us = 0
+        self.transactions = 0
+        self.busy_us = 0
+        self.wait_histogram = array('I', [0] * (len(self.WAIT_BUCKETS_US) + 1))
+        self.__stats_start_us = time.ticks_us()
+
+    def __higher_priority_waiting(self, priority: int) -> bool:
+        for p in range(priority):
+            if self.__waiting[p]:
+                return True
+        return False
+
+    def acquire(self, priority: int = PRIORITY_NORMAL, blocking: bool = True) -> None:
+        """
+        Takes the bus. The owning thread may acquire it again (nested calls), every
+        acquire needs a matching release().
+        blocking -- If False, raise BusBusyError instead of waiting, also if the bus is
+                    owned by the calling thread. Must be used from timer and scheduler
+                    callbacks: they run on the thread they interrupted, so a nested
+                    acquire cannot tell them from a nested call. Callbacks wrapped with
+                    callback() get that for all their acquires.
+        """
+        ident = _thread.get_ident()
+        if _callback_depth and ident == _callback_ident:
+            blocking = False
+        start = time.ticks_us() if self.stats_enabled else 0
+        registered = False
+        while True:
+            # The state lock is only held for a few statements. A callback still must
+            # not wait for it, the interrupted code may be the one holding it.
+            if not self.__state_lock.acquire(1 if blocking else 0):
+                raise BusBusyError(self)
+            try:
+                if self.__busy and self.__owner == ident:
+                    if not blocking:
+                        # a callback interrupted the transaction of its own thread
+                        raise BusBusyError(self)
+                    self.__depth += 1
+                    return
+                if not self.__busy and not self.__higher_priority_waiting(priority):
+                    self.__busy = True
+                    self.__owner = ident
+                    self.__depth = 1
+                    if registered:
+                        self.__waiting[priority] -= 1
+                    break
+                if not blocking:
+                    raise BusBusyError(self)
+                if not registered:
+                    self.__waiting[priority] += 1
+                    registered = True
+            finally:
+                self.__state_lock.release()
+            time.sleep_us(20)
+
+        if not self.stats_enabled:
+            return
+        now = time.ticks_us()
+        self.__acquired_us = now
+        waited = time.ticks_diff(now, start)
+        bucket = 0
+        for bound in self.WAIT_BUCKETS_US:
+            if waited < bound:
+                break
+            bucket += 1
+        self.wait_histogram[bucket] += 1
+
+    def release(self) -> None:
+        with self.__state_lock:
+            self.__depth -= 1
+            if self.__depth > 0:
+                return
+            if self.stats_enabled:
+                self.busy_us += time.ticks_diff(time.ticks_us(), self.__acquired_us)
+                self.transactions += 1
+            self.__owner = None
+            self.__busy = False
+            deferred = self.__deferred
+            if not deferred:
+                return
+            self.__deferred = []
+        for func, arg in deferred:
+            try:
+                micropython.schedule(func, arg)
+            except RuntimeError:
+                pass  # the schedule queue is full, the run is skipped
+
+    def defer(self, func, arg) -> None:
+        """
+        Runs func(arg) through micropython.schedule() when the bus is released next, for
+        callbacks that found it in use. A callback already waiting is not added twice.
+        """
+        if not self.__state_lock.acquire(0):
+            return  # the interrupted code is changing the state, skip this run
+        try:
+            if not self.__busy:
+                micropython.schedule(func, arg)
+                return
+            for entry in self.__deferred:
+                if entry[0] is func:
+                    return
+            self.__deferred.append((func, arg))
+        except RuntimeError:
+            pass  # the schedule queue is full
+        finally:
+            self.__state_lock.release()
+
+    def transaction(self, priority: int = PRIORITY_NORMAL, blocking: bool = True) -> _Transaction:
+        """
+        Returns a context manager owning the bus:
+            with arbiter.transaction(BusArbiter.PRIORITY_CONTROL):
+                ...
+        """
+        return _Transaction(self, priority, blocking)
+
+    @property
+    def utilization(self) -> float:
+        """Share of the time since the last reset the bus was owned, 0 to 1."""
+        elapsed = time.ticks_diff(time.ticks_us(), self.__stats_start_us)
+        return self.busy_us / elapsed if elapsed > 0 else 0
+
+    def reset_stats(self) -> None:
+        """Restarts the statistics, call it after setting stats_enabled."""
+        self.transactions = 0
+        self.busy_us = 0
+        for i in range(len(self.wait_histogram)):
+            self.wait_histogram[i] = 0
+        self.__stats_start_us = time.ticks_us()
+
+    def get_stats(self) -> dict:
+        return {
+            'name': self.name,
+            'transactions': self.transactions,
+            'busy_us': self.busy_us,
+            'utilization': self.utilization,
+            'wait_histogram': list(self.wait_histogram),
+        }
+
+    def print_stats(self) -> None:
+        print(f"Bus {self.name}: {self.transactions} transactions, {self.utilization * 100:.1f}% busy")
+        lower = 0
+        for i, bound in enumerate(self.WAIT_BUCKETS_US):
+            print(f"\twait {lower}-{bound}us: {self.wait_histogram[i]}")
+            lower = bound
+        print(f"\twait >={lower}us: {self.wait_histogram[-1]}")
@@ -0,0 +1,291 @@
+import time
+import json
+from array import array
+
+
+class ProfiledBus():
+    """
+    Stand-in for an I2C or SPI object that counts the transactions on it.
+
+    The transfer methods are instance attributes: while profiling is off they are the
+    bound methods of the real bus, so a call costs the same as calling the bus directly.
+    While profiling is on they point to the counting wrappers below. Everything else is
+    forwarded to the real bus.
+    """
+
+    I2C_METHODS = ('scan', 'writeto', 'writevto', 'readfrom', 'readfrom_into',
+                   'writeto_mem', 'readfrom_mem', 'readfrom_mem_into')
+    SPI_METHODS = ('write', 'read', 'readinto', 'write_readinto')
+
+    def __init__(self, bus, name: str, profiler: 'BusProfiler') -> None:
+        self.name = name
+        self.__bus = bus
+        self.__profiler = profiler
+        self.__methods = [m for m in self.I2C_METHODS + self.SPI_METHODS if hasattr(bus, m)]
+        self.totals = array('I', [0, 0, 0])
+        self.by_caller = {}  # caller label -> array('I', [transactions, bytes, time_us])
+        self.set_profiling(False)
+
+    @property
+    def bus(self):
+        return self.__bus
+
+    def __getattr__(self, name):
+        return getattr(self.__bus, name)
+
+    def set_profiling(self, enabled: bool) -> None:
+        source = self if enabled else self.__bus
+        prefix = '_profiled_' if enabled else ''
+        for name in self.__methods:
+            setattr(self, name, getattr(source, prefix + name))
+
+    def reset(self) -> None:
+        for i in range(3):
+            self.totals[i] = 0
+        self.by_caller = {}
+
+    def __record(self, start_us: int, nbytes: int) -> None:
+        elapsed = time.ticks_diff(time.ticks_us(), start_us)
+        caller = self.__profiler.caller
+        counters = self.by_caller.get(caller)
+        if counters is None:
+            counters = self.by_caller[caller] = array('I', [0, 0, 0])
+        for c in (self.totals, counters):
+            c[0] += 1
+            c[1] += nbytes
+            c[2] += elapsed
+
+    # --- I2C ---
+
+    def _profiled_scan(self):
+        start = time.ticks_us()
+        found = self.__bus.scan()
+        self.__record(start, 0)
+        return found
+
+    def _profiled_writeto(self, addr, buf, stop=True):
+        start = time.ticks_us()
+        result = self.__bus.writeto(addr, buf, stop)
+        self.__record(start, len(buf))
+        return result
+
+    def _profiled_writevto(self, addr, vector, stop=True):
+        start = time.ticks_us()
+        result = self.__bus.writevto(addr, vector, stop)
+        nbytes = 0
+        for buf in vector:
+            nbytes += len(buf)
+        self.__record(start, nbytes)
+        return result
+
+    def _profiled_readfrom(self, addr, nbytes, stop=True):
+        start = time.ticks_us()
+        result = self.__bus.readfrom(addr, nbytes, stop)
+        self.__record(start, nbytes)
+        return result
+
+    def _profiled_readfrom_into(self, addr, buf, stop=True):
+        start = time.ticks_us()
+        self.__bus.readfrom_into(addr, buf, stop)
+        self.__record(start, len(buf))
+
+    def _profiled_writeto_mem(self, addr, memaddr, buf, *, addrsize=8):
+        start = time.ticks_us()
+        self.__bus.writeto_mem(addr, memaddr, buf, addrsize=addrsize)
+        self.__record(start, addrsize // 8 + len(buf))
+
+    def _profiled_readfrom_mem(self, addr, memaddr, nbytes, *, addrsize=8):
+        start = time.ticks_us()
+        result = self.__bus.readfrom_mem(addr, memaddr, nbytes, addrsize=addrsize)
+        self.__record(start, addrsize // 8 + nbytes)
+        return result
+
+    def _profiled_readfrom_mem_into(self, addr, memaddr, buf, *, addrsize=8):
+        start = time.ticks_us()
+        self.__bus.readfrom_mem_into(addr, memaddr, buf, addrsize=addrsize)
+        self.__record(start, addrsize // 8 + len(buf))
+
+    # --- SPI ---
+
+    def _profiled_write(self, buf):
+        start = time.ticks_us()
+        self.__bus.write(buf)
+        self.__record(start, len(buf))
+
+    def _profiled_read(self, nbytes, write=0x00):
+        start = time.ticks_us()
+        result = self.__bus.read(nbytes, write)
+        self.__record(start, nbytes)
+        return result
+
+    def _profiled_readinto(self, buf, write=0x00):
+        start = time.ticks_us()
+        self.__bus.readinto(buf, write)
+        self.__record(start, len(buf))
+
+    def _profiled_write_readinto(self, write_buf, read_buf):
+        start = time.ticks_us()
+        self.__bus.write_readinto(write_buf, read_buf)
+        self.__record(start, len(write_buf))
+
+
+class BusProfiler():
+    """
+    Counts transactions, bytes and time per bus and attributes them to the module API
+    call that caused them (e.g. 'lcd.put_str').
+
+    The platform wraps its buses with wrap() when it creates them. Profiling is off by
+    default and can be switched at runtime:
+
+        profiler = BusProfiler.get_instance()
+        profiler.enable(robi)   # robi: Robi42 whose modules are attributed
+        robi.lcd.put_str('hello')
+        profiler.print_report()
+
+    Attribution wraps the public methods of the loaded modules (and of their public
+    helper objects like robi.motors.left) while profiling is on; modules loaded later are
+    wrapped when they are loaded. Transactions outside of such a call, e.g. from a timer
+    callback, are counted as OTHER. Nested calls count for the outermost one.
+    """
+
+    __INSTANCE = None
+    __INIT_TOKEN = object()
+
+    OTHER = 'other'
+
+    @classmethod
+    def get_instance(cls) -> 'BusProfiler':
+        if cls.__INSTANCE is None:
+            cls.__INSTANCE = cls(cls.__INIT_TOKEN)
+        return cls.__INSTANCE
+
+    def __init__(self, init_token: object) -> None:
+        if init_token != self.__INIT_TOKEN:
+            raise RuntimeError('Cannot explicitly instantiate singleton class. ')
+        self.enabled = False
+        self.caller = self.OTHER
+        self.__buses = []
+        self.__instrumented = []  # (object, attribute) pairs shadowed by a wrapper
+        self.__start_us = time.ticks_us()
+
+    def wrap(self, bus, name: str) -> ProfiledBus:
+        """Returns a ProfiledBus for bus, to be used instead of it."""
+        profiled = ProfiledBus(bus, name, self)
+        profiled.set_profiling(self.enabled)
+        self.__buses.append(profiled)
+        return profiled
+
+    @property
+    def buses(self) -> list:
+        return list(self.__buses)
+
+    def enable(self, *robis) -> None:
+        """Starts counting. The loaded modules of the given Robi42 objects are attributed."""
+        for robi in robis:
+            for name in robi.loaded_modules:
+                self.instrument(getattr(robi, name), name)
+        if not self.enabled:
+            self.enabled = True
+            for bus in self.__buses:
+                bus.set_profiling(True)
+
+    def disable(self) -> None:
+        """Stops counting and removes all wrappers, the counts are kept."""
+        self.enabled = False
+        for bus in self.__buses:
+            bus.set_profiling(False)
+        for obj, name in self.__instrumented:
+            delattr(obj, name)
+        self.__instrumented = []
+        self.caller = self.OTHER
+
+    def reset(self) -> None:
+        for bus in self.__buses:
+            bus.reset()
+        self.__start_us = time.ticks_us()
+
+    # --- attribution ---
+
+    def __attributed(self, method, label: str):
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            outer = profiler.caller
+            if outer is BusProfiler.OTHER:
+                profiler.caller = label
+            try:
+                return method(*args, **kwargs)
+            finally:
+                profiler.caller = outer
+
+        return wrapper
+
+    def __instrument_methods(self, obj, label: str) -> bool:
+        cls = type(obj)
+        wrapped = False
+        for name in dir(cls):
+            if name.startswith('_') or name in obj.__dict__:
+                continue
+            attr = getattr(cls, name)
+            # properties are not callable, classes are not methods
+            if not callable(attr) or isinstance(attr, type):
+                continue
+            setattr(obj, name, self.__attributed(getattr(obj, name), label + '.' + name))
+            self.__instrumented.append((obj, name))
+            wrapped = True
+        return wrapped
+
+    def instrument(self, module, label: str) -> None:
+        """
+        Attributes the bus traffic of module's public methods to 'label.method'. Public
+        attributes holding helper objects (motors.left, leds.all, ...) are included.
+        """
+        for obj, _ in self.__instrumented:
+            if obj is module:
+                return
+        helpers = [(name, value) for name, value in module.__dict__.items()
+                   if not name.startswith('_') and hasattr(value, '__dict__')
+                   and not isinstance(value, type)]
+        self.__instrument_methods(module, label)
+        for name, helper in helpers:
+            try:
+                self.__instrument_methods(helper, label + '.' + name)
+            except (AttributeError, TypeError):
+                pass  # objects of native classes cannot be wrapped
+
+    # --- report ---
+
+    def get_stats(self) -> dict:
+        buses = {}
+        for bus in self.__buses:
+            callers = {}
+            for caller, counters in bus.by_caller.items():
+                callers[caller] = {'transactions': counters[0], 'bytes': counters[1], 'time_us': counters[2]}
+            buses[bus.name] = {
+                'transactions': bus.totals[0],
+                'bytes': bus.totals[1],
+                'time_us': bus.totals[2],
+                'by_caller': callers,
+            }
+        return {
+            'enabled': self.enabled,
+            'elapsed_us': time.ticks_diff(time.ticks_us(), self.__start_us),
+            'buses': buses,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.get_stats())
+
+    def save_json(self, path: str) -> None:
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+
+    def print_report(self) -> None:
+        stats = self.get_stats()
+        print(f"Bus profile over {stats['elapsed_us'] / 1000:.1f}ms")
+        for name, bus in stats['buses'].items():
+            print(f"Bus {name}: {bus['transactions']} transactions, {bus['bytes']} bytes, {bus['time_us']}us")
+            callers = sorted(bus['by_caller'].items(), key=lambda item: -item[1]['time_us'])
+            for caller, counters in callers:
+                print(f"\t{caller}: {counters['transactions']} transactions, "
+                      f"{counters['bytes']} bytes, {counters['time_us']}us")
@@ -0,0 +1,59 @@
+import time
+
+
+class LazyDriver():
+    """
+    Stand-in for an I2C driver whose (often slow) initialization is deferred until the
+    driver is used for the first time or warm_up() is called.
+
+    Attribute access, indexing and len() are forwarded to the real driver. Once it is
+    created, on_resolved is called so the owner can replace the proxy by the driver.
+    """
+
+    def __init__(self, driver_cls, i2c_interface, i2c_addr: int, on_resolved=None) -> None:
+        self.driver_cls = driver_cls
+        self.i2c_interface = i2c_interface
+        self.i2c_addr = i2c_addr
+        self.init_ms = None
+        self.__driver = None
+        self.__on_resolved = on_resolved
+
+    @property
+    def is_resolved(self) -> bool:
+        return self.__driver is not None
+
+    def resolve(self):
+        """Returns the real driver, creating it if needed."""
+        if self.__driver is None:
+            start = time.ticks_ms()
+            driver = self.driver_cls(self.i2c_interface, self.i2c_addr)
+            self.__set_driver(driver, time.ticks_diff(time.ticks_ms(), start))
+        return self.__driver
+
+    async def resolve_async(self):
+        """Same as resolve(), but creates the driver with its create_async() coroutine."""
+        if self.__driver is None:
+            start = time.ticks_ms()
+            driver = await self.driver_cls.create_async(self.i2c_interface, self.i2c_addr)
+            # the driver may have been resolved synchronously in the meantime
+            if self.__driver is None:
+                self.__set_driver(driver, time.ticks_diff(time.ticks_ms(), start))
+        return self.__driver
+
+    def __set_driver(self, driver, init_ms: int) -> None:
+        self.init_ms = init_ms
+        self.__driver = driver
+        if self.__on_resolved is not None:
+            self.__on_resolved(self)
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __getitem__(self, key):
+        return self.resolve()[key]
+
+    def __setitem__(self, key, value):
+        self.resolve()[key] = value
+
+    def __len__(self):
+        return len(self.resolve())
@@ -1,15 +1,41 @@
 import time
 import _thread
+import micropython
+import uasyncio
 from machine import Timer
 
 from . import platform_description
+from .bus_arbiter import BusArbiter, BusBusyError
+from .lazy_driver import LazyDriver
 from ..device_drivers import inventory as driver_inventory
 
+# presence bitmap without any device, copied into the scratch bitmap before probing
+_NO_DEVICES = bytes(16)
+
+
+class _DiscoveryPause():
+    """Context manager returned by HardwareManager.discovery_paused()."""
+
+    def __init__(self, manager: 'HardwareManager') -> None:
+        self.__manager = manager
+
+    def __enter__(self):
+        self.__manager.pause_discovery()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__manager.resume_discovery()
+
 
 class HardwareManager():
     __INSTANCE = None
     __INIT_TOKEN = object()
 
+    # rediscovery starts at the minimum period and doubles with every run that finds the
+    # same devices until it reaches the maximum period
+    DISCOVERY_MIN_PERIOD_MS = 2000
+    DISCOVERY_MAX_PERIOD_MS = 32000
+
     @classmethod
     def get_instance(cls) -> 'HardwareManager':
         if cls.__INSTANCE is None:
@@ -20,43 +46,260 @@ class HardwareManager():
         if init_token != self.__INIT_TOKEN:
             raise RuntimeError('Cannot explicitly instantiate singleton class. ')
         self.platform_loader = platform_description.PlatformLoader.get_instance()
-        self.i2c_drivers_by_address = {i: {} for i in range(len(self.platform_loader.get_platform().get('i2c', [])))}
+        num_buses = len(self.platform_loader.get_platform().get('i2c', []))
+        self.i2c_drivers_by_address = {i: {} for i in range(num_buses)}
         self.i2c_drivers_by_name = {}
+        # bumped whenever the registered drivers change, lets callers cache lookups
+        self.generation = 0
+        self.discovery_stats = [{'runs': 0, 'probes': 0, 'probe_time_us': 0} for _ in range(num_buses)]
+        self.__driver_by_address = self.compile_driver_table(driver_inventory.I2C_DRIVERS)
+        self.__probe_addresses = [a for a in range(128) if self.__driver_by_address[a] is not None]
+        # device presence per bus as a 128 bit bitmap (bit n of byte a >> 3 is address a)
+        self.__present = [bytearray(16) for _ in range(num_buses)]
+        self.__probed = bytearray(16)
+        self.__discovery_pause_count = 0
+        self.__discovery_period_ms = self.DISCOVERY_MIN_PERIOD_MS
+        # every lazily created driver as [name, bus, address, proxy, resolved during boot]
+        self.__lazy_drivers = []
+        self.__boot_complete = False
+        self.__warm_up_timer = None
         self.discover_i2c_hardware()
 
         # start timer
         self.i2c_rediscovery_timer = Timer()
-        self.i2c_rediscovery_timer.init(period=2000, mode=Timer.PERIODIC, callback=lambda t:self.discover_i2c_hardware())
+        self.__arm_discovery_timer()
+
+    @staticmethod
+    def compile_driver_table(drivers: list) -> list:
+        """
+        Returns a 128 entry list mapping every 7 bit I2C address to the first driver class
+        in drivers supporting it, or None.
+        """
+        table = [None] * 128
+        for driver in drivers:
+            for address in driver.SUPPORTED_ADDRESSES:
+                if table[address] is None:
+                    table[address] = driver
+        return table
 
     def get_i2c_driver_by_name(self, name: str) -> list:
         return self.i2c_drivers_by_name.get(name, [])
 
-    def discover_i2c_hardware(self) -> None:
-        for i2c_num, i2c_phy in enumerate(self.platform_loader.get_platform().get('i2c', [])):
-            currently_loaded_drivers = self.i2c_drivers_by_address[i2c_num]
-            devices = i2c_phy.scan()
-            for address in devices:
-                if address in currently_loaded_drivers:
-                    # hardware is already initialized, nothing to do here
+    def get_i2c_arbiter(self, driver) -> BusArbiter:
+        """Returns the arbiter of the bus the driver (or its lazy proxy) is attached to."""
+        return self.platform_loader.get_i2c_arbiter(driver.i2c_interface)
+
+    # --- Periodic rediscovery ---
+
+    def __arm_discovery_timer(self):
+        self.i2c_rediscovery_timer.init(
+            period=self.__discovery_period_ms, mode=Timer.ONE_SHOT, callback=self.__on_discovery_timer
+        )
+
+    def __on_discovery_timer(self, timer: Timer):
+        # Do the bus work from the scheduler, not from the timer interrupt.
+        try:
+            micropython.schedule(self.__run_scheduled_discovery, None)
+        except RuntimeError:  # schedule queue is full, try again next period
+            self.__arm_discovery_timer()
+
+    def __run_scheduled_discovery(self, _):
+        if self.__discovery_pause_count == 0:
+            # runs from the scheduler, so it must not wait for an interrupted transaction
+            if self.discover_i2c_hardware(blocking=False):
+                self.__discovery_period_ms = self.DISCOVERY_MIN_PERIOD_MS
+            else:
+                self.__discovery_period_ms = min(self.__discovery_period_ms * 2, self.DISCOVERY_MAX_PERIOD_MS)
+        self.__arm_discovery_timer()
+
+    def pause_discovery(self) -> None:
+        """
+        Suspends the periodic rediscovery, e.g. during time-critical sections. Calls can
+        be nested, every call needs a matching resume_discovery().
+        """
+        self.__discovery_pause_count += 1
+
+    def resume_discovery(self) -> None:
+        if self.__discovery_pause_count > 0:
+            self.__discovery_pause_count -= 1
+
+    def discovery_paused(self) -> _DiscoveryPause:
+        """
+        Returns a context manager that pauses the rediscovery:
+            with manager.discovery_paused():
+                ...
+        """
+        return _DiscoveryPause(self)
+
+    # --- Discovery ---
+
+    def __probe_bus(self, i2c_num: int, i2c_phy, bitmap: bytearray) -> None:
+        """
+        Sets the bit of every address that acknowledges on the bus in bitmap. Only
+        addresses a driver in the inventory supports are probed instead of scanning the
+        whole bus.
+        """
+        bitmap[:] = _NO_DEVICES
+        start = time.ticks_us()
+        for address in self.__probe_addresses:
+            try:
+                i2c_phy.writeto(address, b'')
+                bitmap[address >> 3] |= 1 << (address & 0x07)
+            except OSError:
+                pass
+        stats = self.discovery_stats[i2c_num]
+        stats['probe_time_us'] += time.ticks_diff(time.ticks_us(), start)
+        stats['probes'] += len(self.__probe_addresses)
+        stats['runs'] += 1
+
+    def __load_driver(self, i2c_num: int, i2c_phy, address: int) -> None:
+        # Only register a proxy. The driver itself is created on first use or by the
+        # warm-up, so devices the program never touches do not slow down the boot.
+        selected_driver = self.__driver_by_address[address]
+        print('Register', selected_driver.__name__)
+        driver_obj = LazyDriver(selected_driver, i2c_phy, address, self.__on_driver_resolved)
+        self.__lazy_drivers.append([selected_driver.__name__, i2c_num, address, driver_obj, False])
+        self.i2c_drivers_by_address[i2c_num][address] = driver_obj
+        if selected_driver.__name__ not in self.i2c_drivers_by_name:
+            self.i2c_drivers_by_name[selected_driver.__name__] = []
+        self.i2c_drivers_by_name[selected_driver.__name__].append(driver_obj)
+        self.generation += 1
+
+    def __unload_driver(self, i2c_num: int, address: int) -> None:
+        driver_obj = self.i2c_drivers_by_address[i2c_num].pop(address)
+        driver_class_name = self.__driver_by_address[address].__name__
+        print('Destroying driver:', driver_class_name)
+        self.i2c_drivers_by_name[driver_class_name].remove(driver_obj)
+        self.__lazy_drivers = [
+            entry for entry in self.__lazy_drivers if entry[1] != i2c_num or entry[2] != address
+        ]
+        self.generation += 1
+
+    def __on_driver_resolved(self, proxy: LazyDriver) -> None:
+        # replace the proxy by the real driver, so later lookups skip the indirection
+        name = proxy.driver_cls.__name__
+        print('Instanciated', name, 'in', proxy.init_ms, 'ms')
+        driver_obj = proxy.resolve()
+        for entry in self.__lazy_drivers:
+            if entry[3] is proxy:
+                entry[4] = not self.__boot_complete
+                drivers = self.i2c_drivers_by_address[entry[1]]
+                if drivers.get(entry[2]) is proxy:
+                    drivers[entry[2]] = driver_obj
+        drivers = self.i2c_drivers_by_name.get(name, [])
+        for i in range(len(drivers)):
+            if drivers[i] is proxy:
+                drivers[i] = driver_obj
+        self.generation += 1
+
+    # --- Deferred driver initialization ---
+
+    def warm_up_drivers(self) -> None:
+        """Initializes all drivers that have not been used yet."""
+        for entry in self.__lazy_drivers:
+            entry[3].resolve()
+
+    async def warm_up_drivers_async(self) -> None:
+        """
+        Initializes all drivers that have not been used yet concurrently. Initialization
+        sleeps are awaited, so the total time is close to that of the slowest driver.
+        """
+        pending = [entry[3].resolve_async() for entry in self.__lazy_drivers if not entry[3].is_resolved]
+        await uasyncio.gather(*pending)
+
+    def start_driver_warm_up(self, period_ms: int = 100) -> None:
+        """
+        Initializes the pending drivers in the background, one per period, from the
+        scheduler. Call it when the program is idle, driver initialization can block for
+        several hundred milliseconds.
+        """
+        if self.__warm_up_timer is None:
+            self.__warm_up_timer = Timer()
+        self.__warm_up_timer.init(
+            period=period_ms, mode=Timer.PERIODIC,
+            callback=lambda t: micropython.schedule(self.__warm_up_next, None)
+        )
+
+    def __warm_up_next(self, _) -> None:
+        for entry in self.__lazy_drivers:
+            if not entry[3].is_resolved:
+                # scheduled, so the interrupted code may be in a transaction on the bus
+                arbiter = self.get_i2c_arbiter(entry[3])
+                try:
+                    arbiter.acquire(BusArbiter.PRIORITY_BULK, False)
+                except BusBusyError:
+                    return  # the next period tries again
+                try:
+                    entry[3].resolve()
+                finally:
+                    arbiter.release()
+                return
+        self.__warm_up_timer.deinit()
+
+    def mark_boot_complete(self) -> None:
+        """Drivers initialized after this call count as saved boot time in the report."""
+        self.__boot_complete = True
+
+    def get_driver_init_report(self) -> list:
+        """
+        Returns one (name, bus, address, init_ms, saved_at_boot) tuple per registered
+        driver. init_ms is None while the driver has not been initialized yet.
+        """
+        return [
+            (name, bus, address, proxy.init_ms, not resolved_during_boot)
+            for name, bus, address, proxy, resolved_during_boot in self.__lazy_drivers
+        ]
+
+    def print_driver_init_report(self) -> None:
+        saved_ms = 0
+        print("Driver initialization:")
+        for name, bus, address, init_ms, saved in self.get_driver_init_report():
+            if init_ms is None:
+                state = 'not initialized yet, saved at boot'
+            elif saved:
+                state = f'{init_ms}ms, deferred until after boot'
+                saved_ms += init_ms
+            else:
+                state = f'{init_ms}ms during boot'
+            print(f"\t{name} (bus {bus}, 0x{address:02x}): {state}")
+        print(f"\tSaved at boot: at least {saved_ms}ms")
+
+    def discover_i2c_hardware(self, blocking: bool = True) -> bool:
+        """
+        Loads drivers for new devices and removes drivers of devices that are gone.
+        Returns True if anything changed.
+        blocking -- If False, a bus that is in use is skipped until the next run.
+        """
+        changed = False
+        probed = self.__probed
+        platform = self.platform_loader.get_platform()
+        arbiters = platform.get('i2c_arbiters', [])
+        for i2c_num, i2c_phy in enumerate(platform.get('i2c', [])):
+            present = self.__present[i2c_num]
+            arbiter = arbiters[i2c_num]
+            try:
+                arbiter.acquire(BusArbiter.PRIORITY_BULK, blocking)
+            except BusBusyError:
+                continue
+            try:
+                self.__probe_bus(i2c_num, i2c_phy, probed)
+            finally:
+                arbiter.release()
+            if probed == present:
+                continue
+            for i in range(16):
+                old = present[i]
+                new = probed[i]
+                if old == new:
                     continue
-                # look for a matching driver
-                selected_driver = None
-                for driver in driver_inventory.I2C_DRIVERS:
-                    if address in driver.SUPPORTED_ADDRESSES:
-                        selected_driver = driver
-                        break
-                if selected_driver is not None:
-                    print('Instanciate', selected_driver.__name__)
-                    driver_obj = selected_driver(i2c_phy, address)
-                    currently_loaded_drivers[address] = driver_obj
-                    if selected_driver.__name__ not in self.i2c_drivers_by_name:
-                        self.i2c_drivers_by_name[selected_driver.__name__] = []
-                    self.i2c_drivers_by_name[selected_driver.__name__].append(driver_obj)
-            # destruct drivers of hardware that has been removed
-            addresses_to_destruct = set(currently_loaded_drivers.keys()) - set(devices)
-            for address in addresses_to_destruct:
-                driver_class_name = currently_loaded_drivers[address].__class__.__name__
-                print('Destroying driver:', driver_class_name)
-                driver_obj = currently_loaded_drivers[address]
-                self.i2c_drivers_by_name[driver_class_name].remove(driver_obj)
-                del currently_loaded_drivers[address]
+                added = new & ~old
+                removed = old & ~new
+                for bit in range(8):
+                    if removed & (1 << bit):
+                        # destruct drivers of hardware that has been removed
+                        self.__unload_driver(i2c_num, (i << 3) | bit)
+                    elif added & (1 << bit):
+                        self.__load_driver(i2c_num, i2c_phy, (i << 3) | bit)
+                present[i] = new
+                changed = True
+        return changed
@@ -1,6 +1,9 @@
 import machine
 from ..device_drivers.impl import mcp3008 as drv_mcp3008  # analog device driver
 from ..device_drivers.impl import mcp23S17 as drv_mcp23s17  # digital device driver
+from . import analog_sampler
+from . import bus_arbiter
+from . import bus_profiler
 
 
 # ToDo: For future hardware revisions we need to determine which pinout to load here...
@@ -37,18 +40,31 @@ class PlatformLoader():
         SPIHardwareHolder.get_instance()
 
     def __init_platform(self):
+        profiler = bus_profiler.BusProfiler.get_instance()
         self.__platform = {
             'i2c': [
                 # no hardware-bus-mapping needed. We will discover the hw by a scan and don't
                 # really care where it is plugged into. 
-                machine.I2C(0, sda=machine.Pin(16), scl=machine.Pin(17), freq=400000),
-                machine.I2C(1, sda=machine.Pin(18), scl=machine.Pin(19), freq=400000),
+                profiler.wrap(machine.I2C(0, sda=machine.Pin(16), scl=machine.Pin(17), freq=400000), 'i2c0'),
+                profiler.wrap(machine.I2C(1, sda=machine.Pin(18), scl=machine.Pin(19), freq=400000), 'i2c1'),
+            ],
+            # one arbiter per entry of 'i2c', same order
+            'i2c_arbiters': [
+                bus_arbiter.BusArbiter('i2c0'),
+                bus_arbiter.BusArbiter('i2c1'),
             ],
         }
 
     def get_platform(self) -> dict:
         return self.__platform
 
+    def get_i2c_arbiter(self, i2c_interface: machine.I2C) -> bus_arbiter.BusArbiter:
+        """Returns the arbiter of an I2C bus object of the platform."""
+        for i, bus in enumerate(self.__platform['i2c']):
+            if bus is i2c_interface:
+                return self.__platform['i2c_arbiters'][i]
+        raise ValueError('I2C interface is not part of the platform')
+
     def get_preference_for_driver(self, driver_name: str) -> dict:
         if driver_name not in self.__driver_preferences:
             raise ValueError('Cannot find driver preferences for \'{}\''.format(driver_name))
@@ -74,7 +90,8 @@ class SPIHardwareHolder():
         self.__init_analog()
 
     def __init_spi(self) -> None:
-        self.spi_analog = machine.SPI(
+        profiler = bus_profiler.BusProfiler.get_instance()
+        self.spi_analog = profiler.wrap(machine.SPI(
             0,
             baudrate=1000000,
             polarity=1,
@@ -84,10 +101,11 @@ class SPIHardwareHolder():
             sck=machine.Pin(2),
             mosi=machine.Pin(3),
             miso=machine.Pin(4),
-        )
+        ), 'spi_analog')
         self.spi_analog_cs = machine.Pin(5, machine.Pin.OUT)
+        self.spi_analog_arbiter = bus_arbiter.BusArbiter('spi_analog')
 
-        self.spi_digital = machine.SPI(
+        self.spi_digital = profiler.wrap(machine.SPI(
             1,
             baudrate=1000000,
             polarity=1,
@@ -97,18 +115,29 @@ class SPIHardwareHolder():
             sck=machine.Pin(10),
             mosi=machine.Pin(11),
             miso=machine.Pin(12),
-        )
+        ), 'spi_digital')
         self.spi_digital_cs = machine.Pin(13, machine.Pin.OUT)
+        # both expanders share the bus and the CS line, so they share the arbiter
+        self.spi_digital_arbiter = bus_arbiter.BusArbiter('spi_digital')
 
     def __init_digital(self):
-        self.mcp_motor_taster = drv_mcp23s17.MCP23S17(self.spi_digital, self.spi_digital_cs, 0)
+        self.mcp_motor_taster = drv_mcp23s17.MCP23S17(
+            self.spi_digital, self.spi_digital_cs, 0, self.spi_digital_arbiter)
         self.mcp_motor_taster.open()
-        self.mcp_leds = drv_mcp23s17.MCP23S17(self.spi_digital, self.spi_digital_cs, 1)
+        # GPIO the INT line of the button expander is connected to (INTA and INTB
+        # mirrored), None as long as that wiring is not verified for the board
+        self.mcp_motor_taster_int_pin = None
+        self.mcp_leds = drv_mcp23s17.MCP23S17(
+            self.spi_digital, self.spi_digital_cs, 1, self.spi_digital_arbiter)
         self.mcp_leds.open()
         self.mcp23s17_by_index = [self.mcp_motor_taster, self.mcp_leds]
 
+    def get_arbiters(self) -> list:
+        return [self.spi_digital_arbiter, self.spi_analog_arbiter]
+
     def __init_analog(self):
-        self.mcp_analog = drv_mcp3008.MCP3008(self.spi_analog, self.spi_analog_cs)
+        self.mcp_analog = drv_mcp3008.MCP3008(self.spi_analog, self.spi_analog_cs, self.spi_analog_arbiter)
+        self.analog_sampler = analog_sampler.AnalogSampler(self.mcp_analog)
 
 
 class DigitalBoardPins():
@@ -177,10 +206,17 @@ class DigitalBoardPin():
     PULL_NONE = False
 
     # TODO: Actually implement the enum. Right now it is just a shortcut for the right string.
-    def __init__(self, pin_id: str, mode=OUT, pull=PULL_NONE) -> None:
+    def __init__(self, pin_id: str, mode=OUT, pull=PULL_NONE, elide_redundant_writes=None) -> None:
+        """
+        elide_redundant_writes -- Skip bus writes that would not change the level held in
+        the expander's shadow register. Defaults to True for outputs and False for inputs.
+        """
         if pin_id not in self.PIN_LOOKUP:
             raise ValueError('Cannot find pin \'{}\'!'.format(pin_id))
-        
+        if elide_redundant_writes is None:
+            elide_redundant_writes = mode == self.OUT
+        self.elide_redundant_writes = elide_redundant_writes
+
         mcp_index, self.__mcp_pin_num = self.PIN_LOOKUP[pin_id]
         # get the right mcp object
         self.__mcp_obj = SPIHardwareHolder.get_instance().mcp23s17_by_index[mcp_index]
@@ -189,12 +225,20 @@ class DigitalBoardPin():
             drv_mcp23s17.MCP23S17.DIR_OUTPUT if mode == 0 else drv_mcp23s17.MCP23S17.DIR_INPUT
         )
         self.__mcp_obj.set_pullup(self.__mcp_pin_num, pull)
-    
+
+    @property
+    def mcp(self) -> drv_mcp23s17.MCP23S17:
+        return self.__mcp_obj
+
+    @property
+    def pin_num(self) -> int:
+        return self.__mcp_pin_num
+
     def value(self, level = None):
         if level is None:
             return self.__mcp_obj.digital_read(self.__mcp_pin_num)
         else:
-            self.__mcp_obj.digital_write(self.__mcp_pin_num, level)
+            self.__mcp_obj.digital_write(self.__mcp_pin_num, level, self.elide_redundant_writes)
 
     def on(self):
         self.value(1)
@@ -231,6 +275,22 @@ class AnalogBoardPin():
         self.__pin = self.PIN_LOOKUP[pin_id]
         # get the right mcp object
         self.__mcp_obj = SPIHardwareHolder.get_instance().mcp_analog
-    
+        self.__sampler = SPIHardwareHolder.get_instance().analog_sampler
+
+    @property
+    def mcp(self) -> drv_mcp3008.MCP3008:
+        return self.__mcp_obj
+
+    @property
+    def channel(self) -> int:
+        return self.__pin
+
+    @property
+    def sampler(self) -> analog_sampler.AnalogSampler:
+        return self.__sampler
+
     def read_raw(self) -> int:
+        # the sampler does not update the channels it was not started with
+        if self.__sampler.is_sampling(self.__pin):
+            return self.__sampler.latest(self.__pin)
         return self.__mcp_obj.read(self.__pin)
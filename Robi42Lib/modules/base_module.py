@@ -1,5 +1,6 @@
 from ..hardware_manager import manager as hw_manager
 from ..hardware_manager import platform_description as pltfm_desc
+from ..hardware_manager.bus_arbiter import BusArbiter
 
 # redefine for easy access the Hardware
 DigitalBoardPin = pltfm_desc.DigitalBoardPin
@@ -7,31 +8,65 @@ DigitalBoardPins = pltfm_desc.DigitalBoardPins
 AnalogBoardPin = pltfm_desc.AnalogBoardPin
 AnalogBoardPins = pltfm_desc.AnalogBoardPins
 
+# The decorators below inject the driver as the argument following the ones passed by the
+# caller. The driver parameter therefore has to come directly after the parameters without
+# default values. Calls with keyword arguments fall back to injecting it by name.
+# The driver lookup is cached until the hardware manager's generation changes (hot-plug).
+# get_first_i2c_hardware() also owns the driver's bus for the duration of the call, with
+# the given BusArbiter priority. Bulk transfers (LCD text, EEPROM data) are therefore made
+# of one decorated call per character or page, which lets higher priority users in between.
 
-def needs_i2c_hardware(driver_name):
+
+def needs_i2c_hardware(driver_name, manager=None):
     def function_wrapper(func):
-        manager_instance = hw_manager.HardwareManager.get_instance()
+        manager_instance = manager if manager is not None else hw_manager.HardwareManager.get_instance()
+        cached_generation = -1
+        cached_drivers = None
 
         def inner_wrap(*args, **kwargs):
-            driver = manager_instance.get_i2c_driver_by_name(driver_name)
-            func(*args, **kwargs, **{driver_name: driver})
+            nonlocal cached_generation, cached_drivers
+            if cached_generation != manager_instance.generation:
+                cached_drivers = manager_instance.get_i2c_driver_by_name(driver_name)
+                cached_generation = manager_instance.generation
+            if kwargs:
+                return func(*args, **kwargs, **{driver_name: cached_drivers})
+            return func(*args, cached_drivers)
 
         return inner_wrap
 
     return function_wrapper
 
 
-def get_first_i2c_hardware(driver_name, ignore_if_not_present=True):
+def get_first_i2c_hardware(driver_name, ignore_if_not_present=True, manager=None,
+                           priority=BusArbiter.PRIORITY_NORMAL):
     def function_wrapper(func):
-        manager_instance = hw_manager.HardwareManager.get_instance()
+        manager_instance = manager if manager is not None else hw_manager.HardwareManager.get_instance()
+        cached_generation = -1
+        cached_driver = None
+        cached_arbiter = None
 
         def inner_wrap(*args, **kwargs):
-            drivers = manager_instance.get_i2c_driver_by_name(driver_name)
-            if len(drivers) > 0:
-                return func(*args, **kwargs, **{driver_name: drivers[0]})
+            nonlocal cached_generation, cached_driver, cached_arbiter
+            if cached_generation != manager_instance.generation:
+                drivers = manager_instance.get_i2c_driver_by_name(driver_name)
+                cached_driver = drivers[0] if len(drivers) > 0 else None
+                cached_arbiter = manager_instance.get_i2c_arbiter(cached_driver) if cached_driver is not None else None
+                cached_generation = manager_instance.generation
+
+            if cached_driver is None:
+                if not ignore_if_not_present:
+                    raise RuntimeError('Hardware for driver \'{}\' not registered!'.format(driver_name))
+                return None
 
-            if not ignore_if_not_present:
-                raise RuntimeError('Hardware for driver \'{}\' not registered!'.format(driver_name))
+            if cached_arbiter is not None:
+                cached_arbiter.acquire(priority)
+            try:
+                if kwargs:
+                    return func(*args, **kwargs, **{driver_name: cached_driver})
+                return func(*args, cached_driver)
+            finally:
+                if cached_arbiter is not None:
+                    cached_arbiter.release()
 
         return inner_wrap
 
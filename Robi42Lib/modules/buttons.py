@@ -1,20 +1,252 @@
+from time import ticks_ms
+
+from machine import Pin, Timer
+
+from ..abstract.debouncer import ButtonDebouncer
+from ..abstract.event_queue import EventQueue
+from ..hardware_manager.bus_arbiter import BusArbiter, BusBusyError
+
 from . import base_module
 
 
 class Button(base_module.DigitalBoardPin):
 
-    def __init__(self, pin_id: str):
+    def __init__(self, pin_id: str, bit: int = 0):
         super().__init__(pin_id, base_module.DigitalBoardPin.IN, base_module.DigitalBoardPin.PULL_UP)
+        self.bit = bit
+        # set by Buttons while the button states are tracked by the expander interrupt
+        self._buttons = None
 
     def is_pressed(self):
+        if self._buttons is not None:
+            return (self._buttons.read_all() & self.bit) != 0
         return not self.value()
 
 
 class Buttons(base_module.BaseModule):
+    # Bits of the state returned by read_all()
+    UP = 0x01
+    DOWN = 0x02
+    LEFT = 0x04
+    RIGHT = 0x08
+    CENTER = 0x10
+
+    # Event kinds returned by get_event()
+    PRESS = ButtonDebouncer.PRESS
+    RELEASE = ButtonDebouncer.RELEASE
+    LONG_PRESS = ButtonDebouncer.LONG_PRESS  # only while sampling
+    REPEAT = ButtonDebouncer.REPEAT  # only while sampling
 
     def __init__(self) -> None:
-        self.up = Button(base_module.DigitalBoardPins.btn_up)
-        self.down = Button(base_module.DigitalBoardPins.btn_down)
-        self.center = Button(base_module.DigitalBoardPins.btn_center, )
-        self.left = Button(base_module.DigitalBoardPins.btn_left, )
-        self.right = Button(base_module.DigitalBoardPins.btn_right, )
+        self.up = Button(base_module.DigitalBoardPins.btn_up, Buttons.UP)
+        self.down = Button(base_module.DigitalBoardPins.btn_down, Buttons.DOWN)
+        self.center = Button(base_module.DigitalBoardPins.btn_center, Buttons.CENTER)
+        self.left = Button(base_module.DigitalBoardPins.btn_left, Buttons.LEFT)
+        self.right = Button(base_module.DigitalBoardPins.btn_right, Buttons.RIGHT)
+        self.__buttons = (self.up, self.down, self.left, self.right, self.center)
+
+        # (16-bit pin mask, state bit) for every button. All buttons have to sit on the
+        # same expander so that one read returns all of them.
+        self.__bit_map = [(1 << button.pin_num, button.bit) for button in self.__buttons]
+        self.__pin_mask = 0
+        for pin_mask, _ in self.__bit_map:
+            self.__pin_mask |= pin_mask
+        self.__mcp = self.up.mcp
+        self.__only_port_b = all(pin_mask > 0xFF for pin_mask, _ in self.__bit_map)
+
+        self.__int_pin = None
+        self.__int_pending = False
+        self.__int_tick = 0
+        self.__state = 0
+        self.__events = None
+
+        self.__sample_timer = None
+        self.__debouncer = None
+        # timer ticks dropped because the expander's bus was in use
+        self.skipped_samples = 0
+
+    def __levels_to_state(self, levels: int) -> int:
+        state = 0
+        for pin_mask, bit in self.__bit_map:
+            if not levels & pin_mask:  # buttons are active low
+                state |= bit
+        return state
+
+    def __read_state(self) -> int:
+        if self.__only_port_b:
+            return self.__levels_to_state(self.__mcp.read_PORTB() << 8)
+        return self.__levels_to_state(self.__mcp.read_GPIO())
+
+    def read_all(self) -> int:
+        """
+        Samples all buttons with a single expander read.
+        Returns a bitmask of the pressed buttons (Buttons.UP, Buttons.DOWN, ...).
+        While interrupts are enabled, the state is only read from the expander after
+        it signalled a change.
+        """
+        if self.__debouncer is not None:
+            return self.__debouncer.state
+        if self.__int_pin is None:
+            return self.__read_state()
+        self.__service_interrupt()
+        return self.__state
+
+    @property
+    def events_enabled(self) -> bool:
+        """
+        True if get_event() can be used, i.e. interrupts or sampling are enabled.
+        """
+        return self.__events is not None
+
+    # --- Interrupt-on-change ---
+
+    def enable_interrupts(self, int_pin: int, queue_size: int = 16):
+        """
+        Lets the expander signal button changes on its INT line instead of polling it.
+        While no button changes, read_all(), Button.is_pressed() and get_event() do not
+        touch the bus.
+        Parameters:
+        int_pin -- GPIO of the RP2040 the expander's INTA or INTB line is connected to
+        queue_size -- Number of press/release events that can be buffered
+        """
+        if self.__debouncer is not None:
+            raise RuntimeError('Cannot enable interrupts while sampling the buttons!')
+        self.__events = EventQueue(queue_size)
+        self.__state = self.__read_state()
+        self.__mcp.set_interrupt_mirror(True)
+        self.__mcp.set_interrupt_on_change(self.__pin_mask)
+        self.__mcp.read_interrupt_capture()  # clear a pending interrupt
+        for button in self.__buttons:
+            button._buttons = self
+        self.__int_pending = False
+        self.__int_pin = Pin(int_pin, Pin.IN, Pin.PULL_UP)
+        self.__int_pin.irq(trigger=Pin.IRQ_FALLING, handler=self.__on_interrupt)
+
+    def disable_interrupts(self):
+        if self.__int_pin is None:
+            return
+        self.__int_pin.irq(handler=None)
+        self.__int_pin = None
+        self.__mcp.set_interrupt_on_change(0)
+        self.__events = None
+        for button in self.__buttons:
+            button._buttons = None
+
+    @property
+    def interrupts_enabled(self) -> bool:
+        return self.__int_pin is not None
+
+    def __on_interrupt(self, pin: Pin):
+        # Only remember the time here. The expander is read by the consumer, otherwise the
+        # read could end up in the middle of a transaction of the main loop on the same bus.
+        if not self.__int_pending:
+            self.__int_tick = ticks_ms()
+            self.__int_pending = True
+
+    def __service_interrupt(self):
+        if not self.__int_pending and self.__int_pin.value():
+            return
+        self.__int_pending = False
+        tick = self.__int_tick
+        # The capture holds the levels at the time of the interrupt. The buttons may
+        # have changed again since, so compare with the current levels as well.
+        self.__push_changes(self.__levels_to_state(self.__mcp.read_interrupt_capture()), tick)
+        self.__push_changes(self.__read_state(), ticks_ms())
+
+    def __push_changes(self, state: int, tick: int):
+        changed = state ^ self.__state
+        if not changed:
+            return
+        for button in self.__buttons:
+            bit = button.bit
+            if changed & bit:
+                kind = Buttons.PRESS if state & bit else Buttons.RELEASE
+                self.__events.put((kind << 8) | bit, tick)
+        self.__state = state
+
+    # --- Debounced sampling ---
+
+    def start_sampling(
+            self,
+            period_ms: int = 5,
+            queue_size: int = 16,
+            integrator_max: int = 4,
+            long_press_ms: int = 800,
+            repeat_ms: int = 200,
+    ):
+        """
+        Samples all buttons with one expander read every period_ms from a hardware Timer
+        and debounces them. The debounced state is returned by read_all() and
+        Button.is_pressed() without touching the bus, press/release/long-press/repeat
+        events are fetched with get_event().
+        Parameters:
+        period_ms -- Sampling period
+        queue_size -- Number of events that can be buffered
+        integrator_max -- Number of equal samples needed to change a button's state
+        long_press_ms -- Hold time until Buttons.LONG_PRESS is emitted, 0 disables it
+        repeat_ms -- Interval of Buttons.REPEAT events after a long press, 0 disables them
+        """
+        if self.__int_pin is not None:
+            raise RuntimeError('Cannot sample the buttons while interrupts are enabled!')
+        self.stop_sampling()
+        self.__events = EventQueue(queue_size)
+        self.__debouncer = ButtonDebouncer(
+            [button.bit for button in self.__buttons],
+            self.__events,
+            integrator_max,
+            long_press_ms,
+            repeat_ms,
+        )
+        self.__debouncer.reset(self.__read_state(), ticks_ms())
+        for button in self.__buttons:
+            button._buttons = self
+        self.__sample_timer = Timer(-1)
+        self.__sample_timer.init(period=period_ms, mode=Timer.PERIODIC, callback=self.__on_sample_timer)
+
+    def stop_sampling(self):
+        if self.__sample_timer is not None:
+            self.__sample_timer.deinit()
+            self.__sample_timer = None
+        if self.__debouncer is not None:
+            self.__debouncer = None
+            self.__events = None
+            for button in self.__buttons:
+                button._buttons = None
+
+    def sample(self):
+        """
+        Takes one sample and feeds it to the debouncer. Called by the sampling timer, but
+        can also be called directly to drive the debouncer from a custom loop.
+        """
+        self.__debouncer.update(self.__read_state(), ticks_ms())
+
+    def __on_sample_timer(self, timer: Timer):
+        # The timer may interrupt a transaction of the main loop on the same bus. Skip the
+        # tick then, the debouncer does not mind a missing sample.
+        arbiter = self.__mcp.arbiter
+        if arbiter is not None:
+            try:
+                arbiter.acquire(BusArbiter.PRIORITY_CONTROL, False)
+            except BusBusyError:
+                self.skipped_samples += 1
+                return
+        try:
+            self.sample()
+        finally:
+            if arbiter is not None:
+                arbiter.release()
+
+    def get_event(self) -> tuple[int, int, int] | None:
+        """
+        Returns the oldest buffered event as (kind, button bit, ticks_ms) or None.
+        Never blocks. Requires enable_interrupts() or start_sampling().
+        """
+        if self.__events is None:
+            raise RuntimeError('Button events are not enabled!')
+        if self.__int_pin is not None:
+            self.__service_interrupt()
+        event = self.__events.get()
+        if event is None:
+            return None
+        code, tick = event
+        return code >> 8, code & 0xFF, tick
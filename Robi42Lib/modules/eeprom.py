@@ -16,6 +16,12 @@ class AddressOutOfBoundsError(EEPROMError):
 
 # --- Base EEPROM Implementation ---
 class EEPROM(base_module.BaseModule):
+    # read_bytes() and write_bytes() own the bus for one page (the 24LC256's are 64 bytes)
+    # at a time, so control reads on the same bus get it in between
+    _CHUNK_SIZE = 64
+
+    def _validate_range(self, start_addr: int, length: int = 1):
+        pass
 
     def _read_bytes_impl(self, start_addr: int, length: int, driver: eeprom_i2c.EEPROM_24LC256_I2C_driver) -> bytearray:
         return driver[start_addr:start_addr + length]
@@ -31,25 +37,49 @@ class EEPROM(base_module.BaseModule):
 
     # --- Public API with Hardware Injection ---
 
-    @base_module.get_first_i2c_hardware('EEPROM_24LC256_I2C_driver')
-    def read_bytes(self, start_addr: int, length: int,
-                   EEPROM_24LC256_I2C_driver: eeprom_i2c.EEPROM_24LC256_I2C_driver = None) -> bytearray:
+    def read_bytes(self, start_addr: int, length: int) -> bytearray:
+        self._validate_range(start_addr, length)
+        data = bytearray(length)
+        done = 0
+        while done < length:
+            addr = start_addr + done
+            count = min(length - done, self._CHUNK_SIZE - addr % self._CHUNK_SIZE)
+            chunk = self._read_chunk(addr, count)
+            if chunk is None:  # no EEPROM connected
+                return None
+            data[done:done + count] = chunk
+            done += count
+        return data
+
+    @base_module.get_first_i2c_hardware('EEPROM_24LC256_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
+    def _read_chunk(self, start_addr: int, length: int,
+                    EEPROM_24LC256_I2C_driver: eeprom_i2c.EEPROM_24LC256_I2C_driver = None) -> bytearray:
         return self._read_bytes_impl(start_addr, length, EEPROM_24LC256_I2C_driver)
 
-    @base_module.get_first_i2c_hardware('EEPROM_24LC256_I2C_driver')
+    @base_module.get_first_i2c_hardware('EEPROM_24LC256_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def read_byte(self, addr: int, EEPROM_24LC256_I2C_driver: eeprom_i2c.EEPROM_24LC256_I2C_driver = None) -> int:
         return self._read_byte_impl(addr, EEPROM_24LC256_I2C_driver)
 
-    @base_module.get_first_i2c_hardware('EEPROM_24LC256_I2C_driver')
+    @base_module.get_first_i2c_hardware('EEPROM_24LC256_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def write_byte(self, addr: int, value: int, EEPROM_24LC256_I2C_driver: eeprom_i2c.EEPROM_24LC256_I2C_driver = None):
         self._write_byte_impl(addr, value, EEPROM_24LC256_I2C_driver)
 
-    @base_module.get_first_i2c_hardware('EEPROM_24LC256_I2C_driver')
-    def write_bytes(self, start_addr: int, data: bytearray,
-                    EEPROM_24LC256_I2C_driver: eeprom_i2c.EEPROM_24LC256_I2C_driver = None):
+    def write_bytes(self, start_addr: int, data: bytearray):
+        self._validate_range(start_addr, len(data))
+        data = memoryview(data)
+        done = 0
+        while done < len(data):
+            addr = start_addr + done
+            count = min(len(data) - done, self._CHUNK_SIZE - addr % self._CHUNK_SIZE)
+            self._write_chunk(addr, data[done:done + count])
+            done += count
+
+    @base_module.get_first_i2c_hardware('EEPROM_24LC256_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
+    def _write_chunk(self, start_addr: int, data: bytearray,
+                     EEPROM_24LC256_I2C_driver: eeprom_i2c.EEPROM_24LC256_I2C_driver = None):
         self._write_bytes_impl(start_addr, data, EEPROM_24LC256_I2C_driver)
 
-    @base_module.get_first_i2c_hardware('EEPROM_24LC256_I2C_driver')
+    @base_module.get_first_i2c_hardware('EEPROM_24LC256_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def is_connected(self, EEPROM_24LC256_I2C_driver: eeprom_i2c.EEPROM_24LC256_I2C_driver = None):
         return EEPROM_24LC256_I2C_driver is not None
 
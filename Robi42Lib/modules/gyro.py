@@ -9,28 +9,28 @@ class Gyro(base_module.BaseModule):
     __last_roll = 0
     __prev_time = utime.ticks_ms()
 
-    @base_module.get_first_i2c_hardware('MPU6050')
+    @base_module.get_first_i2c_hardware('MPU6050', priority=base_module.BusArbiter.PRIORITY_CONTROL)
     def get_temperature(self, MPU6050=None) -> float:
         """
         Returns the temperature in °C
         """
         return MPU6050.temperature
 
-    @base_module.get_first_i2c_hardware('MPU6050')
+    @base_module.get_first_i2c_hardware('MPU6050', priority=base_module.BusArbiter.PRIORITY_CONTROL)
     def get_acceleration(self, MPU6050=None) -> tuple[float, float, float]:
         """
         Returns the acceleration in g
         """
         return MPU6050.get_acceleration()
 
-    @base_module.get_first_i2c_hardware('MPU6050')
+    @base_module.get_first_i2c_hardware('MPU6050', priority=base_module.BusArbiter.PRIORITY_CONTROL)
     def get_gyro(self, MPU6050=None) -> tuple[float, float, float]:
         """
         Returns the gyroscope in °/s
         """
         return MPU6050.get_gyro()
 
-    @base_module.get_first_i2c_hardware('MPU6050')
+    @base_module.get_first_i2c_hardware('MPU6050', priority=base_module.BusArbiter.PRIORITY_CONTROL)
     def get_all_data(
         self,
         MPU6050=None,
@@ -41,14 +41,14 @@ class Gyro(base_module.BaseModule):
     ]:
         return MPU6050.get_data()
 
-    @base_module.get_first_i2c_hardware('MPU6050')
+    @base_module.get_first_i2c_hardware('MPU6050', priority=base_module.BusArbiter.PRIORITY_CONTROL)
     def get_tilt_angles(self, MPU6050=None) -> tuple[float, float, float]:
         """
         Calculates the rotation in degree
         """
         return MPU6050.calculate_tilt_angles(*self.get_acceleration())
 
-    @base_module.get_first_i2c_hardware('MPU6050')
+    @base_module.get_first_i2c_hardware('MPU6050', priority=base_module.BusArbiter.PRIORITY_CONTROL)
     def get_pitch_and_roll(self, MPU6050=None) -> tuple[float, float]:
         curr_time = utime.ticks_ms()
         dt = (curr_time - self.__prev_time) / 1000
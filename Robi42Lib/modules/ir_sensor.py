@@ -1,3 +1,5 @@
+from array import array
+
 from . import base_module
 
 
@@ -13,6 +15,10 @@ class _IrSensor:
     def __init__(self, pin: base_module.AnalogBoardPin):
         self.__pin = pin
 
+    @property
+    def pin(self) -> base_module.AnalogBoardPin:
+        return self.__pin
+
     def read_raw(self) -> int:
         return self.__pin.read_raw()
 
@@ -25,13 +31,20 @@ class IrSensors(base_module.BaseModule):
         self.left = _IrSensor(base_module.AnalogBoardPin(base_module.AnalogBoardPins.ir_left))
         self.middle = _IrSensor(base_module.AnalogBoardPin(base_module.AnalogBoardPins.ir_middle))
         self.right = _IrSensor(base_module.AnalogBoardPin(base_module.AnalogBoardPins.ir_right))
+        self.__sampler = self.left.pin.sampler
+        self.__channels = (self.left.pin.channel, self.middle.pin.channel, self.right.pin.channel)
+        self.__raw_values = array('H', [0, 0, 0])
+
+    def read_raw_values_into(self, out) -> None:
+        """
+        Samples left, middle and right into out (e.g. array('H', [0, 0, 0])) without
+        allocating.
+        """
+        self.__sampler.scan(self.__channels, out)
 
     def read_raw_values(self) -> tuple[int, int, int]:
-        return (
-            self.left.read_raw(),
-            self.middle.read_raw(),
-            self.right.read_raw(),
-        )
+        raw = self.__sampler.scan(self.__channels, self.__raw_values)
+        return raw[0], raw[1], raw[2]
 
     def read_values(self) -> tuple[float, float, float]:
         return tuple([convert(v) for v in self.read_raw_values()])
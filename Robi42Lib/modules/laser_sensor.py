@@ -6,11 +6,15 @@ from ..device_drivers.impl import vl53lxx as vl53lxx_driver
 
 class LaserSensor(base_module.BaseModule):
 
-    @base_module.get_first_i2c_hardware('VL53LXX')
-    def read_distance_mm(self, VL53LXX: vl53lxx_driver.VL53LXX | None=None) -> int:
+    def read_distance_mm(self) -> int | None:
         """
         Returns the distance in mm.
         Takes 20ms for cooldown.
         """
+        # the cooldown does not need the bus, only the measurement holds it
         sleep_ms(20)
+        return self.__measure_distance()
+
+    @base_module.get_first_i2c_hardware('VL53LXX', priority=base_module.BusArbiter.PRIORITY_CONTROL)
+    def __measure_distance(self, VL53LXX: vl53lxx_driver.VL53LXX | None=None) -> int:
         return VL53LXX.measure_distance()
@@ -13,7 +13,7 @@ class LCD(base_module.BaseModule):
     def begin(self):
         self.turn_off()
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def configure_cursor(
         self,
         show_cursor,
@@ -30,45 +30,50 @@ class LCD(base_module.BaseModule):
         else:
             HD44780_I2C_driver.blink_cursor_off()
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def set_cursor(self, x_pos: int, y_pos: int , HD44780_I2C_driver=None):
         HD44780_I2C_driver.move_to(x_pos, y_pos)
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def turn_off(self, HD44780_I2C_driver=None):
         HD44780_I2C_driver.clear()
         HD44780_I2C_driver.backlight_off()
         HD44780_I2C_driver.display_off()
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def turn_on(self, HD44780_I2C_driver=None):
         HD44780_I2C_driver.backlight_on()
         HD44780_I2C_driver.display_on()
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
-    def put_str(self, text: str, HD44780_I2C_driver=None):
-        HD44780_I2C_driver.putstr(text)
+    def put_str(self, text: str):
+        # one character per bus ownership, so control reads on the same bus get it in between
+        for char in text:
+            self._put_char(char)
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
+    def _put_char(self, char: str, HD44780_I2C_driver=None):
+        HD44780_I2C_driver.putchar(char)
+
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def clear(self, HD44780_I2C_driver=None):
         HD44780_I2C_driver.clear()
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def show_cursor(self, HD44780_I2C_driver=None):
         HD44780_I2C_driver.show_cursor()
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def hide_cursor(self, HD44780_I2C_driver=None):
         HD44780_I2C_driver.hide_cursor()
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def blink_cursor_on(self, HD44780_I2C_driver=None):
         HD44780_I2C_driver.blink_cursor_on()
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def blink_cursor_off(self, HD44780_I2C_driver=None):
         HD44780_I2C_driver.blink_cursor_off()
 
-    @base_module.get_first_i2c_hardware('HD44780_I2C_driver')
+    @base_module.get_first_i2c_hardware('HD44780_I2C_driver', priority=base_module.BusArbiter.PRIORITY_BULK)
     def move_to(self, cursor_x, cursor_y, HD44780_I2C_driver=None):
         HD44780_I2C_driver.move_to(cursor_x, cursor_y)
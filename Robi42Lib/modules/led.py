@@ -4,6 +4,10 @@ from . import base_module
 class _LedGroup:
     """
     Represents a group of LEDs that can be controlled together.
+
+    The pins are grouped by expander chip and port when the group is created,
+    so switching the whole group costs one register write per port instead of
+    one per LED.
     """
 
     def __init__(self, leds: list[base_module.DigitalBoardPin]):
@@ -14,27 +18,46 @@ class _LedGroup:
             leds (list[base_module.DigitalBoardPin]): A list of digital pins controlling the LEDs.
         """
         self.__pins = leds
+        self.__port_masks = self.__build_port_masks(leds)
+
+    @staticmethod
+    def __build_port_masks(leds: list[base_module.DigitalBoardPin]) -> list[list]:
+        """
+        Returns a list of [mcp, is_port_b, mask] entries, one per port used by the group.
+        """
+        port_masks = []
+        for led in leds:
+            is_port_b = led.pin_num >= 8
+            bit = 1 << (led.pin_num & 0x07)
+            for entry in port_masks:
+                if entry[0] is led.mcp and entry[1] == is_port_b:
+                    entry[2] |= bit
+                    break
+            else:
+                port_masks.append([led.mcp, is_port_b, bit])
+        return port_masks
 
     def on(self):
         """
         Turns all LEDs in the group ON.
         """
-        for led in self.__pins:
-            led.off() #  LEDs are active low
+        self.__write(False)  # LEDs are active low
 
     def off(self):
         """
         Turns all LEDs in the group OFF.
         """
-        for led in self.__pins:
-            led.on() # Note: LEDs are active low
+        self.__write(True)  # Note: LEDs are active low
 
     def toggle(self):
         """
         Toggles the state of all LEDs in the group.
         """
-        for led in self.__pins:
-            led.value(not led.value()) # LEDs are active low
+        for mcp, is_port_b, mask in self.__port_masks:
+            if is_port_b:
+                mcp.toggle_PORTB_masked(mask)
+            else:
+                mcp.toggle_PORTA_masked(mask)
 
     def value(self, level: bool):
         """
@@ -43,8 +66,14 @@ class _LedGroup:
         Args:
             level (bool): `True` to turn LEDs OFF, `False` to turn them ON.
         """
-        for led_pin in self.__pins:
-            led_pin.value(not level)  #  LEDs are active low
+        self.__write(not level)  # LEDs are active low
+
+    def __write(self, level: bool):
+        for mcp, is_port_b, mask in self.__port_masks:
+            if is_port_b:
+                mcp.write_PORTB_masked(mask, level, True)
+            else:
+                mcp.write_PORTA_masked(mask, level, True)
 
 
 class Leds(base_module.BaseModule):
@@ -1,8 +1,11 @@
-from time import sleep_ms
+from time import sleep_ms, ticks_us, ticks_diff
 
-from machine import Pin, PWM
+from machine import Timer
 
-from ..abstract import piopwm
+from ..abstract import motion_profile
+from ..abstract import step_counter
+from ..abstract import step_generator
+from ..hardware_manager.bus_arbiter import BusArbiter, BusBusyError
 
 from . import base_module
 
@@ -12,7 +15,244 @@ class MotorSide:
     RIGHT = 1
 
 
+# step frequencies up to this value stop the motor (it is disabled instead)
+MIN_STEP_FREQ = 7
+
+
+def velocity_to_freq(v: float, wheel_radius: float = 0.032) -> int:
+    return int(v / (motion_profile.STEP_ANGLE_RAD * wheel_radius))
+
+
+class _BackgroundMotion:
+    """
+    Base of Ramp and ProfilePlayback: calls update() from a periodic timer until the
+    motion is done. Starting a motion cancels the one running on the same motor.
+    """
+
+    def __init__(self, motors: tuple, period_ms: int):
+        self._motors = motors
+        self._period_ms = period_ms
+        self._start_us = 0
+        self.__timer = None
+        self.__enabled = None
+        self.done = False
+        self.cancelled = False
+        # timer updates that could not switch the motor enable lines because the bus was in use
+        self.skipped_updates = 0
+
+    def start(self):
+        for motor in self._motors:
+            if motor._motion is not None:
+                motor._motion.cancel()
+            motor._motion = self
+        self._start_us = ticks_us()
+        if not self._begin():
+            self._finish()
+            return self
+        self.__timer = Timer(-1)
+        self.__timer.init(period=self._period_ms, mode=Timer.PERIODIC, callback=self.__on_timer)
+        return self
+
+    def _begin(self) -> bool:
+        """Sets the initial step frequency, returns False if there is nothing to do."""
+        raise NotImplementedError
+
+    def update(self) -> None:
+        raise NotImplementedError
+
+    def wait(self) -> None:
+        """Blocks until the motion is done."""
+        while not self.done:
+            sleep_ms(1)
+
+    def cancel(self) -> None:
+        """Stops updating, the motors keep the current step frequency."""
+        if not self.done:
+            self.cancelled = True
+            self._finish()
+
+    def _finish(self) -> None:
+        if self.__timer is not None:
+            self.__timer.deinit()
+            self.__timer = None
+        self.done = True
+        for motor in self._motors:
+            if motor._motion is self:
+                motor._motion = None
+
+    def _apply_freq(self, freq: int, blocking: bool) -> bool:
+        """
+        Sets the step frequency, a frequency up to MIN_STEP_FREQ disables the motors.
+        Returns False if the enable lines could not be switched yet.
+        """
+        enabled = freq > MIN_STEP_FREQ
+        if enabled != self.__enabled:
+            # the enable lines sit on the expander, the only bus access of a motion
+            for motor in self._motors:
+                if not motor._set_enabled(enabled, blocking):
+                    self.skipped_updates += 1
+                    return False
+            self.__enabled = enabled
+        if enabled:
+            for motor in self._motors:
+                motor.set_freq(freq)
+        return True
+
+    def __on_timer(self, timer: Timer):
+        self.update()
+
+
+class Ramp(_BackgroundMotion):
+    """
+    Accelerates one or more motors in the background.
+
+    A timer updates the step frequency every `period_ms`. The velocity and distance are
+    computed from the time measured since the start, so the ramp takes as long as the
+    acceleration says, no matter how often the timer actually got to run. The ramp ends
+    when the target velocity or the distance limit is reached; the motors keep the
+    velocity reached. The distance is the STEP pulses counted in hardware, so the limit
+    holds to the pulses output within one period.
+
+    Returned by _Motor.accelerate() and Motors.accelerate(), already running:
+
+        ramp = robi.motors.accelerate(0.4, 0, 0.3)
+        while not ramp.done:
+            ...  # other work
+        v, s = ramp.wait()
+    """
+
+    DEFAULT_PERIOD_MS = 2
+
+    def __init__(
+            self,
+            motors: tuple,
+            a: float,
+            from_v: float,
+            to_v: float,
+            s_limit: float = 1000,
+            wheel_radius: float = 0.032,
+            period_ms: int = DEFAULT_PERIOD_MS,
+    ):
+        super().__init__(motors, period_ms)
+        self.__a = a
+        self.__from_v = from_v
+        self.__to_v = to_v
+        self.__s_limit = s_limit
+        self.__wheel_radius = wheel_radius
+        # a ramp pointing away from the target has nothing to do
+        self.__duration_s = (to_v - from_v) / a if (to_v - from_v) * a > 0 else 0
+        self.__meters_per_step = motion_profile.STEP_ANGLE_RAD * wheel_radius
+        self.__limit_steps = int(s_limit / self.__meters_per_step)
+        self.__start_pulses = 0
+        self.velocity = from_v  # m/s
+        self.distance = 0  # m
+
+    def _begin(self) -> bool:
+        if self.__duration_s <= 0 or self.__limit_steps <= 0:
+            return False
+        self.__start_pulses = self._motors[0]._step_pulses()
+        self._apply_freq(velocity_to_freq(self.__from_v, self.__wheel_radius), True)
+        return True
+
+    @property
+    def progress(self) -> float:
+        """0 to 1, the share of the velocity change or of the distance limit done."""
+        if self.done:
+            return 1.0
+        by_velocity = (self.velocity - self.__from_v) / (self.__to_v - self.__from_v)
+        by_distance = self.distance / self.__s_limit
+        return min(1.0, max(by_velocity, by_distance))
+
+    def update(self) -> None:
+        """Recomputes velocity and distance and sets the motors, called by the timer."""
+        if self.done:
+            return
+        t = ticks_diff(ticks_us(), self._start_us) / 1_000_000
+        finished = t >= self.__duration_s
+        if finished:
+            t = self.__duration_s
+        v = self.__from_v + self.__a * t
+        pulses = self._motors[0]._step_pulses() - self.__start_pulses
+        if pulses < 0:  # the counter wrapped
+            pulses += 1 << 32
+        if pulses >= self.__limit_steps:
+            finished = True
+        self.velocity = v
+        self.distance = pulses * self.__meters_per_step
+        applied = self._apply_freq(velocity_to_freq(v, self.__wheel_radius), False)
+        if finished and applied:
+            self._finish()
+
+    def wait(self) -> tuple:
+        """Blocks until the ramp is done, returns the reached velocity and the distance."""
+        super().wait()
+        return self.velocity, self.distance
+
+
+class ProfilePlayback(_BackgroundMotion):
+    """
+    Plays a MotionProfile (see abstract/motion_profile.py) back on one or more motors.
+    The profile is converted into a segment table that the step generators of the
+    motors play on their own (see abstract/step_generator.py), so the steps come out
+    exactly as planned whatever the CPU does meanwhile. The timer only watches for the
+    end of the move and disables the motors then.
+    """
+
+    def __init__(self, motors: tuple, profile: motion_profile.MotionProfile):
+        super().__init__(motors, profile.tick_ms)
+        self.profile = profile
+        self.__tick_us = profile.tick_ms * 1000
+        self.__index = 0
+        self.__table = motors[0]._step_gen.profile_table(profile)
+        self.__start_pulses = 0
+
+    def _begin(self) -> bool:
+        if len(self.__table) == 0:
+            return False
+        self.__start_pulses = self._motors[0]._step_pulses()
+        for motor in self._motors:
+            motor._set_enabled(True)
+        for motor in self._motors:  # back to back, so the motors start together
+            motor._step_gen.play(self.__table)
+        return True
+
+    @property
+    def progress(self) -> float:
+        return 1.0 if self.done else min(1.0, self.__index / len(self.profile))
+
+    def __pulses(self) -> int:
+        pulses = self._motors[0]._step_pulses() - self.__start_pulses
+        if pulses < 0:  # the counter wrapped
+            pulses += 1 << 32
+        return pulses
+
+    @property
+    def distance(self) -> float:
+        """Distance in m covered so far, from the counted STEP pulses."""
+        return self.__pulses() * self.profile.meters_per_step
+
+    def update(self) -> None:
+        """Disables the motors once the step generators are done, called by the timer."""
+        if self.done:
+            return
+        self.__index = ticks_diff(ticks_us(), self._start_us) // self.__tick_us
+        for motor in self._motors:
+            if motor._step_gen.busy:
+                return
+        if self._apply_freq(0, False):
+            self._finish()
+
+    def cancel(self) -> None:
+        """Stops the move where it is, the motors stay enabled."""
+        if not self.done:
+            for motor in self._motors:
+                motor._step_gen.stop()
+        super().cancel()
+
+
 class _Motor:
+    # the DIR input of the right driver is wired the other way round
+    _DIR_INVERTED = False
 
     def __init__(
             self,
@@ -22,17 +262,25 @@ class _Motor:
             pin_m1: base_module.DigitalBoardPin,
             pin_m2: base_module.DigitalBoardPin,
             pin_dir: base_module.DigitalBoardPin,
-            step_pwm: piopwm.PIOPWM | PWM,
+            step_pin: int,
     ):
         self._side = side
         self.__pin_en = pin_en
         self.__pin_m0 = pin_m0
         self.__pin_m1 = pin_m1
         self.__pin_m2 = pin_m2
-        self.__pin_dir = pin_dir
-        self._step_pwm = step_pwm
+        self._pin_dir = pin_dir
+        # the STEP pulses come from a PIO state machine and are counted by another one
+        self._step_gen = step_generator.StepGenerator(step_pin)
         self.__current_freq = 420
+        # the step generator only runs while the motor is enabled, so the step counter
+        # does not count pulses of a motor standing still
+        self._enabled = False
         self._current_direction = Motors.DIR_FORWARD
+        self._motion = None  # Ramp or ProfilePlayback currently driving the motor
+        self.__step_counter = step_counter.StepCounter(step_pin)
+        self.__steps_base = 0  # signed steps up to the last direction change
+        self.__count_base = 0  # counter value at the last direction change
 
     @property
     def side(self):
@@ -44,15 +292,66 @@ class _Motor:
         self.set_stepping_size(True, True, True)
         self.set_direction(Motors.DIR_FORWARD)
 
+    def deinit(self):
+        """Frees the PIO state machines of the motor."""
+        if self._motion is not None:
+            self._motion.cancel()
+        self._step_gen.deinit()
+        self.__step_counter.deinit()
+
     def enable(self):
+        """Enables the motor and starts stepping at the frequency set last."""
         self.__pin_en.off()
+        self._enabled = True
+        self._step_gen.run(self.__current_freq)
 
     def disable(self):
+        """Disables the motor and stops the STEP pulses."""
         self.__pin_en.on()
+        self._enabled = False
+        self._step_gen.stop()
+
+    def _set_enabled(self, enabled: bool, blocking: bool = True) -> bool:
+        """
+        Enables or disables the motor. Disabling stops the step generator, enabling
+        leaves starting it to the caller. Non-blocking calls (from timer callbacks)
+        return False instead of waiting if the expander's bus is in use.
+        """
+        arbiter = self.__pin_en.mcp.arbiter if not blocking else None
+        if arbiter is not None:
+            try:
+                arbiter.acquire(BusArbiter.PRIORITY_CONTROL, False)
+            except BusBusyError:
+                return False
+        try:
+            self.__pin_en.value(not enabled)  # the enable input is active low
+        finally:
+            if arbiter is not None:
+                arbiter.release()
+        self._enabled = enabled
+        if not enabled:
+            self._step_gen.stop()
+        return True
 
     def set_freq(self, freq: int):
+        """Sets the step frequency, a disabled motor takes it when it is enabled."""
+        self.__current_freq = freq
+        if self._enabled:
+            self._step_gen.run(freq)
+
+    def _load_freq(self, freq: int) -> bool:
+        """set_freq() without starting the step generator, see Motors.set_wheel_velocities()."""
         self.__current_freq = freq
-        self._step_pwm.freq(freq)
+        return self._step_gen.load_freq(freq)
+
+    def _dir_en_bits(self, direction: bool, enabled: bool) -> tuple:
+        """Expander, 16-bit mask and levels of the DIR and enable inputs for one masked write."""
+        dir_bit = 1 << self._pin_dir.pin_num
+        en_bit = 1 << self.__pin_en.pin_num
+        data = dir_bit if direction != self._DIR_INVERTED else 0
+        if not enabled:  # the enable input is active low
+            data |= en_bit
+        return self._pin_dir.mcp, dir_bit | en_bit, data
 
     def set_stepping_size(self, m0: bool, m1: bool, m2: bool):
         """
@@ -72,13 +371,17 @@ class _Motor:
         self.__pin_m2.value(m2)
 
     def set_direction(self, direction: bool):
-        ...
+        self._set_current_direction(direction)
+        self._pin_dir.value(direction != self._DIR_INVERTED)
 
     def lock(self):
-        ...
+        """Holds the motor in position: enabled without STEP pulses."""
+        self._step_gen.stop()
+        self.__pin_en.off()
+        self._enabled = True
 
     def unlock(self):
-        ...
+        self.disable()
 
     def accelerate_to_freq(self, freq: int, hz_per_second: int):
         freq_dif = freq - self.freq
@@ -99,6 +402,43 @@ class _Motor:
     def freq(self):
         return self.__current_freq
 
+    def _step_pulses(self) -> int:
+        """STEP pulses output since the last reset_steps(), in any direction."""
+        return self.__step_counter.count
+
+    def __signed_steps(self, count: int) -> int:
+        delta = count - self.__count_base
+        if delta < 0:  # the counter wrapped
+            delta += 1 << 32
+        if self._current_direction == Motors.DIR_FORWARD:
+            return self.__steps_base + delta
+        return self.__steps_base - delta
+
+    @property
+    def steps(self) -> int:
+        """
+        Position in (micro)steps since the last reset_steps(), forward is positive.
+        Counted in hardware from the STEP pulses, reading it does not touch a bus.
+        """
+        return self.__signed_steps(self.__step_counter.count)
+
+    def distance_m(self, wheel_radius: float = 0.032) -> float:
+        """Distance in m driven since the last reset_steps(), forward is positive."""
+        return self.steps * motion_profile.STEP_ANGLE_RAD * wheel_radius
+
+    def reset_steps(self):
+        self.__step_counter.reset()
+        self.__steps_base = 0
+        self.__count_base = 0
+
+    def _set_current_direction(self, direction: bool):
+        # pulses after a direction change count the other way
+        if direction != self._current_direction:
+            count = self.__step_counter.count
+            self.__steps_base = self.__signed_steps(count)
+            self.__count_base = count
+        self._current_direction = direction
+
     @property
     def direction(self):
         return self._current_direction
@@ -110,44 +450,37 @@ class _Motor:
             to_v: float,
             s_limit: float = 1000,
             wheel_radius: float = 0.032,
-    ):
+            period_ms: int = Ramp.DEFAULT_PERIOD_MS,
+    ) -> Ramp:
         """
+        Starts a ramp and returns immediately, see Ramp.
         @param a: Acceleration in m/s^2
         @param from_v: Initial velocity in m/s
         @param to_v: Target velocity in m/s
         @param s_limit: Maximum distance to drive in m
         @param wheel_radius: Wheel radius in m
-        @return: Reached velocity in m/s, distance covered in m
+        @param period_ms: Update period of the step frequency in ms
+        @return: The running Ramp, Ramp.wait() returns the reached velocity in m/s and the
+                 distance covered in m
         """
-        v = from_v  # m/s
-        s = 0  # m
-        dt = 0.0011  # s, TODO: Find a way to calibrate this value
-
-        if a < 0:
-            while v > to_v and s < s_limit:
-                self.set_velocity(v, wheel_radius)
-                v += dt * a
-                s += dt * v
-        else:
-            while v < to_v and s < s_limit:
-                self.set_velocity(v, wheel_radius)
-                v += dt * a
-                s += dt * v
+        return Ramp((self,), a, from_v, to_v, s_limit, wheel_radius, period_ms).start()
 
-        return v, s
+    def play(self, profile: motion_profile.MotionProfile) -> ProfilePlayback:
+        """Starts playing a planned profile and returns immediately, see ProfilePlayback."""
+        return ProfilePlayback((self,), profile).start()
 
     def set_velocity(self, v: float, wheel_radius: float = 0.032):
-        # Dieser magische ↓ Wert ergibt sich aus 1.8 / 32 * (math.pi / 180) :)
-        f = int(v / (0.00098174 * wheel_radius))
+        f = velocity_to_freq(v, wheel_radius)
 
-        if f <= 7:
+        if f <= MIN_STEP_FREQ:
             self.disable()
             return
-        self.enable()
         self.set_freq(f)
+        self.enable()
 
 
 class _MotorLeftPreBf(_Motor):
+    _DIR_INVERTED = False
 
     def __init__(self):
         super().__init__(
@@ -157,26 +490,13 @@ class _MotorLeftPreBf(_Motor):
             pin_m1=base_module.DigitalBoardPin(base_module.DigitalBoardPins.ml_m1),
             pin_m2=base_module.DigitalBoardPin(base_module.DigitalBoardPins.ml_m2),
             pin_dir=base_module.DigitalBoardPin(base_module.DigitalBoardPins.ml_dir),
-            step_pwm=piopwm.PIOPWM(20, 420),
+            step_pin=20,
         )
 
-    def set_direction(self, direction: bool):
-        self._current_direction = direction
-        self.__pin_dir.value(direction)
-
-    def lock(self):
-        self.enable()
-        self.set_freq(8)  # TODO: Find better way to lock motor
-
-    def unlock(self):
-        self.set_freq(420)
-        self.disable()
-
-
 class _MotorRightPreBf(_Motor):
+    _DIR_INVERTED = True
 
     def __init__(self) -> None:
-        step_pwm = PWM(Pin(21, Pin.OUT))
         super().__init__(
             side=MotorSide.RIGHT,
             pin_en=base_module.DigitalBoardPin(base_module.DigitalBoardPins.mr_en),
@@ -184,33 +504,13 @@ class _MotorRightPreBf(_Motor):
             pin_m1=base_module.DigitalBoardPin(base_module.DigitalBoardPins.mr_m1),
             pin_m2=base_module.DigitalBoardPin(base_module.DigitalBoardPins.mr_m2),
             pin_dir=base_module.DigitalBoardPin(base_module.DigitalBoardPins.mr_dir),
-            step_pwm=step_pwm,
+            step_pin=21,
         )
 
-    def begin(self):
-        self._step_pwm.duty_u16(32768)
-        super().begin()
-
-    def set_direction(self, direction: bool):
-        self._current_direction = direction
-        self.__pin_dir.value(not direction)
-
-    def set_duty_u16(self, duty_cycle: int):
-        self._step_pwm.duty_u16(duty_cycle)
-
-    def lock(self):
-        self.enable()
-        self.set_duty_u16(0)
-
-    def unlock(self):
-        self.set_duty_u16(32768)
-        self.disable()
-
-
 class _MotorLeftPostBf(_Motor):
+    _DIR_INVERTED = False
 
     def __init__(self):
-        step_pwm = PWM(Pin(14, Pin.OUT))
         super().__init__(
             side=MotorSide.LEFT,
             pin_en=base_module.DigitalBoardPin(base_module.DigitalBoardPins.ml_en),
@@ -218,33 +518,13 @@ class _MotorLeftPostBf(_Motor):
             pin_m1=base_module.DigitalBoardPin(base_module.DigitalBoardPins.ml_m1),
             pin_m2=base_module.DigitalBoardPin(base_module.DigitalBoardPins.ml_m2),
             pin_dir=base_module.DigitalBoardPin(base_module.DigitalBoardPins.ml_dir),
-            step_pwm=step_pwm,
+            step_pin=14,
         )
 
-    def begin(self):
-        self._step_pwm.duty_u16(32768)
-        super().begin()
-
-    def set_direction(self, direction: bool):
-        self._current_direction = direction
-        self.__pin_dir.value(direction)
-
-    def set_duty_u16(self, duty_cycle: int):
-        self._step_pwm.duty_u16(duty_cycle)
-
-    def lock(self):
-        self.enable()
-        self.set_duty_u16(0)
-
-    def unlock(self):
-        self.set_duty_u16(32768)
-        self.disable()
-
-
 class _MotorRightPostBf(_Motor):
+    _DIR_INVERTED = True
 
     def __init__(self) -> None:
-        step_pwm = PWM(Pin(20, Pin.OUT))
         super().__init__(
             side=MotorSide.RIGHT,
             pin_en=base_module.DigitalBoardPin(base_module.DigitalBoardPins.mr_en),
@@ -252,39 +532,28 @@ class _MotorRightPostBf(_Motor):
             pin_m1=base_module.DigitalBoardPin(base_module.DigitalBoardPins.mr_m1),
             pin_m2=base_module.DigitalBoardPin(base_module.DigitalBoardPins.mr_m2),
             pin_dir=base_module.DigitalBoardPin(base_module.DigitalBoardPins.mr_dir),
-            step_pwm=step_pwm,
+            step_pin=20,
         )
 
-    def begin(self):
-        self._step_pwm.duty_u16(32768)
-        super().begin()
-
-    def set_direction(self, direction: bool):
-        self._current_direction = direction
-        self.__pin_dir.value(not direction)
-
-    def set_duty_u16(self, duty_cycle: int):
-        self._step_pwm.duty_u16(duty_cycle)
-
-    def lock(self):
-        self.enable()
-        self.set_duty_u16(0)
-
-    def unlock(self):
-        self.set_duty_u16(32768)
-        self.disable()
-
-
 class Motors(base_module.BaseModule):
     DIR_FORWARD = True
     DIR_BACKWARD = False
 
+    # distance between the centres of the wheels in m
+    DEFAULT_TRACK_WIDTH = 0.147
+
     def __init__(self):
         self.left = None
         self.right = None
+        # us between starting the first and the last step generator in set_wheel_velocities()
+        self.last_skew_us = 0
 
     def begin(self, new_hardware: bool):
 
+        if self.left is not None:
+            self.left.deinit()
+            self.right.deinit()
+
         if new_hardware:
             self.left = _MotorLeftPostBf()
             self.right = _MotorRightPostBf()
@@ -335,6 +604,85 @@ class Motors(base_module.BaseModule):
         self.left.set_direction(direction)
         self.right.set_direction(direction)
 
+    def set_wheel_velocities(self, vl: float, vr: float, wheel_radius: float = 0.032) -> int:
+        """
+        Sets the velocities of both wheels at once, negative velocities drive backward.
+        Both DIR and enable inputs are set with one expander write (none if they do not
+        change) before the step generators of both wheels are started together, so the
+        wheels never run with mismatched speeds or directions. A wheel already turning in
+        the same direction is not restarted but changes its speed at its next step. A wheel at a velocity below
+        MIN_STEP_FREQ stands still and holds its position, both motors are disabled if
+        both do. A Ramp or ProfilePlayback running is cancelled.
+        @param vl: Velocity of the left wheel in m/s
+        @param vr: Velocity of the right wheel in m/s
+        @param wheel_radius: Wheel radius in m
+        @return: The skew in us between starting the step generators, measured around
+                 starting them, so an upper bound (also kept in last_skew_us)
+        """
+        left = self.left
+        right = self.right
+        for motor in (left, right):
+            if motor._motion is not None:
+                motor._motion.cancel()
+        freq_l = velocity_to_freq(vl if vl > 0 else -vl, wheel_radius)
+        freq_r = velocity_to_freq(vr if vr > 0 else -vr, wheel_radius)
+        if freq_l <= MIN_STEP_FREQ:
+            freq_l = 0
+        if freq_r <= MIN_STEP_FREQ:
+            freq_r = 0
+        enabled = freq_l > 0 or freq_r > 0
+        # a wheel standing still keeps its direction
+        dir_l = (vl > 0) if freq_l else left.direction
+        dir_r = (vr > 0) if freq_r else right.direction
+
+        # a wheel turning on keeps stepping and changes its speed at its next step, one
+        # reversing is stopped first; the generators to start are loaded before the
+        # expander write
+        if dir_l != left.direction:
+            left._step_gen.stop()
+        if dir_r != right.direction:
+            right._step_gen.stop()
+        generators = []
+        if left._load_freq(freq_l):
+            generators.append(left._step_gen)
+        if right._load_freq(freq_r):
+            generators.append(right._step_gen)
+
+        left._set_current_direction(dir_l)
+        right._set_current_direction(dir_r)
+        left._enabled = enabled
+        right._enabled = enabled
+        mcp_l, mask_l, data_l = left._dir_en_bits(dir_l, enabled)
+        mcp_r, mask_r, data_r = right._dir_en_bits(dir_r, enabled)
+        if mcp_l is mcp_r:
+            mcp_l.write_GPIO_masked(mask_l | mask_r, data_l | data_r, True)
+        else:
+            mcp_l.write_GPIO_masked(mask_l, data_l, True)
+            mcp_r.write_GPIO_masked(mask_r, data_r, True)
+
+        start = ticks_us()
+        step_generator.start_together(generators)
+        self.last_skew_us = ticks_diff(ticks_us(), start)
+        return self.last_skew_us
+
+    def drive(
+            self,
+            v: float,
+            omega: float,
+            wheel_radius: float = 0.032,
+            track_width: float = DEFAULT_TRACK_WIDTH,
+    ) -> int:
+        """
+        Drives with velocity v along a curve, turning with omega, see set_wheel_velocities().
+        @param v: Velocity of the robot's centre in m/s, negative drives backward
+        @param omega: Angular velocity in rad/s, positive turns left (counterclockwise)
+        @param wheel_radius: Wheel radius in m
+        @param track_width: Distance between the centres of the wheels in m
+        @return: The skew in us between starting both step generators
+        """
+        half_diff = omega * track_width / 2
+        return self.set_wheel_velocities(v - half_diff, v + half_diff, wheel_radius)
+
     def accelerate(
             self,
             a: float,
@@ -342,38 +690,52 @@ class Motors(base_module.BaseModule):
             to_v: float,
             s_limit: float = 1000,
             wheel_radius: float = 0.032,
-    ):
+            period_ms: int = Ramp.DEFAULT_PERIOD_MS,
+    ) -> Ramp:
         """
+        Starts a ramp of both motors and returns immediately, see Ramp.
         @param a: Acceleration in m/s^2
         @param from_v: Initial velocity in m/s
         @param to_v: Target velocity in m/s
         @param s_limit: Maximum distance to drive in m
         @param wheel_radius: Wheel radius in m
-        @return: Reached velocity in m/s, distance covered in m
+        @param period_ms: Update period of the step frequency in ms
+        @return: The running Ramp, Ramp.wait() returns the reached velocity in m/s and the
+                 distance covered in m
         """
-        v = from_v  # m/s
-        s = 0  # m
-        dt = 0.0011  # s, TODO: Find a way to calibrate this value
-
-        if a < 0:
-            while v > to_v and s < s_limit:
-                self.set_velocity(v, wheel_radius)
-                v += dt * a
-                s += dt * v
-        else:
-            while v < to_v and s < s_limit:
-                self.set_velocity(v, wheel_radius)
-                v += dt * a
-                s += dt * v
+        return Ramp((self.left, self.right), a, from_v, to_v, s_limit, wheel_radius, period_ms).start()
+
+    def play(self, profile: motion_profile.MotionProfile) -> ProfilePlayback:
+        """Plays a planned profile on both motors and returns immediately, see ProfilePlayback."""
+        return ProfilePlayback((self.left, self.right), profile).start()
 
-        return v, s
+    def move(
+            self,
+            distance: float,
+            v_max: float,
+            a_max: float,
+            jerk: float = 0,
+            wheel_radius: float = 0.032,
+            tick_ms: int = Ramp.DEFAULT_PERIOD_MS,
+    ) -> ProfilePlayback:
+        """
+        Plans a move (see motion_profile.plan()) and plays it on both motors. Planning a
+        long move takes a while, plan it with motion_profile.plan() up front and use
+        play() where that matters.
+        @param distance: Distance in m
+        @param v_max: Maximum velocity in m/s
+        @param a_max: Maximum acceleration in m/s^2
+        @param jerk: Maximum jerk in m/s^3, 0 for a trapezoid profile
+        @param wheel_radius: Wheel radius in m
+        @param tick_ms: Control tick in ms
+        """
+        return self.play(motion_profile.plan(distance, v_max, a_max, jerk, tick_ms, wheel_radius))
 
     def set_velocity(self, v: float, wheel_radius: float = 0.032):
-        # Dieser magische ↓ Wert ergibt sich aus 1.8 / 32 * (math.pi / 180) :)
-        f = int(v / (0.00098174 * wheel_radius))
+        f = velocity_to_freq(v, wheel_radius)
 
-        if f <= 7:
+        if f <= MIN_STEP_FREQ:
             self.disable()
             return
-        self.enable()
         self.set_freq(f)
+        self.enable()
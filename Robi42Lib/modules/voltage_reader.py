@@ -1,3 +1,5 @@
+from array import array
+
 from . import base_module
 
 
@@ -29,6 +31,14 @@ class VoltageReader(base_module.BaseModule):
         self.magic_bat = 1 / spannungsteiler_reverse(to_voltage(1, ref_voltage=self.REF_VOLTAGE), r1=2.2, r2=22)
         self.magic_50v = 1 / spannungsteiler_reverse(to_voltage(1, ref_voltage=self.REF_VOLTAGE), r1=2.2, r2=4.7)
         self.magic_33v = 1 / spannungsteiler_reverse(to_voltage(1, ref_voltage=self.REF_VOLTAGE), r1=2.2, r2=2.7)
+        self.__sampler = self.pin_battery.sampler
+        self.__channels = (self.pin_battery.channel, self.pin_50v.channel, self.pin_33v.channel)
+        self.__raw_values = array('H', [0, 0, 0])
+
+    def get_voltages(self) -> tuple[float, float, float]:
+        """Returns the battery, 5V and 3.3V voltages in V, sampled in one scan"""
+        raw = self.__sampler.scan(self.__channels, self.__raw_values)
+        return raw[0] / self.magic_bat, raw[1] / self.magic_50v, raw[2] / self.magic_33v
 
     def get_battery_voltage(self) -> float:
         """Returns the battery voltage in V"""
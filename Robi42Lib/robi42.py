@@ -1,43 +1,106 @@
-from .modules import buttons as _mod_buttons
-from .modules import eeprom as _mod_eeprom
-from .modules import gyro as _mod_gyro
-from .modules import ir_sensor as _mod_ir_sensor
-from .modules import laser_sensor as _mod_laser_sensor
-from .modules import lcd as _mod_lcd
-from .modules import led as _mod_led
-from .modules import motor as _mod_motor
-from .modules import piezo as _mod_piezo
-from .modules import poti as _mod_poti
+import time
+
+from .hardware_manager import bus_profiler
 
 
 class Robi42:
     """
     Robi42 is the main class that provides access to all hardware components
     such as motors, buttons, piezo, LEDs, and sensors.
+
+    The modules are imported and constructed when they are accessed for the first time,
+    so a program only pays for the modules it uses. Call preload() to take that cost
+    up front, e.g. before a time-critical loop.
     """
 
+    # attribute -> (module in Robi42Lib.modules, class)
+    MODULES = {
+        'buttons': ('buttons', 'Buttons'),
+        'piezo': ('piezo', 'Piezo'),
+        'poti': ('poti', 'Poti'),
+        'leds': ('led', 'Leds'),
+        'ir_sensors': ('ir_sensor', 'IrSensors'),
+        'lcd': ('lcd', 'LCD'),
+        'laser_sensor': ('laser_sensor', 'LaserSensor'),
+        'gyro': ('gyro', 'Gyro'),
+        'external_storage': ('eeprom', 'ExternalStorage'),
+        'motors': ('motor', 'Motors'),
+    }
+
+    # begin() always puts these into a defined state (motors disabled, LEDs and display
+    # off). Other modules are begun when they are loaded.
+    BEGIN_ON_BOOT = ('leds', 'lcd', 'motors')
+
     def __init__(self):
+        self.boot_time_ms = None
+        self.__begun = False
+        self.__loaded = []
+
+    def __getattr__(self, name):
+        # only called for attributes that are not set yet, i.e. modules not loaded yet
+        if name not in Robi42.MODULES:
+            raise AttributeError(name)
+        return self.__load_module(name)
+
+    def __load_module(self, name: str):
+        module_name, class_name = Robi42.MODULES[name]
+        module = __import__('modules.' + module_name, globals(), None, (class_name,), 1)
+        instance = getattr(module, class_name)()
+        setattr(self, name, instance)
+        self.__loaded.append(name)
+        profiler = bus_profiler.BusProfiler.get_instance()
+        if profiler.enabled:
+            profiler.instrument(instance, name)
+        if self.__begun:
+            self.__begin_module(name, instance)
+        return instance
+
+    def __begin_module(self, name: str, instance):
+        if name == 'motors':
+            if self.external_storage.is_connected():
+                hw_revision = self.external_storage.read_hw_revision()
+                instance.begin(True)
+            else:
+                instance.begin(False)
+        elif hasattr(instance, 'begin'):
+            instance.begin()
+
+    def preload(self, *names: str):
         """
-        Initializes all the hardware modules of Robi42.
+        Loads the given modules (all if none are given) now instead of on first access.
         """
-        self.buttons = _mod_buttons.Buttons()
-        self.piezo = _mod_piezo.Piezo()
-        self.poti = _mod_poti.Poti()
-        self.leds = _mod_led.Leds()
-        self.ir_sensors = _mod_ir_sensor.IrSensors()
-        self.lcd = _mod_lcd.LCD()
-        self.laser_sensor = _mod_laser_sensor.LaserSensor()
-        self.gyro = _mod_gyro.Gyro()
-        self.external_storage = _mod_eeprom.ExternalStorage()
-        self.motors = _mod_motor.Motors()
+        for name in names or Robi42.MODULES:
+            getattr(self, name)
+
+    @property
+    def loaded_modules(self) -> list:
+        return list(self.__loaded)
 
     def begin(self):
-        self.piezo.begin()
-        self.leds.begin()
-        self.lcd.begin()
-
-        if self.external_storage.is_connected():
-            hw_revision = self.external_storage.read_hw_revision()
-            self.motors.begin(True)
-        else:
-            self.motors.begin(False)
+        start = time.ticks_ms()
+        self._begin_modules()
+        self.boot_time_ms = time.ticks_diff(time.ticks_ms(), start)
+
+    async def begin_async(self):
+        """
+        Same as begin(), but first brings up all discovered I2C devices concurrently.
+        Usage: asyncio.run(robi.begin_async())
+        """
+        from .hardware_manager import manager as _hw_manager
+
+        start = time.ticks_ms()
+        await _hw_manager.HardwareManager.get_instance().warm_up_drivers_async()
+        self._begin_modules()
+        self.boot_time_ms = time.ticks_diff(time.ticks_ms(), start)
+
+    def _begin_modules(self):
+        from .hardware_manager import manager as _hw_manager
+
+        for name in Robi42.BEGIN_ON_BOOT:
+            getattr(self, name)
+        self.__begun = True
+        # modules loaded from here on are begun by __load_module()
+        for name in tuple(self.__loaded):
+            self.__begin_module(name, getattr(self, name))
+
+        _hw_manager.HardwareManager.get_instance().mark_boot_complete()
@@ -0,0 +1,74 @@
+"""
+Host-side simulator: runs Robi42Lib and programs using it under CPython.
+
+    from Robi42Lib import sim
+    board = sim.install()        # before anything imports machine
+
+    import Robi42Lib
+    robi = Robi42Lib.Robi42()
+    robi.begin()
+    board.press('center')
+
+install() registers stand-ins for the MicroPython modules (machine, rp2, utime, uctypes,
+micropython, uasyncio, ustruct), adds MicroPython's ticks and sleep functions to the
+time module and attaches a Robi42Board. Scripts can also be started with
+`python -m Robi42Lib.sim script.py`.
+
+Bus transactions and sleeps advance the simulated clock (see SimClock) instead of
+blocking, time.sleep() and the sleeps of asyncio coroutines included, so a program
+looping on sleep() runs faster than real time and stops at run_for()'s limit.
+"""
+
+import sys
+import time as _host_time
+
+from .clock import clock, SimClock, SimulationTimeout
+
+_STAND_INS = ('machine', 'rp2', 'utime', 'uctypes', 'micropython', 'uasyncio', 'ustruct')
+
+_board = None
+
+
+def install(board=None):
+    """
+    Installs the stand-in modules and attaches board (a default Robi42Board if None).
+    Returns the board. Calling it again returns the board installed first.
+    """
+    global _board
+    if _board is not None:
+        return _board
+    for name in _STAND_INS:
+        existing = sys.modules.get(name)
+        if existing is not None and not getattr(existing, '__name__', '').startswith(__name__):
+            raise RuntimeError('\'{}\' is already imported, install the simulator first'.format(name))
+
+    from . import machine, rp2, utime, uctypes, micropython, uasyncio, ustruct
+    for module in (machine, rp2, utime, uctypes, micropython, uasyncio, ustruct):
+        sys.modules[module.__name__.rsplit('.', 1)[1]] = module
+
+    # MicroPython's time module has the ticks functions, CPython's does not; its sleep()
+    # has to advance the simulated clock as well
+    for name in ('ticks_ms', 'ticks_us', 'ticks_cpu', 'ticks_add', 'ticks_diff', 'sleep', 'sleep_ms', 'sleep_us'):
+        setattr(_host_time, name, getattr(utime, name))
+    # and asyncio's sleeps as well, so coroutines share the time base
+    uasyncio.use_simulated_time()
+
+    if board is None:
+        from .board import Robi42Board
+        board = Robi42Board()
+    board.attach()
+    _board = board
+    return board
+
+
+def get_board():
+    """Returns the installed board or None."""
+    return _board
+
+
+def run_for(seconds: float) -> None:
+    """
+    Ends the simulated program with SimulationTimeout once it ran for seconds of
+    simulated time (checked whenever it touches the clock or a bus).
+    """
+    clock.limit_us = clock.now_us() + int(seconds * 1_000_000)
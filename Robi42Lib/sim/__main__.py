@@ -0,0 +1,41 @@
+"""
+Runs a Robi42 program on the simulator:
+
+    python -m Robi42Lib.sim examples/line_follower.py --seconds 5
+"""
+
+import argparse
+import runpy
+import sys
+
+from . import install, run_for, clock, SimulationTimeout
+from .board import Robi42Board
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m Robi42Lib.sim', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('script', help='program to run, e.g. examples/line_follower.py')
+    parser.add_argument('--seconds', type=float, default=None, help='stop after this much simulated time')
+    parser.add_argument('--laser', choices=('vl53l1x', 'vl53l0x', 'none'), default='vl53l1x')
+    parser.add_argument('--no-eeprom', action='store_true', help='simulate a board before the bug fix revision')
+    parser.add_argument('--adc-noise', type=int, default=0, help='ADC noise in LSB')
+    args = parser.parse_args(argv)
+
+    board = install(Robi42Board(laser=args.laser, eeprom=not args.no_eeprom, adc_noise=args.adc_noise))
+    if args.seconds is not None:
+        run_for(args.seconds)
+    sys.argv = [args.script]
+    try:
+        runpy.run_path(args.script, run_name='__main__')
+    except SimulationTimeout:
+        pass
+    except KeyboardInterrupt:
+        print('Interrupted')
+    print('Simulated time: {:.3f}s'.format(clock.now_us() / 1_000_000))
+    for line in board.lcd_lines():
+        print('LCD |{}|'.format(line))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+from . import machine
+from . import pio_models
+from .spi_devices import VirtualMCP23S17, VirtualMCP3008
+from .i2c_devices import (
+    VirtualMPU6050, VirtualVL53L0X, VirtualVL53L1X, VirtualHD44780Backpack, Virtual24LC256, VirtualINA226,
+)
+
+
+class Robi42Board():
+    """
+    The Robi42 main board with its peripherals, wired like the platform description:
+
+    - SPI1 (CS GPIO13): two MCP23S17 expanders (hardware addresses 0 and 1) with buttons,
+      motor driver inputs and LEDs
+    - SPI0 (CS GPIO5): MCP3008 with the IR sensors, supply voltages and the poti
+    - I2C0: HD44780 display backpack (0x27), 24LC256 EEPROM (0x50), MPU6050 (0x68)
+    - I2C1: VL53L1X or VL53L0X distance sensor (0x29), INA226 (0x40)
+
+    Optional peripherals can be left out to simulate older or partly equipped robots
+    (without the EEPROM the library assumes the hardware revision before the bug fix).
+    """
+
+    SPI_ANALOG = 0
+    SPI_DIGITAL = 1
+    CS_ANALOG = 5
+    CS_DIGITAL = 13
+
+    # voltage dividers (r1, r2) in front of the ADC, see modules/voltage_reader.py
+    DIVIDERS = {'u_bat': (2.2, 22), 'u_5v': (2.2, 4.7), 'u_3v3': (2.2, 2.7)}
+
+    def __init__(self, laser: str = 'vl53l1x', eeprom: bool = True, lcd: bool = True, imu: bool = True,
+                 power_monitor: bool = True, adc_noise: int = 0) -> None:
+        self.expanders = [VirtualMCP23S17(self.CS_DIGITAL, 0), VirtualMCP23S17(self.CS_DIGITAL, 1)]
+        self.adc = VirtualMCP3008(self.CS_ANALOG, noise=adc_noise)
+        self.lcd = VirtualHD44780Backpack(0x27) if lcd else None
+        self.eeprom = Virtual24LC256(0x50) if eeprom else None
+        self.imu = VirtualMPU6050(0x68) if imu else None
+        if laser == 'vl53l1x':
+            self.laser = VirtualVL53L1X(0x29)
+        elif laser == 'vl53l0x':
+            self.laser = VirtualVL53L0X(0x29)
+        else:
+            self.laser = None
+        self.power_monitor = VirtualINA226(0x40) if power_monitor else None
+
+    def attach(self) -> None:
+        """
+        Connects the devices to the simulated buses and sets the analog inputs to a
+        bright floor and a charged battery. Called by install(), once `machine` exists.
+        """
+        self.set_ir(800, 800, 800)
+        self.set_voltages(7.4, 5.0, 3.3)
+        self.set_poti(512)
+        pio_models.register()
+        for expander in self.expanders:
+            machine.attach_spi_device(self.SPI_DIGITAL, expander)
+        machine.attach_spi_device(self.SPI_ANALOG, self.adc)
+        for device in (self.lcd, self.eeprom, self.imu):
+            if device is not None:
+                machine.attach_i2c_device(0, device)
+        for device in (self.laser, self.power_monitor):
+            if device is not None:
+                machine.attach_i2c_device(1, device)
+
+    # --- digital ---
+
+    @staticmethod
+    def __digital_pin(pin_id: str):
+        from ..hardware_manager.platform_description import DigitalBoardPin
+        return DigitalBoardPin.PIN_LOOKUP[pin_id]
+
+    def press(self, button: str) -> None:
+        """button: 'up', 'down', 'left', 'right' or 'center'"""
+        chip, pin = self.__digital_pin('btn_' + button)
+        self.expanders[chip].set_input(pin, 0)
+
+    def release(self, button: str) -> None:
+        chip, pin = self.__digital_pin('btn_' + button)
+        self.expanders[chip].set_input(pin, None)
+
+    def digital_level(self, pin_id: str) -> int:
+        """Level of a board pin (e.g. 'ml_en' or 'led_sl') as seen from outside."""
+        chip, pin = self.__digital_pin(pin_id)
+        return self.expanders[chip].pin_level(pin)
+
+    def leds(self) -> int:
+        """Output latch of the LED port."""
+        return self.expanders[1].port_outputs(0)
+
+    def connect_expander_interrupt(self, chip: int, gpio: int) -> None:
+        """Wires INTA/INTB (mirrored or not) of an expander to a GPIO of the Pico."""
+        machine.drive_pin(gpio, 1)
+        self.expanders[chip].on_interrupt = lambda port, active: machine.drive_pin(gpio, 0 if active else 1)
+
+    # --- motors ---
+
+    def motor_enabled(self, side: str) -> bool:
+        """side: 'left' or 'right'. The enable input of the driver is active low."""
+        return self.digital_level('ml_en' if side == 'left' else 'mr_en') == 0
+
+    def motor_direction(self, side: str) -> int:
+        return self.digital_level('ml_dir' if side == 'left' else 'mr_dir')
+
+    @staticmethod
+    def __step_pin(side: str, new_hardware: bool) -> int:
+        if new_hardware:
+            return 14 if side == 'left' else 20
+        return 20 if side == 'left' else 21
+
+    def step_frequency(self, side: str) -> float:
+        """Frequency on the STEP input of a motor driver in Hz, 0 if none."""
+        source = machine.pulse_source(self.__step_pin(side, self.eeprom is not None))
+        return source.rate if source is not None else 0
+
+    def step_pulses(self, side: str) -> int:
+        """STEP pulses a motor driver got so far, whether it was enabled or not."""
+        return machine.pulse_count(self.__step_pin(side, self.eeprom is not None))
+
+    # --- analog ---
+
+    @staticmethod
+    def __analog_channel(pin_id: str) -> int:
+        from ..hardware_manager.platform_description import AnalogBoardPin
+        return AnalogBoardPin.PIN_LOOKUP[pin_id]
+
+    def set_ir(self, left: int, middle: int, right: int) -> None:
+        """Raw values of the IR sensors, low values mean a dark surface."""
+        for pin_id, value in (('ir_left', left), ('ir_middle', middle), ('ir_right', right)):
+            self.adc.set_raw(self.__analog_channel(pin_id), value)
+
+    def set_voltages(self, battery: float, u_5v: float, u_3v3: float) -> None:
+        for pin_id, volts in (('u_bat', battery), ('u_5v', u_5v), ('u_3v3', u_3v3)):
+            r1, r2 = self.DIVIDERS[pin_id]
+            self.adc.set_voltage(self.__analog_channel(pin_id), volts / (1 + r2 / r1))
+
+    def set_poti(self, raw: int) -> None:
+        self.adc.set_raw(self.__analog_channel('poti'), raw)
+
+    # --- I2C peripherals ---
+
+    def set_distance_mm(self, distance_mm: int) -> None:
+        self.laser.distance_mm = int(distance_mm)
+
+    def lcd_lines(self) -> list:
+        return self.lcd.lines() if self.lcd is not None else []
@@ -0,0 +1,123 @@
+import time as _host_time
+
+
+class SimulationTimeout(Exception):
+    """Raised from inside the simulated program once its time limit is reached."""
+    pass
+
+
+class SimClock():
+    """
+    Time base of the simulator.
+
+    The simulated time is the host time since start plus the time the simulated hardware
+    spent: bus transactions and sleep_ms()/sleep_us() advance the clock instead of
+    blocking, so a program runs at least as fast as on the Pico and bus latencies show up
+    in ticks_us() as they would on the device.
+
+    Timer callbacks and functions passed to micropython.schedule() are run from poll(),
+    which is called whenever the program touches the clock or a bus. On the Pico they run
+    between two bytecodes of the main program, which is the same from the program's
+    point of view.
+    """
+
+    TICKS_PERIOD = 1 << 30  # MicroPython's ticks wrap at this value
+    TICKS_MAX = TICKS_PERIOD - 1
+
+    def __init__(self) -> None:
+        self.__host_start_ns = _host_time.perf_counter_ns()
+        self.__offset_us = 0
+        self.__timers = []
+        self.__scheduled = []
+        self.__dispatching = False
+        self.limit_us = None
+
+    def now_us(self) -> int:
+        """Simulated time since start in us, not wrapped."""
+        return (_host_time.perf_counter_ns() - self.__host_start_ns) // 1000 + self.__offset_us
+
+    def advance(self, us: int) -> None:
+        """Lets us of simulated time pass, e.g. for a bus transaction or a sleep."""
+        if us > 0:
+            self.__offset_us += int(us)
+        self.poll()
+
+    def sleep_us(self, us: int) -> None:
+        # advance in steps so that timers fire in between, as they would on the Pico
+        end = self.now_us() + int(us)
+        while True:
+            remaining = end - self.now_us()
+            if remaining <= 0:
+                break
+            step = remaining
+            # timers cannot fire while a callback sleeps
+            deadline = None if self.__dispatching else self.__next_deadline()
+            if deadline is not None:
+                step = min(step, max(deadline - self.now_us(), 1))
+            self.advance(step)
+        self.poll()
+
+    # --- timers and scheduler ---
+
+    def add_timer(self, timer) -> None:
+        if timer not in self.__timers:
+            self.__timers.append(timer)
+
+    def remove_timer(self, timer) -> None:
+        if timer in self.__timers:
+            self.__timers.remove(timer)
+
+    def schedule(self, func, arg) -> None:
+        if len(self.__scheduled) >= 8:  # same queue depth as MicroPython
+            raise RuntimeError('schedule queue full')
+        self.__scheduled.append((func, arg))
+
+    def __next_deadline(self):
+        deadline = None
+        for timer in self.__timers:
+            if deadline is None or timer.deadline_us < deadline:
+                deadline = timer.deadline_us
+        return deadline
+
+    def poll(self) -> None:
+        """Runs due timer callbacks and scheduled functions."""
+        if self.__dispatching:
+            return
+        now = self.now_us()
+        if self.limit_us is not None and now >= self.limit_us:
+            self.limit_us = None
+            raise SimulationTimeout()
+        self.__dispatching = True
+        try:
+            for timer in list(self.__timers):
+                # a callback may have removed a timer due as well
+                if timer.deadline_us <= now and timer in self.__timers:
+                    timer.fire(now)
+            while self.__scheduled:
+                func, arg = self.__scheduled.pop(0)
+                func(arg)
+        finally:
+            self.__dispatching = False
+
+    # --- MicroPython's time functions ---
+
+    def ticks_us(self) -> int:
+        self.poll()
+        return self.now_us() & self.TICKS_MAX
+
+    def ticks_ms(self) -> int:
+        self.poll()
+        return (self.now_us() // 1000) & self.TICKS_MAX
+
+    @classmethod
+    def ticks_add(cls, ticks: int, delta: int) -> int:
+        return (ticks + delta) & cls.TICKS_MAX
+
+    @classmethod
+    def ticks_diff(cls, ticks1: int, ticks2: int) -> int:
+        half = cls.TICKS_PERIOD // 2
+        return ((ticks1 - ticks2 + half) & cls.TICKS_MAX) - half
+
+
+# the clock shared by all stand-in modules
+clock = SimClock()
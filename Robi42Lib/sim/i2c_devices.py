@@ -0,0 +1,375 @@
+"""
+Virtual I2C devices. A transaction hands the device the written bytes (i2c_write) or
+asks it for bytes (i2c_read); a device that is busy does not acknowledge its address.
+"""
+
+import random
+
+from .clock import clock
+
+
+class VirtualI2CDevice():
+    def __init__(self, address: int) -> None:
+        self.address = address
+        self.busy_until_us = 0
+        self.transactions = 0
+
+    def acknowledges(self) -> bool:
+        self.transactions += 1
+        return clock.now_us() >= self.busy_until_us
+
+    def i2c_write(self, data: bytes, stop: bool) -> None:
+        raise NotImplementedError
+
+    def i2c_read(self, nbytes: int) -> bytes:
+        raise NotImplementedError
+
+
+class VirtualRegisterDevice(VirtualI2CDevice):
+    """
+    Device with an address pointer of addrsize bytes (big endian) that is set by the
+    first bytes of a write and incremented with every data byte.
+    """
+
+    def __init__(self, address: int, addrsize: int = 1) -> None:
+        super().__init__(address)
+        self.addrsize = addrsize
+        self.pointer = 0
+
+    def i2c_write(self, data: bytes, stop: bool) -> None:
+        if len(data) < self.addrsize:
+            return
+        self.pointer = int.from_bytes(data[:self.addrsize], 'big')
+        for value in data[self.addrsize:]:
+            self.write_register(self.pointer, value)
+            self.pointer += 1
+
+    def i2c_read(self, nbytes: int) -> bytes:
+        out = bytearray(nbytes)
+        for i in range(nbytes):
+            out[i] = self.read_register(self.pointer) & 0xFF
+            self.pointer += 1
+        return bytes(out)
+
+    def read_register(self, reg: int) -> int:
+        return 0
+
+    def write_register(self, reg: int, value: int) -> None:
+        pass
+
+
+def _int16_be(value: float) -> bytes:
+    value = max(-32768, min(32767, int(round(value))))
+    return (value & 0xFFFF).to_bytes(2, 'big')
+
+
+class VirtualMPU6050(VirtualRegisterDevice):
+    """
+    MPU6050 with the accelerometer, temperature and gyroscope output registers computed
+    from accel (g), gyro (deg/s) and temperature (deg C), scaled by the configured ranges.
+    """
+
+    WHO_AM_I = 0x75
+    PWR_MGMT_1 = 0x6B
+    GYRO_CONFIG = 0x1B
+    ACCEL_CONFIG = 0x1C
+    ACCEL_XOUT_H = 0x3B
+
+    def __init__(self, address: int = 0x68, noise: float = 0.0, seed: int = 42) -> None:
+        super().__init__(address)
+        self.regs = bytearray(128)
+        self.regs[self.WHO_AM_I] = 0x68
+        self.regs[self.PWR_MGMT_1] = 0x40  # sleeping after power-up
+        self.accel = (0.0, 0.0, 1.0)
+        self.gyro = (0.0, 0.0, 0.0)
+        self.temperature = 25.0
+        self.noise = noise
+        self.__random = random.Random(seed)
+        self.__sample = b''
+
+    def __noisy(self, value: float) -> float:
+        if self.noise:
+            return value + self.__random.uniform(-self.noise, self.noise)
+        return value
+
+    def __latch_sample(self) -> None:
+        # the output registers are sampled together, as the chip does for a burst read
+        accel_lsb = 16384 >> ((self.regs[self.ACCEL_CONFIG] >> 3) & 0x03)
+        gyro_lsb = 131 / (1 << ((self.regs[self.GYRO_CONFIG] >> 3) & 0x03))
+        data = b''.join(_int16_be(self.__noisy(a) * accel_lsb) for a in self.accel)
+        data += _int16_be((self.temperature - 36.53) * 340)
+        data += b''.join(_int16_be(self.__noisy(g) * gyro_lsb) for g in self.gyro)
+        self.__sample = data
+
+    def i2c_read(self, nbytes: int) -> bytes:
+        if self.ACCEL_XOUT_H <= self.pointer < self.ACCEL_XOUT_H + 14:
+            self.__latch_sample()
+        return super().i2c_read(nbytes)
+
+    def read_register(self, reg: int) -> int:
+        if self.ACCEL_XOUT_H <= reg < self.ACCEL_XOUT_H + 14:
+            return self.__sample[reg - self.ACCEL_XOUT_H]
+        return self.regs[reg & 0x7F]
+
+    def write_register(self, reg: int, value: int) -> None:
+        if reg != self.WHO_AM_I:
+            self.regs[reg & 0x7F] = value
+
+
+class VirtualVL53L0X(VirtualRegisterDevice):
+    """
+    VL53L0X time-of-flight sensor. A ranging result is ready timing_budget_us after a
+    start (single shot) or after the previous result was cleared (back-to-back mode).
+    """
+
+    SYSRANGE_START = 0x00
+    INTERRUPT_CLEAR = 0x0B
+    RESULT_INTERRUPT_STATUS = 0x13
+    RESULT_RANGE = 0x14 + 10
+
+    def __init__(self, address: int = 0x29, timing_budget_us: int = 33_000) -> None:
+        super().__init__(address)
+        self.regs = bytearray(256)
+        self.regs[0xC0] = 0xEE  # model id
+        self.regs[0x92] = 0x2C  # SPAD count and type
+        self.distance_mm = 200
+        self.timing_budget_us = timing_budget_us
+        self.__ready_at_us = None
+        self.__continuous = False
+
+    def read_register(self, reg: int) -> int:
+        reg &= 0xFF
+        if reg == self.SYSRANGE_START:
+            return self.regs[reg] & ~0x01  # the start bit clears itself
+        if reg == self.RESULT_INTERRUPT_STATUS:
+            ready = self.__ready_at_us is not None and clock.now_us() >= self.__ready_at_us
+            return 0x07 if ready else 0x00
+        if reg == self.RESULT_RANGE:
+            return (self.distance_mm >> 8) & 0xFF
+        if reg == self.RESULT_RANGE + 1:
+            return self.distance_mm & 0xFF
+        if reg == 0x83:
+            return self.regs[reg] or 0x01  # SPAD info ready
+        return self.regs[reg]
+
+    def write_register(self, reg: int, value: int) -> None:
+        reg &= 0xFF
+        self.regs[reg] = value
+        if reg == self.SYSRANGE_START:
+            if value & 0x01:  # single shot
+                self.__continuous = False
+                self.__ready_at_us = clock.now_us() + self.timing_budget_us
+            elif value & 0x06:  # back-to-back or timed
+                self.__continuous = True
+                self.__ready_at_us = clock.now_us() + self.timing_budget_us
+        elif reg == self.INTERRUPT_CLEAR and value & 0x01:
+            if self.__continuous:
+                self.__ready_at_us = clock.now_us() + self.timing_budget_us
+            else:
+                self.__ready_at_us = None
+
+
+class VirtualVL53L1X(VirtualRegisterDevice):
+    """
+    VL53L1X time-of-flight sensor (16 bit register addresses). Reports distance_mm in
+    the result block at 0x0089 and counts the results in the stream count.
+    """
+
+    MODEL_ID = 0x010F
+    RESULT_BLOCK = 0x0089
+
+    def __init__(self, address: int = 0x29) -> None:
+        super().__init__(address, addrsize=2)
+        self.regs = {self.MODEL_ID: 0xEA, self.MODEL_ID + 1: 0xCC, 0x0022: 0x00, 0x0023: 0x60}
+        self.distance_mm = 200
+        self.__stream_count = 0
+
+    def i2c_write(self, data: bytes, stop: bool) -> None:
+        # a master that uses 8 bit register addresses gets nothing meaningful back
+        if len(data) < 2:
+            self.pointer = 0xFFFF
+            return
+        super().i2c_write(data, stop)
+
+    def i2c_read(self, nbytes: int) -> bytes:
+        if self.pointer == self.RESULT_BLOCK:
+            self.__stream_count = (self.__stream_count + 1) & 0xFF
+            block = bytearray(17)
+            block[0] = 9  # range valid
+            block[2] = self.__stream_count
+            block[13:15] = self.distance_mm.to_bytes(2, 'big')
+            block[15:17] = (0x2000).to_bytes(2, 'big')
+            self.pointer += nbytes
+            return bytes(block[:nbytes]) + bytes(max(0, nbytes - 17))
+        return super().i2c_read(nbytes)
+
+    def read_register(self, reg: int) -> int:
+        return self.regs.get(reg, 0)
+
+    def write_register(self, reg: int, value: int) -> None:
+        self.regs[reg] = value
+
+
+class VirtualHD44780Backpack(VirtualI2CDevice):
+    """
+    HD44780 character display behind a PCF8574 I/O expander (RS = P0, E = P2,
+    backlight = P3, D4..D7 = P4..P7). Decodes the nibbles latched on the falling edge
+    of E into the display RAM, lines() returns the visible text.
+    """
+
+    MASK_RS = 0x01
+    MASK_E = 0x04
+    MASK_BACKLIGHT = 0x08
+
+    def __init__(self, address: int = 0x27, num_lines: int = 2, num_columns: int = 16) -> None:
+        super().__init__(address)
+        self.num_lines = num_lines
+        self.num_columns = num_columns
+        self.ddram = bytearray(b' ' * 0x80)
+        self.display_on = False
+        self.backlight = False
+        self.port = 0
+        self.__address = 0
+        self.__eight_bit = True
+        self.__pending = None
+
+    def lines(self) -> list:
+        offsets = (0x00, 0x40, 0x14, 0x54)
+        return [
+            self.ddram[offsets[line]:offsets[line] + self.num_columns].decode('ascii', 'replace')
+            for line in range(self.num_lines)
+        ]
+
+    def i2c_write(self, data: bytes, stop: bool) -> None:
+        for value in data:
+            if self.port & self.MASK_E and not value & self.MASK_E:
+                self.__latch(self.port)
+            self.port = value
+            self.backlight = bool(value & self.MASK_BACKLIGHT)
+
+    def i2c_read(self, nbytes: int) -> bytes:
+        return bytes([self.port]) * nbytes
+
+    def __latch(self, port: int) -> None:
+        nibble = port >> 4
+        rs = port & self.MASK_RS
+        if self.__eight_bit:
+            self.__execute(rs, nibble << 4)
+        elif self.__pending is None:
+            self.__pending = nibble
+        else:
+            self.__execute(rs, (self.__pending << 4) | nibble)
+            self.__pending = None
+
+    def __execute(self, rs: int, value: int) -> None:
+        if rs:
+            self.ddram[self.__address] = value
+            self.__address = (self.__address + 1) & 0x7F
+            return
+        if value & 0x80:
+            self.__address = value & 0x7F
+        elif value & 0x40:
+            pass  # CGRAM address, custom characters are not modelled
+        elif value & 0x20:
+            self.__eight_bit = bool(value & 0x10)
+            self.__pending = None
+        elif value & 0x08:
+            self.display_on = bool(value & 0x04)
+        elif value == 0x01:
+            self.ddram[:] = b' ' * len(self.ddram)
+            self.__address = 0
+            self.busy_until_us = clock.now_us() + 1520
+        elif value & 0xFE == 0x02:
+            self.__address = 0
+            self.busy_until_us = clock.now_us() + 1520
+
+
+class Virtual24LC256(VirtualI2CDevice):
+    """
+    24LC256 32KiB EEPROM with 64 byte pages. Does not acknowledge during the 5ms write
+    cycle after a write, so ACK polling works as on the chip.
+    """
+
+    SIZE = 32768
+    PAGE_SIZE = 64
+    WRITE_CYCLE_US = 5000
+
+    def __init__(self, address: int = 0x50) -> None:
+        super().__init__(address)
+        self.memory = bytearray(b'\xff' * self.SIZE)
+        self.pointer = 0
+
+    def i2c_write(self, data: bytes, stop: bool) -> None:
+        if len(data) < 2:
+            return
+        self.pointer = int.from_bytes(data[:2], 'big') & (self.SIZE - 1)
+        payload = data[2:]
+        if not payload:
+            return
+        page = self.pointer & ~(self.PAGE_SIZE - 1)
+        offset = self.pointer - page
+        for value in payload:
+            # writes past the page boundary wrap around to the start of the page
+            self.memory[page + offset] = value
+            offset = (offset + 1) % self.PAGE_SIZE
+        self.pointer = page + offset
+        self.busy_until_us = clock.now_us() + self.WRITE_CYCLE_US
+
+    def i2c_read(self, nbytes: int) -> bytes:
+        out = bytearray(nbytes)
+        for i in range(nbytes):
+            out[i] = self.memory[self.pointer]
+            self.pointer = (self.pointer + 1) & (self.SIZE - 1)
+        return bytes(out)
+
+
+class VirtualINA226(VirtualRegisterDevice):
+    """
+    INA226 current/power monitor with a shunt of shunt_ohm. Shunt, bus, current and power
+    registers follow bus_voltage (V) and current (A) and the calibration register.
+    """
+
+    CONFIG, SHUNT, BUS, POWER, CURRENT, CALIBRATION = 0x00, 0x01, 0x02, 0x03, 0x04, 0x05
+    MASK_ENABLE, ALERT_LIMIT, MANUFACTURER_ID, DIE_ID = 0x06, 0x07, 0xFE, 0xFF
+
+    def __init__(self, address: int = 0x40, shunt_ohm: float = 0.1) -> None:
+        super().__init__(address)
+        self.shunt_ohm = shunt_ohm
+        self.bus_voltage = 7.4
+        self.current = 0.25
+        self.regs = {
+            self.CONFIG: 0x4127,
+            self.CALIBRATION: 0,
+            self.MASK_ENABLE: 0,
+            self.ALERT_LIMIT: 0,
+            self.MANUFACTURER_ID: 0x5449,
+            self.DIE_ID: 0x2260,
+        }
+        self.__write_msb = None
+
+    def __register_value(self, reg: int) -> int:
+        shunt = int(round(self.current * self.shunt_ohm / 2.5e-6))
+        bus = int(round(self.bus_voltage / 1.25e-3))
+        current = shunt * self.regs[self.CALIBRATION] // 2048
+        if reg == self.SHUNT:
+            return shunt & 0xFFFF
+        if reg == self.BUS:
+            return bus & 0x7FFF
+        if reg == self.CURRENT:
+            return current & 0xFFFF
+        if reg == self.POWER:
+            return (abs(current) * bus // 20000) & 0xFFFF
+        return self.regs.get(reg, 0)
+
+    def i2c_write(self, data: bytes, stop: bool) -> None:
+        if not data:
+            return
+        self.pointer = data[0]
+        payload = data[1:]
+        for i in range(0, len(payload) - 1, 2):
+            if self.pointer in self.regs and self.pointer < self.MANUFACTURER_ID:
+                self.regs[self.pointer] = (payload[i] << 8) | payload[i + 1]
+
+    def i2c_read(self, nbytes: int) -> bytes:
+        value = self.__register_value(self.pointer)
+        return (value.to_bytes(2, 'big') * ((nbytes + 1) // 2))[:nbytes]
@@ -0,0 +1,443 @@
+"""
+Stand-in for MicroPython's `machine` module (RP2040 port).
+
+Pins, PWM and timers keep their state in this module, so the board model can look at
+outputs and drive inputs. SPI and I2C transactions go to the virtual devices attached
+with attach_spi_device() / attach_i2c_device() and advance the simulated clock by the
+time the transfer takes on the wire.
+"""
+
+from .clock import clock
+
+EIO = 5  # errno the RP2040 port raises when a device does not acknowledge
+
+# per call overhead of the bus functions on the Pico (argument parsing, buffer
+# handling), on top of the time on the wire
+SPI_CALL_OVERHEAD_US = 4
+I2C_CALL_OVERHEAD_US = 15
+
+
+class _PinState():
+    def __init__(self) -> None:
+        self.mode = Pin.IN
+        self.pull = None
+        self.level = 0  # driven by the Pico (output) or seen by the Pico (input)
+        self.external = None  # level driven from outside, None if floating
+        self.irq_handler = None
+        self.irq_trigger = 0
+        self.listeners = []
+
+
+_pins = {}
+
+
+def _pin_state(pin_id: int) -> _PinState:
+    state = _pins.get(pin_id)
+    if state is None:
+        state = _pins[pin_id] = _PinState()
+    return state
+
+
+def _input_level(state: _PinState) -> int:
+    if state.mode == Pin.OUT:
+        return state.level
+    if state.external is not None:
+        return state.external
+    if state.pull == Pin.PULL_UP:
+        return 1
+    return 0
+
+
+def drive_pin(pin_id: int, level) -> None:
+    """
+    Drives a pin from outside (a button, the INT line of an expander, ...). Pass None to
+    release it. Fires the pin's IRQ handler on a matching edge.
+    """
+    state = _pin_state(pin_id)
+    old = _input_level(state)
+    state.external = None if level is None else (1 if level else 0)
+    new = _input_level(state)
+    if old != new and state.irq_handler is not None:
+        edge = Pin.IRQ_RISING if new else Pin.IRQ_FALLING
+        if state.irq_trigger & edge:
+            state.irq_handler(Pin(pin_id))
+
+
+def add_pin_listener(pin_id: int, listener) -> None:
+    """listener(level) is called whenever the Pico changes the level of an output."""
+    _pin_state(pin_id).listeners.append(listener)
+
+
+def pin_level(pin_id: int) -> int:
+    return _input_level(_pin_state(pin_id))
+
+
+class Pin():
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    ALT = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, *, value=None, **kwargs) -> None:
+        self.id = id
+        self.__state = _pin_state(id)
+        self.init(mode, pull, value=value)
+
+    def init(self, mode=-1, pull=-1, *, value=None, **kwargs) -> None:
+        if mode != -1:
+            self.__state.mode = mode
+        if pull != -1:
+            self.__state.pull = pull
+        if value is not None:
+            self.value(value)
+
+    def value(self, level=None):
+        state = self.__state
+        if level is None:
+            return _input_level(state)
+        level = 1 if level else 0
+        if level != state.level:
+            state.level = level
+            for listener in state.listeners:
+                listener(level)
+        else:
+            state.level = level
+        clock.poll()
+
+    def __call__(self, level=None):
+        return self.value(level)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    high = on
+    low = off
+
+    def toggle(self):
+        self.value(not self.__state.level)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, **kwargs):
+        self.__state.irq_handler = handler
+        self.__state.irq_trigger = trigger
+
+    def __repr__(self) -> str:
+        return 'Pin({})'.format(self.id)
+
+
+class PulseSource():
+    """
+    Something that outputs pulses on a pin at a rate changing over time (a PWM slice,
+    a PIO program). Counts the pulses so far, call set_rate() whenever the rate changes.
+    """
+
+    def __init__(self, pulses: float = 0.0) -> None:
+        self.__pulses = pulses
+        self.__rate = 0
+        self.__since_us = clock.now_us()
+        self.__limit = None
+
+    def set_rate(self, rate_hz: float, at_us: float = None, pulses: float = None, limit: float = None) -> None:
+        """
+        Changes the rate now or at a time passed already (e.g. a timer's deadline).
+        @param pulses: The count at at_us instead of the one so far, e.g. + 1 for an edge output at once
+        @param limit: The count stops there (the end of a burst of pulses)
+        """
+        if at_us is None:
+            at_us = clock.now_us()
+        self.__pulses = self.pulses(at_us) if pulses is None else pulses
+        self.__since_us = at_us
+        self.__rate = rate_hz
+        self.__limit = limit
+
+    @property
+    def rate(self) -> float:
+        return self.__rate
+
+    def pulses(self, at_us: float = None) -> float:
+        if at_us is None:
+            at_us = clock.now_us()
+        pulses = self.__pulses + self.__rate * (at_us - self.__since_us) / 1_000_000
+        return pulses if self.__limit is None else min(pulses, self.__limit)
+
+
+_pulse_sources = {}
+
+
+def set_pulse_source(pin_id: int, source: PulseSource) -> None:
+    _pulse_sources[pin_id] = source
+
+
+def pulse_source(pin_id: int):
+    return _pulse_sources.get(pin_id)
+
+
+def pulse_count(pin_id: int) -> int:
+    """Number of rising edges output on a pin so far."""
+    source = _pulse_sources.get(pin_id)
+    # the small margin keeps float rounding from losing the last pulse of a segment
+    return int(source.pulses() + 1e-6) if source is not None else 0
+
+
+_pwm_by_pin = {}
+
+
+def pwm_state(pin_id: int):
+    """Returns the PWM driving a pin, or None."""
+    return _pwm_by_pin.get(pin_id)
+
+
+class PWM(PulseSource):
+    def __init__(self, dest, *, freq=None, duty_u16=None, duty_ns=None, invert=False) -> None:
+        super().__init__()
+        self.pin_id = dest.id if isinstance(dest, Pin) else dest
+        self.__freq = 0
+        self.__duty_u16 = 0
+        self.active = True
+        _pwm_by_pin[self.pin_id] = self
+        set_pulse_source(self.pin_id, self)
+        if freq is not None:
+            self.freq(freq)
+        if duty_u16 is not None:
+            self.duty_u16(duty_u16)
+
+    def __update_rate(self) -> None:
+        pulsing = self.active and 0 < self.__duty_u16 < 0xFFFF
+        self.set_rate(self.__freq if pulsing else 0)
+
+    def freq(self, value=None):
+        if value is None:
+            return self.__freq
+        if not 8 <= value <= 62_500_000:
+            raise ValueError('freq out of range')
+        self.__freq = int(value)
+        self.__update_rate()
+
+    def duty_u16(self, value=None):
+        if value is None:
+            return self.__duty_u16
+        self.__duty_u16 = int(value) & 0xFFFF
+        self.__update_rate()
+
+    def duty_ns(self, value=None):
+        period_ns = 1_000_000_000 // self.__freq if self.__freq else 0
+        if value is None:
+            return period_ns * self.__duty_u16 // 0xFFFF
+        self.__duty_u16 = min(0xFFFF, value * 0xFFFF // period_ns) if period_ns else 0
+        self.__update_rate()
+
+    def deinit(self):
+        self.active = False
+        self.__update_rate()
+        if _pwm_by_pin.get(self.pin_id) is self:
+            del _pwm_by_pin[self.pin_id]
+
+
+class Timer():
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs) -> None:
+        self.id = id
+        self.deadline_us = 0
+        self.__period_us = 0
+        self.__mode = Timer.PERIODIC
+        self.__callback = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, *, mode=PERIODIC, freq=-1, period=-1, callback=None, tick_hz=1000):
+        if freq > 0:
+            self.__period_us = int(1_000_000 / freq)
+        else:
+            self.__period_us = int(period * 1_000_000 / tick_hz)
+        self.__mode = mode
+        self.__callback = callback
+        self.deadline_us = clock.now_us() + self.__period_us
+        clock.add_timer(self)
+
+    def deinit(self):
+        clock.remove_timer(self)
+
+    def fire(self, now_us: int) -> None:
+        if self.__mode == Timer.PERIODIC:
+            self.deadline_us += self.__period_us
+            if self.deadline_us <= now_us:  # far behind, do not fire a burst
+                self.deadline_us = now_us + self.__period_us
+        else:
+            clock.remove_timer(self)
+        if self.__callback is not None:
+            self.__callback(self)
+
+
+# --- SPI ---
+
+_spi_devices = {}
+
+
+def attach_spi_device(bus_id: int, device) -> None:
+    _spi_devices.setdefault(bus_id, []).append(device)
+
+
+class SPI():
+    MSB = 0
+    LSB = 1
+
+    def __init__(self, id, baudrate=1_000_000, *, polarity=0, phase=0, bits=8, firstbit=MSB,
+                 sck=None, mosi=None, miso=None) -> None:
+        self.id = id
+        self.init(baudrate)
+
+    def init(self, baudrate=1_000_000, **kwargs):
+        self.baudrate = baudrate
+
+    def deinit(self):
+        pass
+
+    def __exchange(self, tx, rx) -> None:
+        devices = [d for d in _spi_devices.get(self.id, ()) if d.selected]
+        for i in range(len(tx)):
+            value = 0
+            for device in devices:
+                value |= device.exchange(tx[i])
+            if rx is not None:
+                rx[i] = value
+        clock.advance(SPI_CALL_OVERHEAD_US + len(tx) * 8_000_000 // self.baudrate)
+
+    def write(self, buf):
+        self.__exchange(buf, None)
+
+    def read(self, nbytes, write=0x00):
+        rx = bytearray(nbytes)
+        self.__exchange(bytes([write]) * nbytes, rx)
+        return bytes(rx)
+
+    def readinto(self, buf, write=0x00):
+        self.__exchange(bytes([write]) * len(buf), buf)
+
+    def write_readinto(self, write_buf, read_buf):
+        self.__exchange(bytes(write_buf), read_buf)
+
+
+# --- I2C ---
+
+_i2c_devices = {}
+
+
+def attach_i2c_device(bus_id: int, device) -> None:
+    _i2c_devices.setdefault(bus_id, {})[device.address] = device
+
+
+def detach_i2c_device(bus_id: int, address: int) -> None:
+    _i2c_devices.get(bus_id, {}).pop(address, None)
+
+
+class I2C():
+    def __init__(self, id, *, scl=None, sda=None, freq=400_000, timeout=50_000) -> None:
+        self.id = id
+        self.freq = freq
+
+    def __wire_time(self, *segments: int) -> None:
+        # every byte is 9 clocks (8 bits and the acknowledge), plus start and stop
+        bits = 2
+        for nbytes in segments:
+            bits += 9 * (1 + nbytes)  # address byte + data
+        clock.advance(I2C_CALL_OVERHEAD_US + bits * 1_000_000 // self.freq)
+
+    def __device(self, addr: int):
+        device = _i2c_devices.get(self.id, {}).get(addr)
+        if device is None or not device.acknowledges():
+            self.__wire_time(0)
+            raise OSError(EIO)
+        return device
+
+    @staticmethod
+    def __mem_address(memaddr: int, addrsize: int) -> bytes:
+        return memaddr.to_bytes(addrsize // 8, 'big')
+
+    def scan(self) -> list:
+        found = []
+        for addr in range(0x08, 0x78):
+            device = _i2c_devices.get(self.id, {}).get(addr)
+            if device is not None and device.acknowledges():
+                found.append(addr)
+        clock.advance(112 * (I2C_CALL_OVERHEAD_US + 20 * 1_000_000 // self.freq))
+        return found
+
+    def writeto(self, addr, buf, stop=True) -> int:
+        device = self.__device(addr)
+        device.i2c_write(bytes(buf), stop)
+        self.__wire_time(len(buf))
+        return len(buf)
+
+    def writevto(self, addr, vector, stop=True) -> int:
+        data = b''.join(bytes(buf) for buf in vector)
+        return self.writeto(addr, data, stop)
+
+    def readfrom(self, addr, nbytes, stop=True) -> bytes:
+        device = self.__device(addr)
+        data = device.i2c_read(nbytes)
+        self.__wire_time(nbytes)
+        return bytes(data)
+
+    def readfrom_into(self, addr, buf, stop=True) -> None:
+        buf[:] = self.readfrom(addr, len(buf), stop)
+
+    def writeto_mem(self, addr, memaddr, buf, *, addrsize=8) -> None:
+        self.writeto(addr, self.__mem_address(memaddr, addrsize) + bytes(buf))
+
+    def readfrom_mem(self, addr, memaddr, nbytes, *, addrsize=8) -> bytes:
+        device = self.__device(addr)
+        device.i2c_write(self.__mem_address(memaddr, addrsize), False)
+        data = device.i2c_read(nbytes)
+        self.__wire_time(addrsize // 8, nbytes)
+        return bytes(data)
+
+    def readfrom_mem_into(self, addr, memaddr, buf, *, addrsize=8) -> None:
+        buf[:] = self.readfrom_mem(addr, memaddr, len(buf), addrsize=addrsize)
+
+
+SoftI2C = I2C
+
+
+# --- misc ---
+
+def lightsleep(time_ms=None) -> None:
+    clock.sleep_us((time_ms or 0) * 1000)
+
+
+deepsleep = lightsleep
+
+
+def idle() -> None:
+    clock.poll()
+
+
+def freq(hz=None):
+    if hz is None:
+        return 125_000_000
+
+
+def unique_id() -> bytes:
+    return b'ROBI42SM'
+
+
+def disable_irq() -> int:
+    return 0
+
+
+def enable_irq(state: int = 0) -> None:
+    pass
+
+
+def reset() -> None:
+    raise SystemExit('machine.reset()')
+
+
+soft_reset = reset
@@ -0,0 +1,51 @@
+"""Stand-in for the `micropython` module."""
+
+from .clock import clock
+
+
+def const(value):
+    return value
+
+
+def schedule(func, arg) -> None:
+    clock.schedule(func, arg)
+
+
+def native(func):
+    return func
+
+
+viper = native
+asm_thumb = native
+
+
+def alloc_emergency_exception_buf(size: int) -> None:
+    pass
+
+
+def opt_level(level=None):
+    return 0 if level is None else None
+
+
+def mem_info(verbose=False) -> None:
+    print('mem: not available in the simulator')
+
+
+def qstr_info(verbose=False) -> None:
+    pass
+
+
+def stack_use() -> int:
+    return 0
+
+
+def heap_lock() -> int:
+    return 0
+
+
+def heap_unlock() -> int:
+    return 0
+
+
+def kbd_intr(chr: int) -> None:
+    pass
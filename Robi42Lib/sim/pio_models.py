@@ -0,0 +1,172 @@
+"""
+Behaviour of the library's PIO programs in the simulator, see rp2.register_program_model().
+"""
+
+from . import machine
+from . import rp2
+from .clock import clock
+
+
+class PIOPWMModel(rp2.ProgramModel):
+    """pwm_prog of abstract/piopwm.py: a square wave with half-period put into the TX FIFO."""
+
+    def __init__(self, sm: rp2.StateMachine) -> None:
+        super().__init__(sm)
+        self.pulses = machine.PulseSource()
+        machine.set_pulse_source(sm.config['sideset_base'].id, self.pulses)
+
+    def __update(self) -> None:
+        half_period = self.sm.last_put
+        # the program idles for 0xFFFFFFFF (a put of -1)
+        if self.sm.running and half_period and half_period < 0xFFFFFFFF:
+            self.pulses.set_rate(self.sm.freq / (2 * half_period))
+        else:
+            self.pulses.set_rate(0)
+
+    def on_active(self, running: bool) -> None:
+        self.__update()
+
+    def on_put(self, value: int) -> None:
+        self.__update()
+
+
+class StepCounterModel(rp2.ProgramModel):
+    """step_counter of abstract/step_counter.py: counts X down on every rising edge."""
+
+    def __init__(self, sm: rp2.StateMachine) -> None:
+        super().__init__(sm)
+        self.pin_id = sm.config['in_base'].id
+        self.__base = machine.pulse_count(self.pin_id)
+        self.__isr = 0
+
+    def exec(self, instr: str) -> None:
+        instr = instr.replace(' ', '')
+        if instr == 'mov(x,invert(null))':
+            self.__base = machine.pulse_count(self.pin_id)
+        elif instr == 'mov(isr,invert(x))':
+            self.__isr = (machine.pulse_count(self.pin_id) - self.__base) & 0xFFFFFFFF
+        elif instr == 'push()':
+            self.sm.rx.append(self.__isr)
+        else:
+            raise NotImplementedError('step_counter model cannot execute \'{}\''.format(instr))
+
+
+class StepGeneratorModel(rp2.ProgramModel):
+    """
+    step_generator of abstract/step_generator.py: plays (steps - 1, half period) segments
+    from the TX FIFO and raises the state machine's interrupt after each one. Every
+    segment starts with a rising edge, also when the state machine is restarted in the
+    middle of a step. A CONTINUOUS segment runs until stopped and takes a half period put
+    meanwhile at its next rising edge.
+    """
+
+    OVERHEAD_CYCLES = 7
+    CONTINUOUS = 0xFFFFFFFF
+
+    def __init__(self, sm: rp2.StateMachine) -> None:
+        super().__init__(sm)
+        pin_id = sm.config['sideset_base'].id
+        # a re-initialized state machine keeps counting where the last program stopped
+        previous = machine.pulse_source(pin_id)
+        self.pulses = machine.PulseSource(previous.pulses() if previous is not None else 0.0)
+        machine.set_pulse_source(pin_id, self.pulses)
+        self.__words = []
+        self.__segments = []  # (steps or None for CONTINUOUS, rate in Hz)
+        self.__timer = None
+        self.__playing = False
+        self.__continuous = None  # (start in us, rate) of the CONTINUOUS segment playing
+        self.__retune = None  # rate put for it, not taken yet
+
+    def __rate(self, half_period: int) -> float:
+        return self.sm.freq / (2 * half_period + self.OVERHEAD_CYCLES)
+
+    def on_put(self, value: int) -> None:
+        if self.__continuous is not None:
+            self.__retune = self.__rate(value)
+            self.__start_timer(self.__next_edge_us(), self.__take_retune)
+            return
+        self.__words.append(value)
+        if len(self.__words) == 2:
+            first, half_period = self.__words
+            self.__words = []
+            self.__segments.append((None if first == self.CONTINUOUS else first + 1, self.__rate(half_period)))
+            if self.sm.running and not self.__playing:
+                self.__next(clock.now_us())
+
+    def tx_level(self) -> int:
+        return len(self.__words) + (self.__retune is not None)
+
+    def exec(self, instr) -> None:
+        if isinstance(instr, int):  # the jmp to the start of the program (see stop())
+            self.__words = []
+            self.__segments = []
+        elif instr.replace(' ', '') == 'pull(noblock)':
+            if self.__retune is not None:
+                self.__retune = None
+                self.__stop_timer()
+            elif self.__words:
+                self.__words.pop(0)
+        else:
+            raise NotImplementedError('step_generator model cannot execute \'{}\''.format(instr))
+
+    def on_active(self, running: bool) -> None:
+        if running and not self.__playing:
+            self.__next(clock.now_us())
+        elif not running:
+            self.__stop_timer()
+            self.__playing = False
+            self.__continuous = None
+            self.__retune = None
+            self.pulses.set_rate(0)
+
+    def __start_timer(self, at_us: float, callback) -> None:
+        self.__stop_timer()
+        self.__timer = machine.Timer(-1)
+        self.__timer.init(mode=machine.Timer.ONE_SHOT, period=max(1, int(at_us - clock.now_us())),
+                          tick_hz=1_000_000, callback=lambda t: callback(at_us))
+
+    def __stop_timer(self) -> None:
+        if self.__timer is not None:
+            self.__timer.deinit()
+            self.__timer = None
+
+    def __next(self, at_us: float) -> None:
+        # starts the next segment at at_us, or waits for one with the pin low
+        if not self.__segments:
+            self.__playing = False
+            self.pulses.set_rate(0, at_us)
+            return
+        steps, rate = self.__segments.pop(0)
+        self.__playing = True
+        edges = int(self.pulses.pulses(at_us) + 1e-6)
+        if steps is None:
+            self.__continuous = (at_us, rate)
+            self.pulses.set_rate(rate, at_us, pulses=edges + 1)
+            return
+        self.pulses.set_rate(rate, at_us, pulses=edges + 1, limit=edges + steps)
+        self.__start_timer(at_us + steps * 1_000_000 / rate, self.__segment_done)
+
+    def __segment_done(self, end_us: float) -> None:
+        self.__timer = None
+        self.__next(end_us)
+        if self.sm.irq_handler is not None:
+            self.sm.irq_handler(self.sm)
+
+    def __next_edge_us(self) -> float:
+        start_us, rate = self.__continuous
+        period_us = 1_000_000 / rate
+        return start_us + (int((clock.now_us() - start_us) / period_us) + 1) * period_us
+
+    def __take_retune(self, at_us: float) -> None:
+        # the edge at at_us is counted already, it starts the first period at the new rate
+        self.__timer = None
+        rate = self.__retune
+        self.__retune = None
+        self.__continuous = (at_us, rate)
+        self.pulses.set_rate(rate, at_us, pulses=round(self.pulses.pulses(at_us)))
+
+
+def register() -> None:
+    rp2.register_program_model('pwm_prog', PIOPWMModel)
+    rp2.register_program_model('step_counter', StepCounterModel)
+    rp2.register_program_model('step_generator', StepGeneratorModel)
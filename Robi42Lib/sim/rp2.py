@@ -0,0 +1,217 @@
+"""
+Stand-in for MicroPython's `rp2` module. Programs decorated with asm_pio are not
+assembled; state machines record what is put into their TX FIFO so the board model can
+derive what they output. A program can be given behaviour with register_program_model():
+the model gets the values put into the TX FIFO and the instructions passed to exec().
+"""
+
+import inspect
+
+from .clock import clock
+
+
+class PIO():
+    IN_LOW = 0
+    IN_HIGH = 1
+    OUT_LOW = 2
+    OUT_HIGH = 3
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+    JOIN_NONE = 0
+    JOIN_TX = 1
+    JOIN_RX = 2
+    IRQ_SM0 = 0x100
+    IRQ_SM1 = 0x200
+    IRQ_SM2 = 0x400
+    IRQ_SM3 = 0x800
+
+    INSTRUCTION_MEMORY = 32
+
+    def __init__(self, id: int) -> None:
+        if id not in (0, 1):
+            raise ValueError('invalid PIO block')
+        self.id = id
+
+    @property
+    def programs(self) -> list:
+        return _loaded_programs[self.id]
+
+    def add_program(self, program) -> None:
+        """Loads the program at the highest free address like the Pico SDK, see _Program."""
+        if any(p is program for p in self.programs):
+            return
+        used = [False] * self.INSTRUCTION_MEMORY
+        for loaded in self.programs:
+            offset = loaded[1 + self.id]
+            for i in range(offset, offset + len(loaded[0])):
+                used[i] = True
+        length = len(program[0])
+        for offset in range(self.INSTRUCTION_MEMORY - length, -1, -1):
+            if not any(used[offset:offset + length]):
+                program[1 + self.id] = offset
+                self.programs.append(program)
+                return
+        raise OSError(12, 'no space for PIO program')
+
+    def remove_program(self, program=None) -> None:
+        programs = self.programs
+        for i in range(len(programs) - 1, -1, -1):
+            if program is None or programs[i] is program:
+                programs[i][1 + self.id] = -1
+                del programs[i]  # by index, equal programs are still different ones
+
+    def state_machine(self, id: int, program=None, **kwargs) -> 'StateMachine':
+        return StateMachine(self.id * 4 + id, program, **kwargs)
+
+    def irq(self, handler=None, trigger=IRQ_SM0 | IRQ_SM1 | IRQ_SM2 | IRQ_SM3, hard=False):
+        pass
+
+
+_loaded_programs = ([], [])
+
+
+class _Program(list):
+    """
+    Result of @asm_pio: the program function and its configuration. Laid out like
+    MicroPython's programs as far as the library looks into them: item 0 has one entry
+    per instruction, items 1 and 2 are the load addresses in PIO0 and PIO1 (-1 if not
+    loaded).
+    """
+
+    def __init__(self, func, config: dict) -> None:
+        # the simulator does not assemble the program, count the statements instead
+        lines = inspect.getsource(func).splitlines()[2:]  # after decorator and def
+        length = 0
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith(('#', 'label(', 'wrap_target(', 'wrap(')):
+                length += 1
+        super().__init__([[None] * max(1, length), -1, -1])
+        self.func = func
+        self.name = func.__name__
+        self.config = config
+
+
+def asm_pio(**config):
+    def decorator(func):
+        return _Program(func, config)
+
+    return decorator
+
+
+def asm_pio_encode(instr: str, sideset_count: int, sideset_opt: bool = False) -> str:
+    """Not assembled either, StateMachine.exec() hands the text to the program model."""
+    return instr
+
+
+class ProgramModel():
+    """Behaviour of a PIO program in the simulator, see register_program_model()."""
+
+    def __init__(self, sm: 'StateMachine') -> None:
+        self.sm = sm
+
+    def on_active(self, running: bool) -> None:
+        pass
+
+    def on_put(self, value: int) -> None:
+        pass
+
+    def exec(self, instr: str) -> None:
+        pass
+
+    def tx_level(self) -> int:
+        """Words waiting in the TX FIFO, for programs that do not take them at once."""
+        return 0
+
+
+_program_models = {}
+
+
+def register_program_model(program_name: str, model_class) -> None:
+    """State machines running the program (by function name) get a model_class(sm)."""
+    _program_models[program_name] = model_class
+
+
+_state_machines = {}
+
+
+def state_machine(sm_id: int):
+    """Returns the simulated state machine with the given number, or None."""
+    return _state_machines.get(sm_id)
+
+
+class StateMachine():
+    FIFO_DEPTH = 4
+
+    def __init__(self, id: int, program=None, freq: int = -1, **kwargs) -> None:
+        if not 0 <= id < 8:
+            raise ValueError('invalid state machine')
+        self.id = id
+        self.program = None
+        self.freq = 125_000_000
+        self.config = {}
+        self.running = False
+        self.tx_log = []  # (ticks_us, value) of every value put into the TX FIFO
+        self.rx = []
+        self.model = None
+        self.irq_handler = None
+        _state_machines[id] = self
+        if program is not None:
+            self.init(program, freq, **kwargs)
+
+    def init(self, program, freq: int = -1, **kwargs) -> None:
+        PIO(self.id // 4).add_program(program)
+        if self.model is not None:
+            self.model.on_active(False)
+        self.running = False
+        self.program = program
+        if freq > 0:
+            self.freq = freq
+        self.config = kwargs
+        model_class = _program_models.get(program.name)
+        self.model = model_class(self) if model_class is not None else None
+
+    def active(self, value=None):
+        if value is None:
+            return self.running
+        self.running = bool(value)
+        if self.model is not None:
+            self.model.on_active(self.running)
+
+    def restart(self) -> None:
+        pass
+
+    def exec(self, instr) -> None:
+        if self.model is not None:
+            self.model.exec(instr)
+
+    def put(self, value, shift: int = 0) -> None:
+        if isinstance(value, (bytes, bytearray, memoryview)) or hasattr(value, 'typecode'):
+            for item in value:
+                self.put(item, shift)
+            return
+        value = (int(value) >> shift) & 0xFFFFFFFF
+        self.tx_log.append((clock.ticks_us(), value))
+        if len(self.tx_log) > 1024:
+            del self.tx_log[:512]
+        if self.model is not None:
+            self.model.on_put(value)
+        clock.poll()
+
+    @property
+    def last_put(self):
+        return self.tx_log[-1][1] if self.tx_log else None
+
+    def get(self, buf=None, shift: int = 0):
+        return self.rx.pop(0) >> shift if self.rx else 0
+
+    def tx_fifo(self) -> int:
+        # the simulated state machine drains its FIFO at once, unless the model says otherwise
+        return self.model.tx_level() if self.model is not None else 0
+
+    def rx_fifo(self) -> int:
+        return len(self.rx)
+
+    def irq(self, handler=None, trigger=0, hard=False):
+        """The handler gets the state machine, program models call it for irq(rel(0))."""
+        self.irq_handler = handler
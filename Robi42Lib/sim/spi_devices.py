@@ -0,0 +1,236 @@
+"""
+Virtual SPI devices. Each one sits on a CS line and sees the bytes clocked while the
+line is low; a rising edge ends the frame.
+"""
+
+import random
+
+from . import machine
+
+
+class VirtualSPIDevice():
+    def __init__(self, cs_pin_id: int) -> None:
+        self.cs_pin_id = cs_pin_id
+        self._byte_index = 0
+        machine.add_pin_listener(cs_pin_id, self.__on_cs)
+
+    @property
+    def selected(self) -> bool:
+        return machine.pin_level(self.cs_pin_id) == 0
+
+    def __on_cs(self, level: int) -> None:
+        if level:
+            self.end_frame()
+        self._byte_index = 0
+
+    def exchange(self, mosi: int) -> int:
+        """Receives one byte and returns the byte shifted out at the same time."""
+        miso = self.on_byte(self._byte_index, mosi)
+        self._byte_index += 1
+        return miso
+
+    def on_byte(self, index: int, mosi: int) -> int:
+        raise NotImplementedError
+
+    def end_frame(self) -> None:
+        pass
+
+
+class VirtualMCP23S17(VirtualSPIDevice):
+    """
+    MCP23S17 in IOCON.BANK = 0 layout: hardware addressing (HAEN), sequential operation,
+    input polarity, pull-ups and interrupt-on-change with INTF/INTCAP.
+
+    Outside circuits drive input pins with set_input(); a pin nobody drives reads 1 with
+    the pull-up enabled and 0 otherwise.
+    """
+
+    IODIRA, IODIRB, IPOLA, IPOLB, GPINTENA, GPINTENB = 0x00, 0x01, 0x02, 0x03, 0x04, 0x05
+    DEFVALA, DEFVALB, INTCONA, INTCONB, IOCON, IOCON_B = 0x06, 0x07, 0x08, 0x09, 0x0A, 0x0B
+    GPPUA, GPPUB, INTFA, INTFB, INTCAPA, INTCAPB = 0x0C, 0x0D, 0x0E, 0x0F, 0x10, 0x11
+    GPIOA, GPIOB, OLATA, OLATB = 0x12, 0x13, 0x14, 0x15
+    NUM_REGISTERS = 0x16
+
+    IOCON_SEQOP = 0x20
+    IOCON_HAEN = 0x08
+    IOCON_MIRROR = 0x40
+
+    def __init__(self, cs_pin_id: int, hw_address: int) -> None:
+        super().__init__(cs_pin_id)
+        self.hw_address = hw_address
+        self.regs = bytearray(self.NUM_REGISTERS)
+        self.regs[self.IODIRA] = 0xFF
+        self.regs[self.IODIRB] = 0xFF
+        self.external = {}  # pin -> level driven from outside
+        self.on_interrupt = None  # called with (port, active) when INTA/INTB changes
+        self.__read = False
+        self.__addressed = False
+        self.__pointer = 0
+        self.__int_active = [False, False]
+        self.transactions = 0
+
+    # --- outside world ---
+
+    def pin_level(self, pin: int) -> int:
+        """Level of a pin as seen from outside (output latch or input level)."""
+        port, bit = pin >> 3, 1 << (pin & 7)
+        if not self.regs[self.IODIRA + port] & bit:
+            return 1 if self.regs[self.OLATA + port] & bit else 0
+        return self.__input_level(pin)
+
+    def port_outputs(self, port: int) -> int:
+        """Output latch of port A (0) or B (1)."""
+        return self.regs[self.OLATA + port]
+
+    def set_input(self, pin: int, level) -> None:
+        """Drives an input pin from outside, None releases it."""
+        before = self.__port_value(pin >> 3)
+        if level is None:
+            self.external.pop(pin, None)
+        else:
+            self.external[pin] = 1 if level else 0
+        self.__check_interrupt(pin >> 3, before)
+
+    # --- register model ---
+
+    def __input_level(self, pin: int) -> int:
+        if pin in self.external:
+            return self.external[pin]
+        return 1 if self.regs[self.GPPUA + (pin >> 3)] & (1 << (pin & 7)) else 0
+
+    def __port_value(self, port: int) -> int:
+        iodir = self.regs[self.IODIRA + port]
+        value = self.regs[self.OLATA + port] & ~iodir
+        inputs = 0
+        for bit in range(8):
+            if self.__input_level((port << 3) | bit):
+                inputs |= 1 << bit
+        inputs ^= self.regs[self.IPOLA + port]
+        return (value | (inputs & iodir)) & 0xFF
+
+    def __check_interrupt(self, port: int, before: int) -> None:
+        now = self.__port_value(port)
+        enabled = self.regs[self.GPINTENA + port]
+        intcon = self.regs[self.INTCONA + port]
+        defval = self.regs[self.DEFVALA + port]
+        flags = 0
+        for bit in range(8):
+            mask = 1 << bit
+            if not enabled & mask:
+                continue
+            reference = defval if intcon & mask else before
+            if (now & mask) != (reference & mask):
+                flags |= mask
+        if flags:
+            if not self.regs[self.INTFA + port]:
+                self.regs[self.INTCAPA + port] = now
+            self.regs[self.INTFA + port] |= flags
+        self.__update_int_outputs()
+
+    def __clear_interrupt(self, port: int) -> None:
+        self.regs[self.INTFA + port] = 0
+        self.__update_int_outputs()
+
+    def __update_int_outputs(self) -> None:
+        active = [self.regs[self.INTFA] != 0, self.regs[self.INTFB] != 0]
+        if self.regs[self.IOCON] & self.IOCON_MIRROR:
+            active = [active[0] or active[1]] * 2
+        for port in (0, 1):
+            if active[port] != self.__int_active[port]:
+                self.__int_active[port] = active[port]
+                if self.on_interrupt is not None:
+                    self.on_interrupt(port, active[port])
+
+    def __read_register(self, reg: int) -> int:
+        if reg in (self.GPIOA, self.GPIOB):
+            port = reg - self.GPIOA
+            value = self.__port_value(port)
+            self.__clear_interrupt(port)
+            return value
+        if reg in (self.INTCAPA, self.INTCAPB):
+            value = self.regs[reg]
+            self.__clear_interrupt(reg - self.INTCAPA)
+            return value
+        return self.regs[reg]
+
+    def __write_register(self, reg: int, value: int) -> None:
+        if reg in (self.IOCON, self.IOCON_B):
+            self.regs[self.IOCON] = self.regs[self.IOCON_B] = value & 0xFE
+        elif reg in (self.GPIOA, self.GPIOB, self.OLATA, self.OLATB):
+            self.regs[self.OLATA + (reg & 1)] = value
+        elif reg in (self.INTFA, self.INTFB, self.INTCAPA, self.INTCAPB):
+            pass  # read-only
+        else:
+            self.regs[reg] = value
+
+    def on_byte(self, index: int, mosi: int) -> int:
+        if index == 0:
+            haen = self.regs[self.IOCON] & self.IOCON_HAEN
+            address = (mosi >> 1) & 0x07
+            # without HAEN the address pins are ignored and the device answers to every
+            # address, so one IOCON write configures all expanders on the bus
+            self.__addressed = (mosi & 0xF0) == 0x40 and (not haen or address == self.hw_address)
+            self.__read = bool(mosi & 0x01)
+            if self.__addressed:
+                self.transactions += 1
+            return 0
+        if not self.__addressed:
+            return 0
+        if index == 1:
+            self.__pointer = mosi % self.NUM_REGISTERS
+            return 0
+        miso = 0
+        if self.__read:
+            miso = self.__read_register(self.__pointer)
+        else:
+            self.__write_register(self.__pointer, mosi)
+        if not self.regs[self.IOCON] & self.IOCON_SEQOP:
+            self.__pointer = (self.__pointer + 1) % self.NUM_REGISTERS
+        return miso
+
+
+class VirtualMCP3008(VirtualSPIDevice):
+    """
+    MCP3008 10 bit ADC. The host sets the channel inputs as raw values (set_raw) or
+    voltages (set_voltage); `noise` adds up to +-noise LSB of random noise.
+    """
+
+    def __init__(self, cs_pin_id: int, vref: float = 2.5, noise: int = 0, seed: int = 42) -> None:
+        super().__init__(cs_pin_id)
+        self.vref = vref
+        self.noise = noise
+        self.raw = [0] * 8
+        self.conversions = 0
+        self.__random = random.Random(seed)
+        self.__value = 0
+        self.__started = False
+
+    def set_raw(self, channel: int, value: int) -> None:
+        self.raw[channel] = max(0, min(1023, int(value)))
+
+    def set_voltage(self, channel: int, volts: float) -> None:
+        self.set_raw(channel, round(volts / self.vref * 1023))
+
+    def __convert(self, config: int) -> int:
+        channel = (config >> 4) & 0x07
+        if config & 0x80:
+            value = self.raw[channel]
+        else:  # differential: IN+ is the channel, IN- its neighbour of the pair
+            value = self.raw[channel] - self.raw[channel ^ 1]
+        if self.noise:
+            value += self.__random.randint(-self.noise, self.noise)
+        self.conversions += 1
+        return max(0, min(1023, value))
+
+    def on_byte(self, index: int, mosi: int) -> int:
+        if index == 0:
+            self.__started = bool(mosi & 0x01)
+            return 0
+        if not self.__started:
+            return 0
+        if index == 1:
+            self.__value = self.__convert(mosi)
+            return (self.__value >> 8) & 0x03
+        if index == 2:
+            return self.__value & 0xFF
+        return 0
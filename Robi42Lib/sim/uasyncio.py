@@ -0,0 +1,49 @@
+"""
+Stand-in for `uasyncio`: CPython's asyncio plus MicroPython's sleep_ms().
+
+use_simulated_time() makes the event loops of asyncio run on the simulated clock: the
+loop reads SimClock's time, and instead of blocking until the next sleeping task is due
+it lets that much simulated time pass (so timers fire meanwhile). Sleeps in coroutines
+then take as long as time.sleep_ms() does in the simulator, not real time.
+"""
+
+from asyncio import *  # noqa: F401,F403
+import asyncio as _asyncio
+import selectors as _selectors
+
+from .clock import clock
+
+
+async def sleep_ms(ms):
+    await _asyncio.sleep(ms / 1000)
+
+
+class _SimSelector(_selectors.DefaultSelector):
+
+    def select(self, timeout=None):
+        # the loop waits for its next timer: advance the simulated clock instead
+        if timeout is not None and timeout > 0:
+            clock.sleep_us(timeout * 1_000_000)
+            timeout = 0
+        return super().select(timeout)
+
+
+class SimEventLoop(_asyncio.SelectorEventLoop):
+    """Event loop on the simulated clock, see use_simulated_time()."""
+
+    def __init__(self) -> None:
+        super().__init__(_SimSelector())
+
+    def time(self) -> float:
+        return clock.now_us() / 1_000_000
+
+
+class _SimEventLoopPolicy(_asyncio.DefaultEventLoopPolicy):
+
+    def new_event_loop(self):
+        return SimEventLoop()
+
+
+def use_simulated_time() -> None:
+    """Lets asyncio.run() and new_event_loop() create SimEventLoops, called by sim.install()."""
+    _asyncio.set_event_loop_policy(_SimEventLoopPolicy())
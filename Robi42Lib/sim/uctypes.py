@@ -0,0 +1,82 @@
+"""
+Stand-in for `uctypes`, limited to what the library uses: structs of byte arrays and
+scalars laid over a bytearray passed through addressof().
+"""
+
+import struct as _struct
+
+LITTLE_ENDIAN = 0
+BIG_ENDIAN = 1
+NATIVE = 2
+
+UINT8 = 0 << 28
+INT8 = 1 << 28
+UINT16 = 2 << 28
+INT16 = 3 << 28
+UINT32 = 4 << 28
+INT32 = 5 << 28
+UINT64 = 6 << 28
+INT64 = 7 << 28
+ARRAY = 1 << 30
+PTR = 2 << 30
+
+_SCALARS = {UINT8: 'B', INT8: 'b', UINT16: 'H', INT16: 'h', UINT32: 'I', INT32: 'i', UINT64: 'Q', INT64: 'q'}
+_TYPE_MASK = 7 << 28
+_OFFSET_MASK = (1 << 17) - 1
+
+# there are no raw addresses on the host: addressof() hands out keys into this table
+_buffers = {}
+
+
+def addressof(obj) -> int:
+    _buffers[id(obj)] = obj
+    return id(obj)
+
+
+def bytearray_at(addr: int, size: int):
+    return memoryview(_buffers[addr])[:size]
+
+
+def bytes_at(addr: int, size: int) -> bytes:
+    return bytes(_buffers[addr][:size])
+
+
+def sizeof(layout, layout_type=NATIVE) -> int:
+    size = 0
+    for value in layout.values():
+        if isinstance(value, tuple):
+            offset = value[0] & _OFFSET_MASK
+            size = max(size, offset + (value[1] & _OFFSET_MASK))
+        else:
+            offset = value & _OFFSET_MASK
+            size = max(size, offset + _struct.calcsize(_SCALARS[value & _TYPE_MASK]))
+    return size
+
+
+class struct():
+    def __init__(self, addr: int, layout: dict, layout_type=NATIVE) -> None:
+        object.__setattr__(self, '_buf', memoryview(_buffers[addr]))
+        object.__setattr__(self, '_layout', layout)
+        object.__setattr__(self, '_order', '>' if layout_type == BIG_ENDIAN else '<')
+
+    def __field(self, name):
+        value = self._layout[name]
+        if isinstance(value, tuple):
+            if not value[0] & ARRAY:
+                raise NotImplementedError('only arrays and scalars are supported')
+            offset = value[0] & _OFFSET_MASK
+            return None, offset, value[1] & _OFFSET_MASK
+        return self._order + _SCALARS[value & _TYPE_MASK], value & _OFFSET_MASK, None
+
+    def __getattr__(self, name):
+        fmt, offset, length = self.__field(name)
+        if fmt is None:
+            return self._buf[offset:offset + length]
+        return _struct.unpack_from(fmt, self._buf, offset)[0]
+
+    def __setattr__(self, name, value):
+        fmt, offset, length = self.__field(name)
+        if fmt is None:
+            self._buf[offset:offset + length] = value
+        else:
+            _struct.pack_into(fmt, self._buf, offset, value)
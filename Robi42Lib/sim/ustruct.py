@@ -0,0 +1,3 @@
+"""Stand-in for `ustruct`."""
+
+from struct import *  # noqa: F401,F403
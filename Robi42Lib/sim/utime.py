@@ -0,0 +1,30 @@
+"""Stand-in for MicroPython's `utime` module, backed by the simulated clock."""
+
+import time as _host_time
+
+from .clock import clock, SimClock
+
+ticks_ms = clock.ticks_ms
+ticks_us = clock.ticks_us
+ticks_cpu = clock.ticks_us
+ticks_add = SimClock.ticks_add
+ticks_diff = SimClock.ticks_diff
+
+
+def sleep(seconds) -> None:
+    clock.sleep_us(int(seconds * 1_000_000))
+
+
+def sleep_ms(ms) -> None:
+    clock.sleep_us(int(ms) * 1000)
+
+
+def sleep_us(us) -> None:
+    clock.sleep_us(int(us))
+
+
+time = _host_time.time
+time_ns = _host_time.time_ns
+localtime = _host_time.localtime
+gmtime = _host_time.gmtime
+mktime = _host_time.mktime
@@ -0,0 +1,94 @@
+"""
+Compares the boot time of Robi42.begin_async(), which brings up all discovered I2C
+devices concurrently, with bringing them up one after another before begin()
+('sequential'). 'lazy' is begin() alone, which leaves the devices not needed at boot
+for their first use. The devices are only brought up once per interpreter, so every
+boot needs a fresh one: on the Pico run() measures one mode per reset,
+
+    from Robi42Lib.tools import boot_benchmark
+    boot_benchmark.print_report('async')
+
+on the host every boot runs in a new simulator (Robi42Lib.sim) process:
+
+    python -m Robi42Lib.tools.boot_benchmark --runs 3
+"""
+
+import sys
+import time
+
+ON_DEVICE = sys.implementation.name == 'micropython'
+
+MODES = ('lazy', 'sequential', 'async')
+
+
+def run(mode: str) -> int:
+    """Boots a Robi42 the way `mode` (one of MODES) says, returns the boot time in ms."""
+    if mode not in MODES:
+        raise ValueError('Unknown mode \'{}\''.format(mode))
+    if not ON_DEVICE:
+        from .. import sim
+        sim.install()
+    import asyncio
+    from ..hardware_manager.manager import HardwareManager
+    from ..robi42 import Robi42
+
+    robi = Robi42()
+    if mode == 'async':
+        asyncio.run(robi.begin_async())
+        return robi.boot_time_ms
+    start = time.ticks_ms()
+    if mode == 'sequential':
+        HardwareManager.get_instance().warm_up_drivers()
+    robi.begin()
+    return time.ticks_diff(time.ticks_ms(), start)
+
+
+def _run_process(mode: str) -> int:
+    # a new interpreter, the boot time is the last line it prints
+    import os
+    import subprocess
+
+    package_parent = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (package_parent, env.get('PYTHONPATH')) if p)
+    output = subprocess.run(
+        [sys.executable, '-m', 'Robi42Lib.tools.boot_benchmark', '--mode', mode],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return int(output.strip().splitlines()[-1])
+
+
+def print_report(mode: str = 'sequential'):
+    print(f"Boot time ({mode}): {run(mode)}ms")
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m Robi42Lib.tools.boot_benchmark',
+                                     description='Boot time of begin_async() and begin() on the simulator')
+    parser.add_argument('--runs', type=int, default=3, help='boots per mode')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)  # one boot in this process
+    args = parser.parse_args(argv)
+
+    if args.mode is not None:
+        boot_ms = run(args.mode)
+        print(boot_ms)
+        return 0
+
+    print("Boot time (simulator, ms):")
+    means = {}
+    for mode in MODES:
+        times = [_run_process(mode) for _ in range(args.runs)]
+        means[mode] = sum(times) / len(times)
+        print(f"\t{mode:<11} mean {means[mode]:7.1f}  min {min(times):5d}  max {max(times):5d}")
+    if means['async'] > 0:
+        print(f"\tspeedup     {means['sequential'] / means['async']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    if ON_DEVICE:
+        print_report()
+    else:
+        sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Checks the debounced button sampling (Buttons.start_sampling(), see
+abstract/debouncer.py) against scripted bounce patterns: every pattern toggles the
+buttons of the simulated expander (Robi42Lib.sim) at given times and lists the events
+get_event() has to return, PRESS, RELEASE, LONG_PRESS and REPEAT per button in order.
+Only runs on the host:
+
+    python -m Robi42Lib.tools.debounce_check
+
+exits with 1 if a pattern produced other events.
+"""
+
+import sys
+import time
+
+from .. import sim
+
+board = sim.install()
+
+from ..modules.buttons import Buttons
+from ..robi42 import Robi42
+
+# sampling parameters of the check, the defaults of start_sampling()
+PERIOD_MS = 5
+INTEGRATOR_MAX = 4
+LONG_PRESS_MS = 800
+REPEAT_MS = 200
+
+_KIND_NAMES = {
+    Buttons.PRESS: 'PRESS',
+    Buttons.RELEASE: 'RELEASE',
+    Buttons.LONG_PRESS: 'LONG_PRESS',
+    Buttons.REPEAT: 'REPEAT',
+}
+_BUTTON_NAMES = {
+    Buttons.UP: 'up',
+    Buttons.DOWN: 'down',
+    Buttons.LEFT: 'left',
+    Buttons.RIGHT: 'right',
+    Buttons.CENTER: 'center',
+}
+
+
+def bounce(at_ms: int, button: str, pressed: bool, edges: int = 6, edge_ms: int = 1) -> list:
+    """
+    A contact that chatters for `edges` changes, edge_ms apart, before it settles at
+    `pressed` (at at_ms + edges * edge_ms). Returns (ms, button, pressed) steps.
+    """
+    steps = []
+    level = not pressed
+    for i in range(edges):
+        level = not level
+        steps.append((at_ms + i * edge_ms, button, level))
+    steps.append((at_ms + edges * edge_ms, button, pressed))
+    return steps
+
+
+# name, steps (ms, button, pressed), run time in ms, expected (kind, button) events
+PATTERNS = (
+    ('clean press',
+     [(10, 'center', True), (110, 'center', False)], 200,
+     [('PRESS', 'center'), ('RELEASE', 'center')]),
+    ('bouncing press and release',
+     bounce(10, 'left', True) + bounce(150, 'left', False), 300,
+     [('PRESS', 'left'), ('RELEASE', 'left')]),
+    ('bounce slower than the sampling, 7ms edges',
+     bounce(10, 'up', True, 6, 7) + bounce(200, 'up', False, 6, 7), 350,
+     [('PRESS', 'up'), ('RELEASE', 'up')]),
+    ('glitch shorter than the integrator',
+     [(10, 'down', True), (22, 'down', False)], 100,
+     []),
+    ('chatter while held',
+     [(10, 'right', True)] + bounce(100, 'right', True, 4) + [(300, 'right', False)], 400,
+     [('PRESS', 'right'), ('RELEASE', 'right')]),
+    ('long press with repeats',
+     bounce(10, 'center', True) + bounce(1300, 'center', False), 1450,
+     [('PRESS', 'center'), ('LONG_PRESS', 'center'), ('REPEAT', 'center'), ('REPEAT', 'center'),
+      ('RELEASE', 'center')]),
+    ('two buttons overlapping',
+     bounce(10, 'left', True) + bounce(60, 'right', True) + bounce(150, 'left', False)
+     + bounce(200, 'right', False), 350,
+     [('PRESS', 'left'), ('PRESS', 'right'), ('RELEASE', 'left'), ('RELEASE', 'right')]),
+)
+
+
+def _play(buttons: Buttons, steps: list, run_ms: int) -> list:
+    buttons.start_sampling(PERIOD_MS, 32, INTEGRATOR_MAX, LONG_PRESS_MS, REPEAT_MS)
+    start = time.ticks_ms()
+    for at_ms, button, pressed in sorted(steps, key=lambda step: step[0]):
+        wait_ms = time.ticks_diff(time.ticks_add(start, at_ms), time.ticks_ms())
+        if wait_ms > 0:
+            time.sleep_ms(wait_ms)
+        if pressed:
+            board.press(button)
+        else:
+            board.release(button)
+    wait_ms = time.ticks_diff(time.ticks_add(start, run_ms), time.ticks_ms())
+    if wait_ms > 0:
+        time.sleep_ms(wait_ms)
+
+    events = []
+    while True:
+        event = buttons.get_event()
+        if event is None:
+            break
+        kind, bit, _ = event
+        events.append((_KIND_NAMES[kind], _BUTTON_NAMES[bit]))
+    buttons.stop_sampling()
+    return events
+
+
+def run(robi: Robi42 = None) -> list:
+    """Returns (name, expected events, events) per pattern of PATTERNS."""
+    if robi is None:
+        robi = Robi42()
+        robi.begin()
+    results = []
+    for name, steps, run_ms, expected in PATTERNS:
+        results.append((name, expected, _play(robi.buttons, steps, run_ms)))
+    return results
+
+
+def failed(results: list) -> bool:
+    for _, expected, events in results:
+        if list(expected) != events:
+            return True
+    return False
+
+
+def print_report(results: list = None):
+    if results is None:
+        results = run()
+    print(f"Debounced button events ({PERIOD_MS}ms sampling, {INTEGRATOR_MAX} samples to change):")
+    for name, expected, events in results:
+        if list(expected) == events:
+            print(f"\tok        {name}")
+        else:
+            print(f"\tMISMATCH  {name}")
+            print(f"\t          expected {expected}")
+            print(f"\t          got      {events}")
+
+
+def main() -> int:
+    results = run()
+    print_report(results)
+    return 1 if failed(results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
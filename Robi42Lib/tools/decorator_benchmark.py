@@ -0,0 +1,76 @@
+"""
+Measures the per-call overhead of the driver injecting decorators in
+modules/base_module.py against the previous implementation, which looked the driver
+up and merged a kwargs dict on every call. Uses a stand-in manager, so no I2C device
+is needed. Runs on the Pico and on the host, where it installs the simulator
+(Robi42Lib.sim) for the MicroPython modules the library imports.
+"""
+
+import sys
+import time
+
+if sys.implementation.name != 'micropython':
+    from .. import sim
+    sim.install()
+
+from ..modules import base_module
+
+
+class _Manager:
+    def __init__(self):
+        self.generation = 0
+        self.drivers = {'Driver': [object()]}
+
+    def get_i2c_driver_by_name(self, name: str) -> list:
+        return self.drivers.get(name, [])
+
+    def get_i2c_arbiter(self, driver):
+        return None
+
+
+def _legacy_get_first_i2c_hardware(driver_name, manager):
+    def function_wrapper(func):
+        def inner_wrap(*args, **kwargs):
+            drivers = manager.get_i2c_driver_by_name(driver_name)
+            if len(drivers) > 0:
+                return func(*args, **kwargs, **{driver_name: drivers[0]})
+
+        return inner_wrap
+
+    return function_wrapper
+
+
+def _measure(func, iterations: int) -> float:
+    start = time.ticks_us()
+    for _ in range(iterations):
+        func(None)
+    return time.ticks_diff(time.ticks_us(), start) / iterations
+
+
+def run(iterations: int = 10000) -> dict:
+    """Returns the mean time per call in microseconds."""
+    manager = _Manager()
+
+    def plain(self, Driver=None):
+        return Driver
+
+    legacy = _legacy_get_first_i2c_hardware('Driver', manager)(plain)
+    cached = base_module.get_first_i2c_hardware('Driver', manager=manager)(plain)
+
+    return {
+        'undecorated_us': _measure(lambda s: plain(s, None), iterations),
+        'legacy_us': _measure(legacy, iterations),
+        'cached_us': _measure(cached, iterations),
+    }
+
+
+def print_report(iterations: int = 10000):
+    result = run(iterations)
+    print("Decorated call overhead per call:")
+    print(f"\tundecorated:         {result['undecorated_us']:.2f}us")
+    print(f"\tlookup + kwargs:     {result['legacy_us']:.2f}us")
+    print(f"\tgeneration cache:    {result['cached_us']:.2f}us")
+
+
+if __name__ == "__main__":
+    print_report()
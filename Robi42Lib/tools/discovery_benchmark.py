@@ -0,0 +1,169 @@
+"""
+Compares the bookkeeping cost of one I2C discovery run (collecting the acknowledged
+addresses, driver lookup and add/remove diffing, without the bus probes) between the
+previous implementation, which collected a list, walked the driver inventory per
+address and diffed sets, and the compiled address table with presence bitmaps used by
+the HardwareManager. Both the time and the heap allocations per run are reported: on
+the Pico the heap growth with the garbage collector disabled, on the host (which frees
+most objects at once) the peak traced by tracemalloc above the start of every run.
+
+Runs on the Pico and on the host, where it installs the simulator (Robi42Lib.sim) for
+the MicroPython modules the library imports:
+
+    python -m Robi42Lib.tools.discovery_benchmark --iterations 50000
+"""
+
+import gc
+import sys
+import time
+
+try:
+    import tracemalloc  # CPython only
+except ImportError:
+    tracemalloc = None
+
+ON_DEVICE = sys.implementation.name == 'micropython'
+
+if not ON_DEVICE:
+    from .. import sim
+    sim.install()
+
+from ..device_drivers import inventory as driver_inventory
+from ..hardware_manager.manager import HardwareManager
+
+DEFAULT_ITERATIONS = 50000
+
+# runs measured for the allocations, tracemalloc slows every run down a lot
+ALLOC_RUNS = 200
+
+_NO_DEVICES = bytes(16)
+
+
+def _linear_run(probe_addresses: list, acked: bytearray, loaded: dict) -> None:
+    devices = []
+    for address in probe_addresses:
+        if acked[address]:
+            devices.append(address)
+    for address in devices:
+        if address in loaded:
+            continue
+        for driver in driver_inventory.I2C_DRIVERS:
+            if address in driver.SUPPORTED_ADDRESSES:
+                loaded[address] = driver
+                break
+    for address in set(loaded.keys()) - set(devices):
+        del loaded[address]
+
+
+def _bitmap_run(probe_addresses: list, acked: bytearray, table: list, present: bytearray,
+                probed: bytearray, loaded: dict) -> None:
+    probed[:] = _NO_DEVICES
+    for address in probe_addresses:
+        if acked[address]:
+            probed[address >> 3] |= 1 << (address & 0x07)
+    if probed == present:
+        return
+    for i in range(16):
+        old = present[i]
+        new = probed[i]
+        if old == new:
+            continue
+        added = new & ~old
+        removed = old & ~new
+        for bit in range(8):
+            if removed & (1 << bit):
+                del loaded[(i << 3) | bit]
+            elif added & (1 << bit):
+                loaded[(i << 3) | bit] = table[(i << 3) | bit]
+        present[i] = new
+
+
+def _time_us(run, iterations: int) -> float:
+    start = time.ticks_us()
+    for _ in range(iterations):
+        run()
+    return time.ticks_diff(time.ticks_us(), start) / iterations
+
+
+def _alloc_bytes(run, runs: int):
+    # bytes allocated per run, None where nothing can measure it
+    run()  # warm up
+    if hasattr(gc, 'mem_alloc'):
+        gc.collect()
+        gc.disable()
+        before = gc.mem_alloc()
+        for _ in range(runs):
+            run()
+        allocated = gc.mem_alloc() - before
+        gc.enable()
+        return allocated / runs
+    if tracemalloc is None:
+        return None
+    allocated = 0
+    tracemalloc.start()
+    for _ in range(runs):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        run()
+        allocated += tracemalloc.get_traced_memory()[1] - start
+    tracemalloc.stop()
+    return allocated / runs
+
+
+def run(iterations: int = DEFAULT_ITERATIONS, devices: list = None) -> dict:
+    """
+    Returns the mean time per discovery run in microseconds ('linear_us', 'bitmap_us')
+    and the bytes allocated per run ('linear_bytes', 'bitmap_bytes', None if the
+    platform cannot measure them) for both implementations, in the steady state where
+    nothing changed. devices defaults to every address a driver in the inventory
+    supports.
+    """
+    table = HardwareManager.compile_driver_table(driver_inventory.I2C_DRIVERS)
+    probe_addresses = [a for a in range(128) if table[a] is not None]
+    if devices is None:
+        devices = probe_addresses
+    acked = bytearray(128)
+    for address in devices:
+        acked[address] = 1
+
+    loaded = {}
+    linear = lambda: _linear_run(probe_addresses, acked, loaded)
+    linear_bytes = _alloc_bytes(linear, ALLOC_RUNS)
+    linear_us = _time_us(linear, iterations)
+
+    loaded = {}
+    present = bytearray(16)
+    probed = bytearray(16)
+    bitmap = lambda: _bitmap_run(probe_addresses, acked, table, present, probed, loaded)
+    bitmap_bytes = _alloc_bytes(bitmap, ALLOC_RUNS)
+    bitmap_us = _time_us(bitmap, iterations)
+
+    return {'iterations': iterations, 'linear_us': linear_us, 'bitmap_us': bitmap_us,
+            'linear_bytes': linear_bytes, 'bitmap_bytes': bitmap_bytes}
+
+
+def print_report(iterations: int = DEFAULT_ITERATIONS):
+    result = run(iterations)
+    print(f"I2C discovery bookkeeping per run ({result['iterations']} runs):")
+    for name, key in (('linear lookup + set diff', 'linear'), ('address table + bitmap', 'bitmap')):
+        allocated = result[key + '_bytes']
+        heap = f"{allocated:.0f}B allocated" if allocated is not None else "allocations not measured"
+        print(f"\t{name + ':':<26}{result[key + '_us']:6.2f}us  {heap}")
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m Robi42Lib.tools.discovery_benchmark',
+                                     description='Bookkeeping cost of one I2C discovery run')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='timed runs per implementation')
+    args = parser.parse_args(argv)
+    print_report(args.iterations)
+    return 0
+
+
+if __name__ == "__main__":
+    if ON_DEVICE:
+        print_report()
+    else:
+        sys.exit(main())
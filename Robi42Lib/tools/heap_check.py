@@ -0,0 +1,96 @@
+"""
+Checks that the MCP23S17 register path does not allocate: digital_write() is called
+10000 times on the LED expander and the heap growth is measured.
+
+On the Pico the garbage collector is disabled meanwhile, so gc.mem_alloc() counts every
+allocation. On the host the simulator (Robi42Lib.sim) is installed and tracemalloc
+measures the memory the library keeps allocated (the simulated bus and this check are
+left out), and
+the peak above the start, which includes the simulated bus:
+
+    python -m Robi42Lib.tools.heap_check
+
+exits with 1 if the heap grew.
+"""
+
+import gc
+import sys
+
+ON_DEVICE = sys.implementation.name == 'micropython'
+
+if not ON_DEVICE:
+    import os
+    import tracemalloc
+    from .. import sim
+    sim.install()
+
+from ..hardware_manager.platform_description import SPIHardwareHolder
+
+
+def _library_filters() -> tuple:
+    package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return (
+        tracemalloc.Filter(True, os.path.join(package, '*')),
+        tracemalloc.Filter(False, os.path.join(package, 'sim', '*')),
+        tracemalloc.Filter(False, os.path.join(package, 'tools', '*')),
+    )
+
+
+def run(calls: int = 10000, warmup: int = 1000, pin: int = 0) -> dict:
+    """
+    Returns 'calls', 'heap_bytes' (the growth over all calls) and 'peak_bytes' (None on
+    the Pico). The first `warmup` calls are not measured.
+    """
+    mcp = SPIHardwareHolder.get_instance().mcp_leds
+    if not ON_DEVICE:
+        # traced from the warmup on, so objects replaced later (e.g. the ints of the
+        # bus statistics) are in the first snapshot as well
+        tracemalloc.start()
+    for i in range(warmup):
+        mcp.digital_write(pin, i & 1)
+
+    if ON_DEVICE:
+        gc.collect()
+        gc.disable()
+        before = gc.mem_alloc()
+        for i in range(calls):
+            mcp.digital_write(pin, i & 1)
+        heap_bytes = gc.mem_alloc() - before
+        gc.enable()
+        return {'calls': calls, 'heap_bytes': heap_bytes, 'peak_bytes': None}
+
+    before = tracemalloc.take_snapshot()
+    start = tracemalloc.get_traced_memory()[0]
+    for i in range(calls):
+        mcp.digital_write(pin, i & 1)
+    peak = tracemalloc.get_traced_memory()[1]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    filters = _library_filters()
+    heap_bytes = 0
+    for stat in after.filter_traces(filters).compare_to(before.filter_traces(filters), 'filename'):
+        heap_bytes += stat.size_diff
+    return {'calls': calls, 'heap_bytes': heap_bytes, 'peak_bytes': peak - start}
+
+
+def print_report(result: dict = None):
+    if result is None:
+        result = run()
+    print(f"Heap over {result['calls']} MCP23S17 digital_write() calls:")
+    print(f"\tgrowth:  {result['heap_bytes']}B ({result['heap_bytes'] / result['calls']:.2f}B per call)")
+    if result['peak_bytes'] is not None:
+        print(f"\tpeak:    {result['peak_bytes']}B (simulated bus included)")
+
+
+def main() -> int:
+    result = run()
+    print_report(result)
+    return 1 if result['heap_bytes'] > 0 else 0
+
+
+if __name__ == "__main__":
+    if ON_DEVICE:
+        print_report()
+    else:
+        sys.exit(main())
@@ -0,0 +1,351 @@
+"""
+Measures the control loop rate of the shipped examples: loop frequency, period and
+jitter percentiles, bus transactions and heap allocations per iteration.
+
+The examples run unmodified. Every example's loop makes one call per iteration that
+marks the iteration boundary (e.g. read_raw_values() in the line follower). A probe
+wrapped around that call timestamps the iterations and ends the run with an exception
+after the requested number of iterations.
+
+On the Pico the examples are expected in /examples; run() and print_report() are the
+entry points. On the host the runner installs the simulator (Robi42Lib.sim), so the
+numbers are only comparable with baselines from the simulator:
+
+    python -m Robi42Lib.tools.loop_benchmark --save baseline.json
+    python -m Robi42Lib.tools.loop_benchmark --compare baseline.json
+
+--compare exits with 1 if a workload regressed by more than the tolerance.
+"""
+
+import gc
+import sys
+import json
+import time
+from array import array
+
+try:
+    import tracemalloc  # CPython only
+except ImportError:
+    tracemalloc = None
+
+ON_DEVICE = sys.implementation.name == 'micropython'
+
+PERCENTILES = (50, 90, 99)
+
+# tolerance of compare() as a share of the baseline value
+DEFAULT_TOLERANCE = 0.1
+
+
+class _Done(Exception):
+    pass
+
+
+class _LoopProbe():
+    """
+    Called at the start of every iteration. Skips `warmup` iterations, times the next
+    `iterations` ones and then measures the heap allocations of `alloc_window` more
+    iterations: on MicroPython the heap growth with the garbage collector disabled, on
+    CPython (which frees most objects at once) the peak of the memory traced by
+    tracemalloc above the start of every iteration, simulator included.
+    """
+
+    def __init__(self, iterations: int, warmup: int, alloc_window: int, bus_transactions) -> None:
+        self.iterations = iterations
+        self.warmup = warmup
+        self.alloc_window = alloc_window
+        self.periods = array('I', [0] * iterations)
+        self.count = 0
+        self.finished = False
+        self.transactions = 0
+        self.alloc_bytes = None
+        self.__bus_transactions = bus_transactions
+        self.__last_us = 0
+        self.__heap_before = 0
+
+    def __call__(self) -> None:
+        now = time.ticks_us()
+        i = self.count - self.warmup
+        if 0 < i <= self.iterations:
+            self.periods[i - 1] = time.ticks_diff(now, self.__last_us)
+        if i == 0:
+            self.transactions = -self.__bus_transactions()
+        elif i == self.iterations:
+            self.finished = True
+            self.transactions += self.__bus_transactions()
+            if self.alloc_window <= 0 or (not hasattr(gc, 'mem_alloc') and tracemalloc is None):
+                raise _Done()
+            gc.collect()
+            self.alloc_bytes = 0
+            if hasattr(gc, 'mem_alloc'):
+                gc.disable()
+                self.__heap_before = gc.mem_alloc()
+            else:
+                tracemalloc.start()
+                self.__heap_before = tracemalloc.get_traced_memory()[0]
+        elif self.iterations < i <= self.iterations + self.alloc_window:
+            if hasattr(gc, 'mem_alloc'):
+                if i == self.iterations + self.alloc_window:
+                    self.alloc_bytes = gc.mem_alloc() - self.__heap_before
+                    gc.enable()
+                    raise _Done()
+            else:
+                self.alloc_bytes += tracemalloc.get_traced_memory()[1] - self.__heap_before
+                if i == self.iterations + self.alloc_window:
+                    tracemalloc.stop()
+                    raise _Done()
+                tracemalloc.reset_peak()
+                self.__heap_before = tracemalloc.get_traced_memory()[0]
+        self.count += 1
+        self.__last_us = time.ticks_us()  # the probe itself is not part of a period
+
+
+def _probe_method(cls, name: str, probe: _LoopProbe):
+    """Wraps cls.name so the probe runs before every call, returns the original."""
+    original = getattr(cls, name)
+
+    def probed(*args, **kwargs):
+        probe()
+        return original(*args, **kwargs)
+
+    setattr(cls, name, probed)
+    return original
+
+
+# --- workloads ---
+
+def _examples_dir() -> str:
+    if ON_DEVICE:
+        return '/examples'
+    import os
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'examples')
+
+
+def _load_example(name: str, run_name: str) -> dict:
+    with open(_examples_dir() + '/' + name) as f:
+        code = f.read()
+    scope = {'__name__': run_name}
+    try:
+        exec(code, scope)
+    except _Done:
+        pass
+    return scope
+
+
+def _stop_motors(robi) -> None:
+    if robi is not None and 'motors' in robi.loaded_modules:
+        robi.motors.disable()
+
+
+def _run_line_follower(probe: _LoopProbe, board) -> None:
+    from ..modules import ir_sensor
+    if board is not None:
+        board.set_ir(800, 100, 800)  # on the line
+    original = _probe_method(ir_sensor.IrSensors, 'read_raw_values', probe)
+    try:
+        scope = _load_example('line_follower.py', '__main__')
+    finally:
+        setattr(ir_sensor.IrSensors, 'read_raw_values', original)
+    _stop_motors(scope.get('robi'))
+
+
+def _run_distance_holder(probe: _LoopProbe, board) -> None:
+    from ..modules import laser_sensor
+    if board is not None:
+        board.set_distance_mm(250)  # too far away, drives towards the wall
+    original = _probe_method(laser_sensor.LaserSensor, 'read_distance_mm', probe)
+    try:
+        scope = _load_example('distance_holder.py', '__main__')
+    finally:
+        setattr(laser_sensor.LaserSensor, 'read_distance_mm', original)
+    _stop_motors(scope.get('robi'))
+
+
+def _run_waypoint_mission(probe: _LoopProbe, board) -> None:
+    # The mission reads the gyro through an I2C object of its own. It is replaced by the
+    # platform's (profiled) object for the same bus, so its transactions are counted.
+    from ..hardware_manager.platform_description import PlatformLoader
+    from ..robi42 import Robi42
+
+    example = _load_example('waypoint_mission.py', 'waypoint_mission')
+    robi = Robi42()
+    robi.begin()
+    mission = example['WaypointMission'](robi, example['RobiConfig'](0.035, 0.147), [])
+    mission.gyro.i2c = PlatformLoader.get_instance().get_platform()['i2c'][0]
+    gyro_z = mission.gyro.z
+
+    def probed_z():
+        probe()
+        return gyro_z()
+
+    mission.gyro.z = probed_z
+    robi.motors.enable()
+    # the straight drive loop of drive(), long enough to be ended by the probe
+    start = example['InstructionResult'](0.3, 0)
+    try:
+        mission.drive(start, example['DriveInstruction'](1000, 0.3, 0))
+    except _Done:
+        pass
+    _stop_motors(robi)
+
+
+WORKLOADS = {
+    'line_follower': _run_line_follower,
+    'distance_holder': _run_distance_holder,
+    'waypoint_mission': _run_waypoint_mission,
+}
+
+
+# --- runner ---
+
+def _percentile(sorted_values: list, p: int) -> int:
+    if not sorted_values:
+        return 0
+    index = (len(sorted_values) - 1) * p // 100
+    return sorted_values[index]
+
+
+def _summarize(probe: _LoopProbe) -> dict:
+    periods = sorted(probe.periods)
+    median = _percentile(periods, 50)
+    deviations = sorted(abs(p - median) for p in periods)
+    elapsed = sum(periods)
+    return {
+        'iterations': probe.iterations,
+        'loop_hz': probe.iterations * 1_000_000 / elapsed if elapsed > 0 else 0,
+        'period_us': {'p' + str(p): _percentile(periods, p) for p in PERCENTILES},
+        'period_max_us': periods[-1] if periods else 0,
+        'jitter_us': {'p' + str(p): _percentile(deviations, p) for p in PERCENTILES},
+        'bus_transactions_per_iter': probe.transactions / probe.iterations,
+        'alloc_bytes_per_iter': probe.alloc_bytes / probe.alloc_window if probe.alloc_bytes is not None else None,
+    }
+
+
+def run(names=None, iterations: int = 500, warmup: int = 20, alloc_window: int = 50) -> dict:
+    """
+    Runs the given workloads (all if None) and returns the results, ready to be saved
+    as a baseline. Bus transactions are counted by the BusProfiler, which stays
+    enabled for the run. alloc_bytes_per_iter is None if neither gc.mem_alloc() nor
+    tracemalloc exists.
+    """
+    from ..hardware_manager.bus_profiler import BusProfiler
+
+    board = None
+    if not ON_DEVICE:
+        from .. import sim
+        board = sim.get_board()
+    profiler = BusProfiler.get_instance()
+    was_enabled = profiler.enabled
+
+    def bus_transactions() -> int:
+        total = 0
+        for bus in profiler.buses:
+            total += bus.totals[0]
+        return total
+
+    results = {}
+    profiler.enable()
+    try:
+        for name in names or WORKLOADS:
+            gc.collect()
+            probe = _LoopProbe(iterations, warmup, alloc_window, bus_transactions)
+            WORKLOADS[name](probe, board)
+            if not probe.finished:
+                raise RuntimeError('Workload \'{}\' ended after {} iterations'.format(name, probe.count))
+            results[name] = _summarize(probe)
+    finally:
+        if not was_enabled:
+            profiler.disable()
+    return {
+        'target': 'device' if ON_DEVICE else 'sim',
+        'workloads': results,
+    }
+
+
+def save(results: dict, path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(results, f)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, results: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Returns a list of regressions (strings) of results against baseline: lower loop
+    rate, higher p99 jitter, more bus transactions or allocations per iteration, each by
+    more than tolerance (a share of the baseline value).
+    """
+    if baseline.get('target') != results.get('target'):
+        return ['baseline is from the {}, results from the {}'.format(baseline.get('target'), results.get('target'))]
+    regressions = []
+    for name, result in results['workloads'].items():
+        base = baseline['workloads'].get(name)
+        if base is None:
+            continue
+        checks = (
+            ('loop_hz', -base['loop_hz'], -result['loop_hz']),
+            ('jitter_us.p99', base['jitter_us']['p99'], result['jitter_us']['p99']),
+            ('bus_transactions_per_iter', base['bus_transactions_per_iter'], result['bus_transactions_per_iter']),
+            ('alloc_bytes_per_iter', base['alloc_bytes_per_iter'], result['alloc_bytes_per_iter']),
+        )
+        for key, old, new in checks:
+            if old is None or new is None:
+                continue
+            # values are negated where smaller is worse, so "bigger is worse" for all
+            if new > old + abs(old) * tolerance:
+                regressions.append('{}: {} {:.2f} -> {:.2f}'.format(name, key, abs(old), abs(new)))
+    return regressions
+
+
+def print_report(results: dict = None):
+    if results is None:
+        results = run()
+    print(f"Control loop benchmark ({results['target']}):")
+    for name, r in results['workloads'].items():
+        alloc = r['alloc_bytes_per_iter']
+        print(f"\t{name}: {r['loop_hz']:.1f}Hz over {r['iterations']} iterations")
+        print(f"\t\tperiod p50/p90/p99/max: {r['period_us']['p50']}/{r['period_us']['p90']}/"
+              f"{r['period_us']['p99']}/{r['period_max_us']}us")
+        print(f"\t\tjitter p50/p90/p99: {r['jitter_us']['p50']}/{r['jitter_us']['p90']}/{r['jitter_us']['p99']}us")
+        print(f"\t\tbus transactions/iter: {r['bus_transactions_per_iter']:.2f}")
+        print(f"\t\theap allocations/iter: {'n/a' if alloc is None else '{:.1f}B'.format(alloc)}")
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m Robi42Lib.tools.loop_benchmark',
+                                     description='Control loop rate of the shipped examples on the simulator')
+    parser.add_argument('workloads', nargs='*', help='default: all of ' + ', '.join(WORKLOADS))
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--save', metavar='PATH', help='write the results as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare with a baseline, exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+    for name in args.workloads:
+        if name not in WORKLOADS:
+            parser.error('unknown workload \'{}\''.format(name))
+
+    from .. import sim
+    sim.install()
+
+    results = run(args.workloads or None, args.iterations, args.warmup)
+    print_report(results)
+    if args.save:
+        save(results, args.save)
+    if args.compare:
+        regressions = compare(load(args.compare), results, args.tolerance)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    if ON_DEVICE:
+        print_report()
+    else:
+        sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Measures the motion planner in abstract/motion_profile.py: the time plan() takes, how
+exactly the planned table covers the requested distance, and what one control tick
+costs when the step frequency comes from the table instead of being computed from a
+float velocity (as Ramp and set_velocity() do). Heap bytes per tick are only measured
+on the Pico. Runs on the Pico and on the host, no hardware needed.
+"""
+
+import gc
+import time
+
+from ..abstract import motion_profile
+
+MOVES = (
+    # distance m, v_max m/s, a_max m/s^2, jerk m/s^3
+    (1.0, 0.5, 0.4, 0),
+    (1.0, 0.5, 0.4, 4),
+    (0.05, 0.5, 0.4, 0),
+    (0.05, 0.5, 0.4, 4),
+)
+
+WHEEL_RADIUS = 0.035
+
+
+def _ticks_us():
+    return time.ticks_us() if hasattr(time, 'ticks_us') else int(time.perf_counter() * 1_000_000)
+
+
+def _mem_alloc():
+    if hasattr(gc, 'mem_alloc'):
+        return gc.mem_alloc()
+    return None  # not available on the host
+
+
+def _float_ticks(count: int, wheel_radius: float) -> int:
+    # what a ramp does per tick (elapsed time in us given): velocity, then the frequency
+    last = 0
+    for i in range(count):
+        t = (i * 2000 + 150) / 1_000_000
+        v = 0.4 * t
+        last = int(v / (motion_profile.STEP_ANGLE_RAD * wheel_radius))
+    return last
+
+
+def _table_ticks(count: int, freqs) -> int:
+    # what ProfilePlayback does per tick: index from the elapsed time, then a lookup
+    tick_us = 2000
+    n = len(freqs)
+    last = 0
+    for i in range(count):
+        index = (i * 2000 + 150) // tick_us
+        if index < n:
+            last = freqs[index]
+    return last
+
+
+def _measure_us(func, *args) -> int:
+    start = _ticks_us()
+    func(*args)
+    return _ticks_us() - start
+
+
+def _measure_heap(func, *args):
+    # with the collector disabled, so a collection cannot hide allocations
+    if _mem_alloc() is None:
+        return None
+    gc.collect()
+    gc.disable()
+    try:
+        heap_before = _mem_alloc()
+        func(*args)
+        return _mem_alloc() - heap_before
+    finally:
+        gc.enable()
+
+
+def run(ticks: int = 20000, heap_ticks: int = 200) -> dict:
+    """
+    Returns 'plans' (one dict per move in MOVES) and 'tick' with the mean cost per tick
+    of both ways in us (over `ticks` ticks) and heap bytes (over `heap_ticks` ticks, None
+    on the host).
+    """
+    plans = []
+    for distance, v_max, a_max, jerk in MOVES:
+        start = _ticks_us()
+        profile = motion_profile.plan(distance, v_max, a_max, jerk, 2, WHEEL_RADIUS)
+        plan_us = _ticks_us() - start
+        plans.append({
+            'distance': distance,
+            'v_max': v_max,
+            'a_max': a_max,
+            'jerk': jerk,
+            'plan_us': plan_us,
+            'ticks': len(profile),
+            'table_bytes': len(profile) * 2,
+            'peak_velocity': profile.peak_velocity,
+            'distance_error': profile.distance() - distance,
+        })
+
+    freqs = motion_profile.plan(*MOVES[0], 2, WHEEL_RADIUS).freqs
+    float_heap = _measure_heap(_float_ticks, heap_ticks, WHEEL_RADIUS)
+    table_heap = _measure_heap(_table_ticks, heap_ticks, freqs)
+    float_us = _measure_us(_float_ticks, ticks, WHEEL_RADIUS)
+    table_us = _measure_us(_table_ticks, ticks, freqs)
+    return {
+        'plans': plans,
+        'tick': {
+            'float_us': float_us / ticks,
+            'float_heap_bytes': float_heap / heap_ticks if float_heap is not None else None,
+            'table_us': table_us / ticks,
+            'table_heap_bytes': table_heap / heap_ticks if table_heap is not None else None,
+        },
+    }
+
+
+def print_report(ticks: int = 20000, heap_ticks: int = 200):
+    result = run(ticks, heap_ticks)
+    print("Motion planning:")
+    for p in result['plans']:
+        print(f"\t{p['distance']}m v_max {p['v_max']} a_max {p['a_max']} jerk {p['jerk']}: "
+              f"{p['plan_us'] / 1000:.1f}ms, {p['ticks']} ticks ({p['table_bytes']}B), "
+              f"peak {p['peak_velocity']:.3f}m/s, error {p['distance_error'] * 1000:+.3f}mm")
+    tick = result['tick']
+    print("Per control tick:")
+    for name, key in (('float velocity', 'float'), ('table lookup', 'table')):
+        heap = tick[key + '_heap_bytes']
+        heap_str = 'n/a' if heap is None else f"{heap:.1f}B"
+        print(f"\t{name:<15} {tick[key + '_us']:.2f}us, heap {heap_str}")
+
+
+if __name__ == "__main__":
+    print_report()
@@ -0,0 +1,94 @@
+"""
+Checks that the step counters of the motors (see abstract/step_counter.py) only count
+while a motor drives: after begin(), after driving and stopping with set_velocity(0),
+set_wheel_velocities(0, 0) or disable(), and after unlock(), the steps of both motors
+must stay the same while the robot stands still.
+
+On the host the simulator (Robi42Lib.sim) is installed:
+
+    python -m Robi42Lib.tools.odometry_check
+
+exits with 1 if a motor standing still counted steps. On the Pico the wheels turn, put
+the robot on its back.
+"""
+
+import sys
+import time
+
+ON_DEVICE = sys.implementation.name == 'micropython'
+
+if not ON_DEVICE:
+    from .. import sim
+    sim.install()
+
+from ..robi42 import Robi42
+
+
+def _idle_steps(motors, idle_ms: int) -> tuple:
+    # steps counted per motor while standing still for idle_ms
+    left, right = motors.left.steps, motors.right.steps
+    time.sleep_ms(idle_ms)
+    return motors.left.steps - left, motors.right.steps - right
+
+
+def run(robi: Robi42 = None, idle_ms: int = 500, drive_ms: int = 200, v: float = 0.1) -> list:
+    """
+    Returns (state, left steps, right steps, moved) per state checked: the steps counted
+    while standing still for idle_ms, and whether driving before it moved the motors
+    (None where it did not drive).
+    """
+    if robi is None:
+        robi = Robi42()
+        robi.begin()
+    motors = robi.motors
+
+    def drive():
+        start = motors.left.steps
+        motors.set_velocity(v)
+        time.sleep_ms(drive_ms)
+        return motors.left.steps != start
+
+    results = [('after begin()', *_idle_steps(motors, idle_ms), None)]
+    moved = drive()
+    motors.set_velocity(0)
+    results.append(('set_velocity(0)', *_idle_steps(motors, idle_ms), moved))
+    moved = drive()
+    motors.set_wheel_velocities(0, 0)
+    results.append(('set_wheel_velocities(0, 0)', *_idle_steps(motors, idle_ms), moved))
+    moved = drive()
+    motors.disable()
+    results.append(('disable()', *_idle_steps(motors, idle_ms), moved))
+    motors.lock()
+    results.append(('lock()', *_idle_steps(motors, idle_ms), None))
+    motors.unlock()
+    results.append(('unlock()', *_idle_steps(motors, idle_ms), None))
+    return results
+
+
+def failed(results: list) -> bool:
+    for _, left, right, moved in results:
+        if left != 0 or right != 0 or moved is False:
+            return True
+    return False
+
+
+def print_report(results: list = None):
+    if results is None:
+        results = run()
+    print("Steps counted while standing still:")
+    for state, left, right, moved in results:
+        note = '' if moved is not False else '  (did not move before)'
+        print(f"\t{state:<27} left {left:6d}  right {right:6d}{note}")
+
+
+def main() -> int:
+    results = run()
+    print_report(results)
+    return 1 if failed(results) else 0
+
+
+if __name__ == "__main__":
+    if ON_DEVICE:
+        print_report()
+    else:
+        sys.exit(main())
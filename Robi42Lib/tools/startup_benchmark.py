@@ -0,0 +1,107 @@
+"""
+Measures what every Robi42 module costs at startup: the time to import it and to
+construct it, and the heap it keeps allocated afterwards. Modules are loaded in the
+order of Robi42.MODULES, so a module is only charged for the imports it does not share
+with the modules before it. Run it right after a reset, otherwise already imported
+modules report (almost) nothing. On the host it installs the simulator (Robi42Lib.sim),
+the times include the simulated bus transactions then, and tracemalloc measures the
+heap (CPython's objects are larger than MicroPython's, so only the proportions compare).
+Tracing slows the imports down several times, --no-heap measures the times alone:
+
+    python -m Robi42Lib.tools.startup_benchmark [--no-heap]
+"""
+
+import gc
+import sys
+import time
+
+try:
+    import tracemalloc  # CPython only
+except ImportError:
+    tracemalloc = None
+
+if sys.implementation.name != 'micropython':
+    from .. import sim
+    sim.install()
+
+from ..robi42 import Robi42
+
+
+def _mem_alloc():
+    if hasattr(gc, 'mem_alloc'):
+        return gc.mem_alloc()
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return None
+
+
+def run(names=None, heap: bool = True) -> list:
+    """
+    Returns one dict per module with 'name', 'load_us' and 'heap_bytes' (None where
+    the heap cannot be measured). heap=False leaves tracemalloc off on the host.
+    """
+    tracing = (heap and not hasattr(gc, 'mem_alloc') and tracemalloc is not None
+               and not tracemalloc.is_tracing())
+    if tracing:
+        tracemalloc.start()
+    try:
+        return _run(names)
+    finally:
+        if tracing:
+            tracemalloc.stop()
+
+
+def _run(names) -> list:
+    robi = Robi42()
+    results = []
+    for name in names or Robi42.MODULES:
+        gc.collect()
+        heap_before = _mem_alloc()
+        start = time.ticks_us()
+        getattr(robi, name)
+        load_us = time.ticks_diff(time.ticks_us(), start)
+        gc.collect()
+        heap_after = _mem_alloc()
+        results.append({
+            'name': name,
+            'load_us': load_us,
+            'heap_bytes': heap_after - heap_before if heap_before is not None else None,
+        })
+    return results
+
+
+def print_report(names=None, heap: bool = True):
+    results = run(names, heap)
+    total_us = 0
+    total_heap = None
+    print("Module startup cost (import + construction):")
+    for result in results:
+        total_us += result['load_us']
+        heap = result['heap_bytes']
+        if heap is None:
+            print(f"\t{result['name']:<17} {result['load_us'] / 1000:8.2f}ms")
+        else:
+            total_heap = heap + (total_heap or 0)
+            print(f"\t{result['name']:<17} {result['load_us'] / 1000:8.2f}ms {heap:7d}B")
+    if total_heap is None:
+        print(f"\t{'total':<17} {total_us / 1000:8.2f}ms")
+    else:
+        print(f"\t{'total':<17} {total_us / 1000:8.2f}ms {total_heap:7d}B")
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m Robi42Lib.tools.startup_benchmark',
+                                     description='Import and construction cost of every Robi42 module')
+    parser.add_argument('--no-heap', action='store_true', help='do not trace the heap, for undistorted times')
+    args = parser.parse_args(argv)
+    print_report(heap=not args.no_heap)
+    return 0
+
+
+if __name__ == "__main__":
+    if sys.implementation.name == 'micropython':
+        print_report()
+    else:
+        sys.exit(main())
@@ -4,8 +4,11 @@ import Robi42Lib
 robi = Robi42Lib.Robi42()
 robi.begin()
 
-robi.motors.left.enable()
-robi.motors.right.enable()
+# wheel velocities in m/s (5000 steps/s are about 0.157 m/s)
+FAST = 0.157
+MEDIUM = 0.126
+SLOW = 0.063
+CRAWL = 0.0094
 
 threshold = 200
 while True:
@@ -15,20 +18,16 @@ while True:
     m_dark = raw_m < threshold
     r_dark = raw_r < threshold
 
+    # both wheels change at once, so they never run with mismatched speeds
     if m_dark:
         if not l_dark and not r_dark:
-            robi.motors.left.set_freq(5000)
-            robi.motors.right.set_freq(5000)
+            robi.motors.set_wheel_velocities(FAST, FAST)
         elif l_dark and not r_dark:
-            robi.motors.left.set_freq(2000)
-            robi.motors.right.set_freq(4000)
+            robi.motors.set_wheel_velocities(SLOW, MEDIUM)
         elif r_dark and not l_dark:
-            robi.motors.left.set_freq(4000)
-            robi.motors.right.set_freq(2000)
+            robi.motors.set_wheel_velocities(MEDIUM, SLOW)
     else:
         if l_dark and not r_dark:
-            robi.motors.left.set_freq(300)
-            robi.motors.right.set_freq(4000)
+            robi.motors.set_wheel_velocities(CRAWL, MEDIUM)
         elif r_dark and not l_dark:
-            robi.motors.left.set_freq(4000)
-            robi.motors.right.set_freq(300)
+            robi.motors.set_wheel_velocities(MEDIUM, CRAWL)
@@ -4,6 +4,7 @@ import aioble
 import bluetooth
 
 from Robi42Lib.robi42 import Robi42
+from Robi42Lib.hardware_manager import bus_arbiter
 from machine import Timer
 from micropython import const
 
@@ -117,8 +118,9 @@ class LineMapper:
         self.robi.motors.set_direction(FWD)
         self.robi.motors.enable()
 
-        step_timer.init(period=tick, callback=self.step)
-        timer.init(period=tick, callback=self._timer_callback)
+        # the callbacks read the sensors over the SPI bus the main loop reads the buttons on
+        step_timer.init(period=tick, callback=bus_arbiter.callback(self.step))
+        timer.init(period=tick, callback=bus_arbiter.callback(self._timer_callback))
 
         while self.is_running:
             if not self.robi.buttons.center.value():
@@ -206,8 +208,9 @@ class BluetoothLineMapper(LineMapper):
 
         self.robi.motors.enable()
 
-        step_timer.init(period=tick, callback=self.step)
-        timer.init(period=tick, callback=self._timer_callback)
+        # the callbacks read the sensors over the SPI bus the main loop reads the buttons on
+        step_timer.init(period=tick, callback=bus_arbiter.callback(self.step))
+        timer.init(period=tick, callback=bus_arbiter.callback(self._timer_callback))
 
         while self.is_running and self.bt_connected:
             if not self.robi.buttons.center.value():
@@ -149,6 +149,11 @@ class WaypointMission:
 
         return InstructionResult(inner_velocity, 0)
 
+    def driven_distance(self) -> float:
+        # mean of both wheels, from the step pulses counted in hardware
+        wr = self.robi_config.wheel_radius
+        return (self.robi.motors.left.distance_m(wr) + self.robi.motors.right.distance_m(wr)) / 2
+
     def accelerate(self, a: float, from_v: float, to_v: float, s_limit: float = 1000):
 
         wr = self.robi_config.wheel_radius
@@ -157,6 +162,7 @@ class WaypointMission:
 
         v = from_v  # m/s
         s = 0  # m
+        s_start = self.driven_distance()
         dt = 0.0015  # s, TODO: Calibrate this value
         rot = 0  # °
 
@@ -171,7 +177,7 @@ class WaypointMission:
                 self.robi.motors.left.set_velocity(v + ausgleich, wr)
                 self.robi.motors.right.set_velocity(v - ausgleich, wr)
             v += dt * a
-            s += dt * v
+            s = self.driven_distance() - s_start
 
         # end = time.time_ns()
         # print("Actual time:", (end-start) / 1e6, "ms")
@@ -201,6 +207,7 @@ class WaypointMission:
 
         rot = 0
         s = 0
+        s_start = self.driven_distance()
         dt = 0.0013  # TODO: Calibrate this value
         distance_to_drive = instruction.distance - acceleration_result.covered_distance
         # start = time.time_ns()
@@ -222,7 +229,7 @@ class WaypointMission:
                 self.robi.motors.right.set_velocity(
                     acceleration_result.managed_velocity - ausgleich, wr
                 )
-            s += acceleration_result.managed_velocity * dt
+            s = self.driven_distance() - s_start
 
         # end = time.time_ns()
         # print("Actual time:", (end - start) / 1e9, "Should time:", distance_to_drive / managed_velocity)
@@ -281,9 +288,18 @@ PATH1 = [
 ]
 
 
+def mission_file() -> str:
+    # next to this script: /examples on the robot, the checkout when run in the simulator
+    try:
+        directory = __file__.rsplit("/", 1)[0] if "/" in __file__ else "."
+    except NameError:  # no file, e.g. started with mpremote run
+        directory = "/examples"
+    return directory + "/exported_waypoint_mission.json"
+
+
 def main(robi: Robi42):
 
-    with open("/examples/exported_waypoint_mission.json") as f:
+    with open(mission_file()) as f:
         data = f.read()
 
     decoded = Importer.decode(data)